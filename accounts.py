@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Forex Multi-Account Bot
+Runs many strategies and simulated accounts in one bot process. Prices are fetched
+once per cycle and fanned out to every account; the price history, indicators and
+price vectors are shared, and accounts that share a strategy object share its
+decision, so adding an account only adds the cost of that account's own trades.
+Trades are stored under each account's id.
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+
+from bot import ForexTradingBot
+from execution import SpreadSlippageModel
+from ledger import PositionLedger
+from storage import TradeStore, WriteBehindWriter
+from strategies import ACTION_NAMES, MomentumStrategy
+from sweep import parse_values
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatedAccount:
+    """One independent simulated account: its own strategy, balance, positions and fill model.
+
+    The balance accounting is the bot's: both sides are priced off the inverse (USD per
+    unit) quote, a BUY spending trade_amount units at its ask and a SELL earning them at its
+    bid, and the balance floors at zero. Orders fill on the tick they are decided;
+    fill_model.latency_ticks is not applied. ledger tracks the account's open positions and
+    P&L in USD, filled at the same USD-per-unit prices the balance pays and earns.
+    """
+
+    def __init__(self, account_id, strategy, initial_balance=10000.0, trade_amount=100.0, seed=None,
+                 fill_model=None):
+        self.account_id = account_id
+        self.strategy = strategy
+        self.initial_balance = initial_balance
+        self.balance = initial_balance
+        self.trade_amount = trade_amount
+        self.fill_model = fill_model or SpreadSlippageModel(seed=seed)
+        self.ledger = PositionLedger()
+        self.trade_count = 0
+
+    def config(self):
+        """JSON-serializable description of the account, stored in the accounts table."""
+        return {
+            'trade_amount': self.trade_amount,
+            **{key: value for key, value in vars(self.strategy).items() if not key.startswith('_')},
+        }
+
+    def execute(self, pair, action, price):
+        """Apply one simulated trade and return the new balance."""
+        if action == "BUY":
+            unit_cost = self.fill_model.fill_price(pair, 1, 1.0 / price, self.trade_amount)
+            self.balance -= self.trade_amount * unit_cost
+            self.ledger.fill(pair, self.trade_amount, unit_cost)
+        elif action == "SELL":
+            unit_value = self.fill_model.fill_price(pair, -1, 1.0 / price, self.trade_amount)
+            self.balance += self.trade_amount * unit_value
+            self.ledger.fill(pair, -self.trade_amount, unit_value)
+
+        self.balance = max(0.0, self.balance)
+        return self.balance
+
+
+class MultiAccountBot(ForexTradingBot):
+    def __init__(self, accounts, **kwargs):
+        """Initialize the bot with a list of SimulatedAccount objects sharing one price feed."""
+        super().__init__(**kwargs)
+        self.accounts = list(accounts)
+
+        ids = [account.account_id for account in self.accounts]
+        if len(set(ids)) != len(ids):
+            raise ValueError("account ids must be unique")
+
+        timestamp = self.clock.now().isoformat()
+        for account in self.accounts:
+            self.store.register_account(account.account_id, account.strategy.name,
+                                        account.config(), account.initial_balance)
+            self.store.log_balance(timestamp, account.initial_balance, account.account_id)
+
+        strategies = {id(account.strategy): account.strategy for account in self.accounts}
+        self._indicator_strategies = [strategy for strategy in strategies.values() if strategy.uses_indicators]
+        logger.info(f"Trading {len(self.accounts)} accounts with {len(strategies)} distinct strategies")
+
+    def init_database(self):
+        """Open the store and writer without seeding the 'default' account the bot trades
+        for; each account's starting balance is recorded when it is registered."""
+        self.store = TradeStore(self.db_path)
+        self.writer = WriteBehindWriter(self.store)
+
+    def indicator_strategies(self):
+        """Every distinct account strategy that reads streaming indicators."""
+        return self._indicator_strategies
+
+    def trade_on_prices(self, current_prices):
+        """Fan one set of fetched prices out to every account."""
+        pairs, prices, previous = self.update_market_state(current_prices)
+        timestamp = self.clock.now().isoformat()
+        price_list = prices.tolist()
+
+        # Pairs whose price moved; every account re-marks only these
+        changed = np.flatnonzero(prices != previous).tolist()
+        changed_pairs = [pairs[i] for i in changed]
+        changed_values = [1.0 / price_list[i] for i in changed]  # USD per unit, for the ledgers
+
+        # Decide once per strategy object, not once per account
+        decisions = {}
+        traded = 0
+        trades = []
+        balances = []
+        positions = []
+        for account in self.accounts:
+            key = id(account.strategy)
+            actions = decisions.get(key)
+            if actions is None:
+                actions = decisions[key] = account.strategy.decide(
+                    pairs, prices, previous, self.history, self.indicators.get(key))
+
+            account_id = account.account_id
+            account.ledger.mark_many(changed_pairs, changed_values)
+
+            # Only pairs with a BUY/SELL cost anything per account; NaN previous prices decide HOLD
+            executed = 0
+            for i in np.flatnonzero(actions).tolist():
+                action = ACTION_NAMES[int(actions[i])]
+                balance = account.execute(pairs[i], action, price_list[i])
+                trades.append((timestamp, pairs[i], action, price_list[i], balance, account_id))
+                executed += 1
+            account.trade_count += executed
+            traded += executed
+
+            balances.append((timestamp, account.balance, account_id))
+            positions.extend(account.ledger.snapshot(account_id, timestamp))
+
+        # Every account's records go to the writer as one queue item each
+        self.writer.submit_batch(trades)
+        self.writer.submit_balances(balances)
+        self.writer.submit_positions(positions)
+        self.previous_prices.update(zip(pairs, price_list))
+        self.trade_count += traded
+
+        logger.info(f"Trading cycle complete: {traded} trades across {len(self.accounts)} accounts "
+                    f"({len(decisions)} strategy evaluations)")
+
+    def summary(self):
+        """Per-account trade count, balance and open positions, best balance first."""
+        rows = [{
+            'account_id': account.account_id,
+            'trades': account.trade_count,
+            'balance': account.balance,
+            'open_positions': len(account.ledger.open_positions()),
+            'realized_pnl': account.ledger.total_realized,
+            'unrealized_pnl': account.ledger.total_unrealized,
+        } for account in self.accounts]
+        return sorted(rows, key=lambda row: row['balance'], reverse=True)
+
+
+def momentum_accounts(buy_thresholds, sell_thresholds, trade_amount=100.0, initial_balance=10000.0, seed=0):
+    """One account per (buy, sell) threshold combination, each with its own slippage seed."""
+    accounts = []
+    for buy in buy_thresholds:
+        for sell in sell_thresholds:
+            strategy = MomentumStrategy(buy, sell)
+            accounts.append(SimulatedAccount(f"momentum_{buy:g}_{sell:g}", strategy,
+                                             initial_balance=initial_balance, trade_amount=trade_amount,
+                                             seed=seed + len(accounts)))
+    return accounts
+
+
+def main(argv=None):
+    """Command-line entry point: run a grid of momentum accounts live or over a price tape."""
+    parser = argparse.ArgumentParser(description="Run several simulated accounts on one price feed")
+    parser.add_argument('--buy', default='0.02,0.05,0.1', help="Buy thresholds (comma list or start:stop:step)")
+    parser.add_argument('--sell', default='-0.02,-0.05,-0.1',
+                        help="Sell thresholds (comma list or start:stop:step); negative values need the "
+                             "--sell=-0.02,-0.05 form")
+    parser.add_argument('--amount', type=float, default=100.0, help="Trade amount for every account")
+    parser.add_argument('--tape', help="Replay this CSV price tape on a simulated clock instead of trading live")
+    parser.add_argument('--db', default='forex_trading.db', help="Database the trades are written to")
+    parser.add_argument('--seed', type=int, default=0, help="Base seed for the per-account random slippage")
+    args = parser.parse_args(argv)
+
+    accounts = momentum_accounts(parse_values(args.buy), parse_values(args.sell),
+                                 trade_amount=args.amount, seed=args.seed)
+
+    if args.tape:
+        from clock import SimulatedClock
+        from replay import TapeFeed, load_tape, tape_start
+
+        logging.getLogger('bot').setLevel(logging.WARNING)
+        logger.setLevel(logging.WARNING)
+        tape = load_tape(args.tape)
+        clock = SimulatedClock(tape_start(tape))
+        bot = MultiAccountBot(accounts, db_path=args.db, clock=clock, seed=args.seed,
+                              feed=TapeFeed(tape, clock))
+        started = time.perf_counter()
+        bot.run(cycles=len(tape))
+        elapsed = time.perf_counter() - started
+        print(f"⏪ Replayed {len(tape):,} cycles for {len(accounts)} accounts in {elapsed:.2f}s")
+    else:
+        bot = MultiAccountBot(accounts, db_path=args.db, seed=args.seed)
+        bot.run()
+
+    print("👥 Account Results")
+    print("=" * 60)
+    for row in bot.summary():
+        print(f"  {row['account_id']:<28} trades {row['trades']:>6,}  "
+              f"balance ${row['balance']:>12,.2f}  open {row['open_positions']}  "
+              f"unrealized ${row['unrealized_pnl']:>10,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
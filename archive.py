@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Forex Trade Archive
+Tiered retention for the bot database. Trades and balance snapshots older than a
+cut-off are moved out of SQLite into immutable, compressed columnar segment files
+(one .npz per table and id range, text columns dictionary-encoded), minute rollup
+bars from before the cut-off are dropped (hourly and daily bars are kept), and the
+database is VACUUMed, so the live file stays small enough to sit in the page cache.
+
+A segment file is written first and then listed in archive_segments in the same
+transaction that deletes its rows, so every row is in exactly one tier at any time.
+trade_history() and balance_history() read a time range from both tiers in one read
+transaction and merge them. Totals in account_summary and trade_totals keep counting
+archived rows.
+"""
+
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from storage import DB_PATH, DEFAULT_ACCOUNT, ROLLUP_RESOLUTIONS, TradeStore, to_micros
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION_DAYS = 30
+SEGMENT_ROWS = 1_000_000
+
+# Archived tables and the columns kept for each, in segment order
+SEGMENT_COLUMNS = {
+    'trades': ('id', 'ts', 'pair', 'action', 'price', 'balance', 'account_id'),
+    'balance_snapshots': ('id', 'ts', 'account_id', 'balance'),
+}
+# Names this module gives segment files (and their temporaries); nothing else in the directory is touched
+SEGMENT_NAME = re.compile(rf"({'|'.join(SEGMENT_COLUMNS)})-\d+-\d+\.npz(\.tmp)?")
+# Stored as integer codes into a per-segment array of distinct values
+TEXT_COLUMNS = ('pair', 'action', 'account_id')
+
+
+def archive_dir_for(db_path):
+    """Segment directory that belongs to a database file: forex_trading.db -> forex_trading.archive/."""
+    return os.path.splitext(db_path)[0] + '.archive'
+
+
+def database_path(conn):
+    """File behind a connection's main database."""
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def write_segment(path, columns, rows):
+    """Write rows (tuples in `columns` order) as a compressed columnar segment. Returns its size in bytes."""
+    arrays = {}
+    for name, values in zip(columns, zip(*rows)):
+        if name in TEXT_COLUMNS:
+            distinct, codes = np.unique(np.array(values), return_inverse=True)
+            arrays[name] = codes.astype(np.int32)
+            arrays[name + '_values'] = distinct
+        elif name in ('id', 'ts'):
+            arrays[name] = np.array(values, dtype=np.int64)
+        else:
+            arrays[name] = np.array(values, dtype=np.float64)
+
+    # Written beside the target and renamed into place: a segment is never seen half-written
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(temporary, path)
+    return os.path.getsize(path)
+
+
+def read_segment(path, columns):
+    """{column: array} for a segment; text columns come back as arrays of strings."""
+    with np.load(path, allow_pickle=False) as segment:
+        return {name: segment[name + '_values'][segment[name]] if name in TEXT_COLUMNS else segment[name]
+                for name in columns}
+
+
+class Archiver:
+    """Moves rows older than a cut-off from a TradeStore's database into segment files."""
+
+    def __init__(self, store, archive_dir=None, segment_rows=SEGMENT_ROWS):
+        self.store = store
+        self.archive_dir = archive_dir or archive_dir_for(store.db_path)
+        self.segment_rows = segment_rows
+
+    def _remove_orphans(self):
+        """Delete segment files a crashed run wrote but never listed.
+
+        Only names of the segment form are considered, so pointing archive_dir at a
+        directory that holds other files never removes them.
+        """
+        listed = self.store.archive_segment_names()
+        for name in os.listdir(self.archive_dir):
+            if SEGMENT_NAME.fullmatch(name) and name not in listed:
+                logger.warning(f"Removing unlisted archive file {name}")
+                os.remove(os.path.join(self.archive_dir, name))
+
+    def archive_table(self, source, cutoff):
+        """Move `source` rows with ts < cutoff into segments of at most segment_rows rows.
+
+        Returns (rows, segments, bytes).
+        """
+        columns = SEGMENT_COLUMNS[source]
+        moved = segments = size = 0
+        after_id = 0
+        while True:
+            rows = self.store.rows_to_archive(source, columns, cutoff, after_id, self.segment_rows)
+            if not rows:
+                break
+            first_id, last_id = rows[0][0], rows[-1][0]
+            timestamps = [row[1] for row in rows]
+            name = f"{source}-{first_id}-{last_id}.npz"
+            written = write_segment(os.path.join(self.archive_dir, name), columns, rows)
+            self.store.record_segment(name, source, first_id, last_id, min(timestamps), max(timestamps),
+                                      len(rows), written, cutoff)
+
+            moved += len(rows)
+            segments += 1
+            size += written
+            after_id = last_id
+        return moved, segments, size
+
+    def run(self, cutoff, vacuum=True):
+        """Archive everything older than cutoff (a datetime, ISO string or to_micros() integer).
+
+        Returns a stats dict.
+        """
+        cutoff = to_micros(cutoff)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self._remove_orphans()
+
+        stats = {'segments': 0, 'bytes': 0, 'size_before': os.path.getsize(self.store.db_path)}
+        for source in SEGMENT_COLUMNS:
+            moved, segments, size = self.archive_table(source, cutoff)
+            stats[source] = moved
+            stats['segments'] += segments
+            stats['bytes'] += size
+        # Minute bars that end before the cut-off go too; hourly and daily bars are small and kept
+        finest = ROLLUP_RESOLUTIONS[0]
+        stats['rollups'] = self.store.prune_rollups(finest, cutoff - cutoff % (finest * 1_000_000))
+        if vacuum:
+            self.store.vacuum()
+        stats['size_after'] = os.path.getsize(self.store.db_path)
+        return stats
+
+
+def _cold_rows(conn, source, columns, start, end, archive_dir, filters):
+    """[(id, *columns)] from the segments overlapping [start, end) that match filters {column: value}."""
+    segments = conn.execute('''
+        SELECT name FROM archive_segments
+        WHERE source = ? AND last_ts >= ? AND first_ts < ?
+        ORDER BY first_id
+    ''', (source, start, end)).fetchall()
+
+    needed = ('id',) + columns + tuple(column for column in filters if column not in columns)
+    rows = []
+    for name, in segments:
+        segment = read_segment(os.path.join(archive_dir, name), needed)
+        mask = (segment['ts'] >= start) & (segment['ts'] < end)
+        for column, value in filters.items():
+            mask &= segment[column] == value
+        selected = [segment[column][mask].tolist() for column in ('id',) + columns]
+        rows.extend(zip(*selected))
+    return rows
+
+
+def _history(conn, source, columns, start, end, archive_dir, filters):
+    """Rows of `columns` with start <= ts < end from both tiers, in write (id) order."""
+    start = -2 ** 63 if start is None else to_micros(start)
+    end = 2 ** 63 - 1 if end is None else to_micros(end)
+    if archive_dir is None:
+        archive_dir = archive_dir_for(database_path(conn))
+
+    query = f"SELECT id, {', '.join(columns)} FROM {source} WHERE ts >= ? AND ts < ?"
+    params = [start, end]
+    for column, value in filters.items():
+        query += f" AND {column} = ?"
+        params.append(value)
+
+    # One read transaction: a concurrent archive run either has or has not moved a segment
+    # for both the catalogue and the table
+    outer = not conn.in_transaction
+    if outer:
+        conn.execute("BEGIN")
+    try:
+        cold = _cold_rows(conn, source, columns, start, end, archive_dir, filters)
+        hot = conn.execute(query, params).fetchall()
+    finally:
+        if outer:
+            conn.rollback()
+
+    rows = cold + hot
+    rows.sort(key=lambda row: row[0])
+    return [row[1:] for row in rows]
+
+
+def trade_history(conn, start=None, end=None, pair=None, account_id=None, archive_dir=None):
+    """(ts, pair, action, price, balance, account_id) trades with start <= ts < end, hot and archived.
+
+    start and end may be datetimes, ISO strings or to_micros() integers; None leaves that
+    side open. archive_dir defaults to the one beside the connection's database file.
+    """
+    filters = {}
+    if pair is not None:
+        filters['pair'] = pair
+    if account_id is not None:
+        filters['account_id'] = account_id
+    return _history(conn, 'trades', SEGMENT_COLUMNS['trades'][1:], start, end, archive_dir, filters)
+
+
+def balance_history(conn, start=None, end=None, account_id=DEFAULT_ACCOUNT, archive_dir=None):
+    """(ts, balance) snapshots of one account with start <= ts < end, hot and archived."""
+    return _history(conn, 'balance_snapshots', ('ts', 'balance'), start, end, archive_dir,
+                    {'account_id': account_id})
+
+
+def main(argv=None):
+    """Command-line entry point for the retention job."""
+    parser = argparse.ArgumentParser(description="Move old trades and balance snapshots into archive segments")
+    parser.add_argument('--db', default=DB_PATH, help="Database to archive")
+    parser.add_argument('--days', type=float, default=DEFAULT_RETENTION_DAYS,
+                        help="Keep this many days in the database")
+    parser.add_argument('--before', help="Archive rows before this ISO timestamp instead of using --days")
+    parser.add_argument('--archive-dir', help="Segment directory (default: beside the database)")
+    parser.add_argument('--segment-rows', type=int, default=SEGMENT_ROWS, help="Rows per segment file")
+    parser.add_argument('--no-vacuum', action='store_true', help="Skip the VACUUM after archiving")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    cutoff = args.before or datetime.now() - timedelta(days=args.days)
+    store = TradeStore(args.db)
+    archiver = Archiver(store, archive_dir=args.archive_dir, segment_rows=args.segment_rows)
+    started = time.perf_counter()
+    try:
+        stats = archiver.run(cutoff, vacuum=not args.no_vacuum)
+    except sqlite3.OperationalError as e:
+        print(f"❌ Archive failed: {e}")
+        return 1
+    finally:
+        store.close()
+    elapsed = time.perf_counter() - started
+
+    print("📦 Archive Results")
+    print("=" * 50)
+    print(f"  Cut-off: {cutoff}")
+    print(f"  Trades archived: {stats['trades']:,}  Snapshots archived: {stats['balance_snapshots']:,}  "
+          f"Minute bars dropped: {stats['rollups']:,}")
+    print(f"  Segments written: {stats['segments']} ({stats['bytes'] / 1e6:,.1f} MB) in {archiver.archive_dir}/")
+    print(f"  Database: {stats['size_before'] / 1e6:,.1f} MB → {stats['size_after'] / 1e6:,.1f} MB in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Forex History Backfill
+Downloads a date range of daily USD rates for every currency through Frankfurter's
+time-series endpoint. The range is split into chunks fetched concurrently with
+bounded parallelism and retries; each chunk is bulk-inserted into the compact
+daily_rates table together with a checkpoint row, so an interrupted backfill
+resumes where it stopped. Raw responses can be kept in a cache directory so later
+loads into a fresh database need no network at all.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from price_feed import FRANKFURTER_URL, FeedError, HTTPClient
+from storage import DB_PATH, TradeStore
+
+logger = logging.getLogger(__name__)
+
+# Time-series requests go to the API root: {root}/{start}..{end}?from=USD
+FRANKFURTER_API = FRANKFURTER_URL.rsplit('/', 1)[0]
+DEFAULT_CHUNK_DAYS = 90
+DEFAULT_WORKERS = 8
+EPOCH = date(1970, 1, 1)
+
+
+def epoch_day(day):
+    """Days since 1970-01-01 for a date or ISO date string (the daily_rates day column)."""
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return (day - EPOCH).days
+
+
+def day_to_date(day):
+    """Inverse of epoch_day()."""
+    return EPOCH + timedelta(days=day)
+
+
+def split_range(start, end, chunk_days=DEFAULT_CHUNK_DAYS):
+    """Split [start, end] into consecutive (start, end) date chunks of at most chunk_days days."""
+    chunks = []
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, chunk_start + timedelta(days=chunk_days - 1))
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def build_timeseries_url(api_root, start, end, base='USD', symbols=None):
+    """Build a time-series URL. Without symbols the provider returns every currency it publishes."""
+    url = f"{api_root}/{start.isoformat()}..{end.isoformat()}?from={base}"
+    if symbols:
+        url += f"&to={','.join(symbols)}"
+    return url
+
+
+class Backfill:
+    """Concurrent, resumable time-series download into TradeStore.daily_rates."""
+
+    def __init__(self, store, api_root=FRANKFURTER_API, symbols=None, chunk_days=DEFAULT_CHUNK_DAYS,
+                 workers=DEFAULT_WORKERS, max_retries=4, retry_delay=0.5, cache_dir=None, client=None):
+        self.store = store
+        self.api_root = api_root.rstrip('/')
+        self.symbols = sorted(symbols) if symbols else None
+        self.symbols_key = ','.join(self.symbols) if self.symbols else '*'
+        self.chunk_days = chunk_days
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.cache_dir = cache_dir
+        self.client = client or HTTPClient(max_idle_per_host=workers)
+        self.retries = 0
+
+    def _cache_path(self, start, end):
+        name = f"{start.isoformat()}_{end.isoformat()}_{self.symbols_key.replace(',', '-')}.json"
+        return os.path.join(self.cache_dir, name)
+
+    def fetch_chunk(self, start, end):
+        """Fetch one chunk (from the cache if present), retrying with exponential backoff.
+
+        HTTP errors and bodies that are not valid JSON (an HTML error page, a truncated
+        response) are both retried.
+        """
+        if self.cache_dir:
+            path = self._cache_path(start, end)
+            if os.path.exists(path):
+                with open(path) as f:
+                    return json.load(f), True
+
+        url = build_timeseries_url(self.api_root, start, end, symbols=self.symbols)
+        for attempt in range(self.max_retries + 1):
+            try:
+                data = self.client.get_json(url)
+                break
+            except (FeedError, ValueError) as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning(f"Chunk {start}..{end} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+        if self.cache_dir and end < date.today():
+            # Only closed ranges are cached; the current one still gains days
+            path = self._cache_path(start, end)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(data, f)
+            os.replace(path + '.tmp', path)
+        return data, False
+
+    @staticmethod
+    def rows(data):
+        """(currency, day, rate) rows from a time-series response. Raises ValueError on any other payload."""
+        if not isinstance(data, dict) or not isinstance(data.get('rates', {}), dict):
+            raise ValueError(f"unexpected time-series payload: {str(data)[:80]}")
+        rows = []
+        for day, rates in data.get('rates', {}).items():
+            number = epoch_day(day)
+            rows.extend((currency, number, float(rate)) for currency, rate in rates.items())
+        return rows
+
+    def run(self, start, end):
+        """Backfill [start, end], skipping checkpointed chunks. Returns a stats dict."""
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+        chunks = split_range(start, end, self.chunk_days)
+        done = self.store.completed_chunks(self.symbols_key)
+        pending = [chunk for chunk in chunks if (chunk[0].isoformat(), chunk[1].isoformat()) not in done]
+        stats = {'chunks': len(chunks), 'skipped': len(chunks) - len(pending), 'fetched': 0,
+                 'cached': 0, 'failed': 0, 'rows': 0, 'retries': 0}
+
+        today = date.today()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.fetch_chunk, chunk_start, chunk_end): (chunk_start, chunk_end)
+                       for chunk_start, chunk_end in pending}
+            # Workers only download; this thread is the single database writer
+            for future in as_completed(futures):
+                chunk_start, chunk_end = futures[future]
+                try:
+                    data, from_cache = future.result()
+                    rows = self.rows(data)
+                except (FeedError, ValueError) as e:
+                    # Failed after retries, or a payload without the expected shape
+                    stats['failed'] += 1
+                    logger.error(f"Giving up on chunk {chunk_start}..{chunk_end}: {e}")
+                    continue
+
+                # A range reaching today is incomplete: store it but fetch it again next time
+                checkpoint = None
+                if chunk_end < today:
+                    checkpoint = (chunk_start.isoformat(), chunk_end.isoformat(), self.symbols_key)
+                self.store.write_daily_rates(rows, checkpoint)
+
+                stats['cached' if from_cache else 'fetched'] += 1
+                stats['rows'] += len(rows)
+
+        stats['retries'] = self.retries
+        return stats
+
+
+def main(argv=None):
+    """Command-line entry point for backfilling daily rate history."""
+    parser = argparse.ArgumentParser(description="Backfill daily USD rates into the bot database")
+    parser.add_argument('start', type=date.fromisoformat, help="First date (YYYY-MM-DD)")
+    parser.add_argument('end', type=date.fromisoformat, nargs='?', default=date.today(),
+                        help="Last date (default: today)")
+    parser.add_argument('--symbols', help="Comma-separated currencies (default: every published currency)")
+    parser.add_argument('--api', default=FRANKFURTER_API, help="Time-series API root")
+    parser.add_argument('--db', default=DB_PATH, help="Database to fill")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Concurrent requests")
+    parser.add_argument('--chunk-days', type=int, default=DEFAULT_CHUNK_DAYS, help="Days per request")
+    parser.add_argument('--retries', type=int, default=4, help="Retries per chunk")
+    parser.add_argument('--cache-dir', help="Keep raw responses here and reuse them on later runs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    store = TradeStore(args.db)
+    backfill = Backfill(store, api_root=args.api, symbols=args.symbols.split(',') if args.symbols else None,
+                        chunk_days=args.chunk_days, workers=args.workers, max_retries=args.retries,
+                        cache_dir=args.cache_dir)
+    started = time.perf_counter()
+    try:
+        stats = backfill.run(args.start, args.end)
+    finally:
+        backfill.client.close()
+        store.close()
+    elapsed = time.perf_counter() - started
+
+    print("📥 Backfill Results")
+    print("=" * 50)
+    print(f"  Range: {args.start} → {args.end} in {stats['chunks']} chunks of {args.chunk_days} days")
+    print(f"  Fetched: {stats['fetched']}  From cache: {stats['cached']}  "
+          f"Already stored: {stats['skipped']}  Failed: {stats['failed']}  Retries: {stats['retries']}")
+    print(f"  Rows written: {stats['rows']:,} in {elapsed:.2f}s")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
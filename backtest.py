@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Forex Strategy Backtester
+Replays a historical rate series through the same percent-change BUY/SELL/HOLD
+rule and balance accounting used by ForexTradingBot, vectorized with NumPy so
+years of data evaluate in milliseconds instead of one 60-second cycle at a time.
+"""
+
+import argparse
+import csv
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+# Defaults mirror ForexTradingBot so a backtest reproduces the live strategy
+DEFAULT_BUY_THRESHOLD = 0.05
+DEFAULT_SELL_THRESHOLD = -0.05
+DEFAULT_TRADE_AMOUNT = 100.0
+DEFAULT_INITIAL_BALANCE = 10000.0
+
+
+def load_rates(path):
+    """Load a rate file: a CSV with a date column followed by one USD-based column per pair.
+
+    Empty cells are read as NaN and treated like a pair missing from an API response.
+    Returns (dates, pairs, rates) where rates has shape (ticks, pairs).
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        pairs = header[1:]
+        dates = []
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            dates.append(row[0])
+            rows.append([float(value) if value else np.nan for value in row[1:]])
+
+    rates = np.array(rows, dtype=np.float64).reshape(len(rows), len(pairs))
+    return dates, pairs, rates
+
+
+def save_rates(path, dates, pairs, rates):
+    """Write a rate series in the format read by load_rates."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['date'] + list(pairs))
+        for day, row in zip(dates, rates):
+            writer.writerow([day] + ['' if np.isnan(value) else f"{value:.6f}" for value in row])
+
+
+def generate_rates(pairs=('EUR', 'GBP'), days=2500, seed=42, volatility=0.005,
+                   start=date(2015, 1, 1)):
+    """Generate a reproducible geometric random walk per pair for offline backtests."""
+    start_prices = {'EUR': 0.92, 'GBP': 0.79, 'JPY': 148.0, 'CHF': 0.88, 'CAD': 1.36, 'AUD': 1.52}
+    rng = np.random.default_rng(seed)
+
+    initial = np.array([start_prices.get(pair, 1.0) for pair in pairs])
+    log_returns = rng.normal(0.0, volatility, size=(days, len(pairs)))
+    log_returns[0] = 0.0
+    rates = initial * np.exp(np.cumsum(log_returns, axis=0))
+
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    return dates, list(pairs), rates
+
+
+class BacktestResult:
+    """Trades and balance curve produced by run_backtest."""
+
+    def __init__(self, dates, pairs, initial_balance, trade_ticks, trade_pairs,
+                 trade_actions, trade_prices, trade_balances, balance_curve):
+        self.dates = dates
+        self.pairs = pairs
+        self.initial_balance = initial_balance
+        # One entry per executed BUY/SELL, in the order the live bot would log them
+        self.trade_ticks = trade_ticks
+        self.trade_pairs = trade_pairs
+        self.trade_actions = trade_actions  # +1 = BUY, -1 = SELL
+        self.trade_prices = trade_prices
+        self.trade_balances = trade_balances
+        # Balance at the end of every tick
+        self.balance_curve = balance_curve
+
+    @property
+    def trades(self):
+        """Trade list as (date, pair, action, price, balance) rows, like the trades table."""
+        return [
+            (self.dates[tick], self.pairs[pair], 'BUY' if action > 0 else 'SELL', price, balance)
+            for tick, pair, action, price, balance in zip(
+                self.trade_ticks.tolist(), self.trade_pairs.tolist(), self.trade_actions.tolist(),
+                self.trade_prices.tolist(), self.trade_balances.tolist())
+        ]
+
+    def summary(self):
+        """Summary statistics in the same shape the dashboards use."""
+        final_balance = float(self.balance_curve[-1]) if len(self.balance_curve) else self.initial_balance
+        running_max = np.maximum.accumulate(self.balance_curve) if len(self.balance_curve) else np.array([1.0])
+        drawdown = (running_max - self.balance_curve) / np.where(running_max > 0, running_max, 1.0)
+
+        return {
+            'ticks': len(self.balance_curve),
+            'total_trades': int(len(self.trade_actions)),
+            'buy_trades': int(np.count_nonzero(self.trade_actions > 0)),
+            'sell_trades': int(np.count_nonzero(self.trade_actions < 0)),
+            'initial_balance': self.initial_balance,
+            'current_balance': round(final_balance, 2),
+            'total_profit_loss': round(final_balance - self.initial_balance, 2),
+            'max_drawdown_pct': round(float(drawdown.max()) * 100, 3) if len(drawdown) else 0.0,
+        }
+
+
+def run_backtest(rates, pairs, dates=None, buy_threshold=DEFAULT_BUY_THRESHOLD,
+                 sell_threshold=DEFAULT_SELL_THRESHOLD, trade_amount=DEFAULT_TRADE_AMOUNT,
+                 initial_balance=DEFAULT_INITIAL_BALANCE, noise=0.0, seed=None, fill_model=None):
+    """Evaluate the momentum rule over a whole rate series in one vectorized pass.
+
+    Each row of `rates` is one trading cycle. As in analyze_and_trade, a pair's change is
+    measured against the last price seen for it, BUY costs trade_amount / price, SELL earns
+    trade_amount / price (a unit of the currency is worth 1 / price USD), and the balance is
+    floored at zero after every step.
+
+    fill_model (see execution.py) prices every fill in one vectorized call, the way the
+    bot does: BUYs at the ask and SELLs at the bid of the inverse quote, using the rate
+    fill_model.latency_ticks ticks after the decision. Without one, trades fill at the
+    mid price. noise adds uniform ±noise dollars per step, seeded by `seed`.
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    if rates.ndim == 1:
+        rates = rates[:, None]
+    ticks, n_pairs = rates.shape
+    if dates is None:
+        dates = list(range(ticks))
+
+    valid = np.isfinite(rates) & (rates > 0)
+    safe_rates = np.where(valid, rates, 1.0)
+
+    # Index of the most recent valid observation strictly before each tick
+    observed = np.where(valid, np.arange(ticks)[:, None], -1)
+    last_seen = np.maximum.accumulate(observed, axis=0)
+    prev_index = np.vstack([np.full((1, n_pairs), -1), last_seen[:-1]])
+    has_prev = valid & (prev_index >= 0)
+    prev_rates = np.take_along_axis(safe_rates, np.maximum(prev_index, 0), axis=0)
+
+    change_pct = (safe_rates - prev_rates) / prev_rates * 100
+    buy = has_prev & (change_pct > buy_threshold)
+    sell = has_prev & (change_pct < sell_threshold)
+
+    # Balance deltas per (tick, pair) plus a trailing SYSTEM column for the per-cycle update
+    deltas = np.zeros((ticks, n_pairs + 1))
+    if fill_model is None:
+        deltas[:, :n_pairs] = np.where(buy, -trade_amount, 0.0) / safe_rates
+        deltas[:, :n_pairs] += np.where(sell, trade_amount, 0.0) / safe_rates
+    else:
+        # Row-major order matches the order the live bot fills in (and draws its slippage)
+        order_ticks, order_pairs = np.nonzero(buy | sell)
+        fill_ticks = np.minimum(order_ticks + fill_model.latency_ticks, ticks - 1)
+        latest_rates = np.take_along_axis(safe_rates, np.maximum(last_seen, 0), axis=0)
+        mid = latest_rates[fill_ticks, order_pairs]
+        is_buy = buy[order_ticks, order_pairs]
+        fills = fill_model.fill_prices(np.where(is_buy, 1.0, -1.0), 1.0 / mid, np.full(len(mid), trade_amount),
+                                       fill_model.spreads(pairs)[order_pairs])
+        deltas[order_ticks, order_pairs] = np.where(is_buy, -trade_amount, trade_amount) * fills
+
+    steps_mask = np.zeros((ticks, n_pairs + 1), dtype=bool)
+    steps_mask[:, :n_pairs] = buy | sell
+    steps_mask[:, n_pairs] = valid.any(axis=1)
+
+    # Row-major flattening preserves the live order: pairs in order, then the balance update
+    steps = deltas[steps_mask]
+    if noise:
+        rng = np.random.default_rng(seed)
+        steps = steps + rng.uniform(-noise, noise, size=steps.shape)
+
+    # Balance floored at zero after every step: a reflected random walk, solved without a loop
+    running = initial_balance + np.cumsum(steps)
+    balances = running - np.minimum(0.0, np.minimum.accumulate(running))
+
+    step_ticks, step_columns = np.nonzero(steps_mask)
+    is_trade = step_columns < n_pairs
+
+    steps_per_tick = np.bincount(step_ticks, minlength=ticks)
+    with_initial = np.concatenate([[initial_balance], balances])
+    balance_curve = with_initial[np.cumsum(steps_per_tick)]
+
+    trade_ticks = step_ticks[is_trade]
+    trade_pairs = step_columns[is_trade]
+    trade_actions = np.where(buy[trade_ticks, trade_pairs], 1, -1).astype(np.int8)
+
+    return BacktestResult(
+        dates=dates,
+        pairs=list(pairs),
+        initial_balance=initial_balance,
+        trade_ticks=trade_ticks,
+        trade_pairs=trade_pairs,
+        trade_actions=trade_actions,
+        trade_prices=rates[trade_ticks, trade_pairs],
+        trade_balances=balances[is_trade],
+        balance_curve=balance_curve,
+    )
+
+
+def main(argv=None):
+    """Command-line entry point for running a backtest."""
+    parser = argparse.ArgumentParser(description="Backtest the Forex momentum strategy on historical rates")
+    parser.add_argument('rates_file', nargs='?',
+                        help="CSV rate file (date column + one column per pair), or a database filled by backfill.py")
+    parser.add_argument('--generate', type=int, metavar='DAYS',
+                        help="Generate a synthetic rate file with this many days instead of loading one")
+    parser.add_argument('--pairs', default='EUR,GBP', help="Pairs for generated data (default: EUR,GBP)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for generated data")
+    parser.add_argument('--buy-threshold', type=float, default=DEFAULT_BUY_THRESHOLD)
+    parser.add_argument('--sell-threshold', type=float, default=DEFAULT_SELL_THRESHOLD)
+    parser.add_argument('--trade-amount', type=float, default=DEFAULT_TRADE_AMOUNT)
+    parser.add_argument('--initial-balance', type=float, default=DEFAULT_INITIAL_BALANCE)
+    parser.add_argument('--costs', action='store_true',
+                        help="Fill through the bot's spread/slippage model instead of at the mid price")
+    parser.add_argument('--latency', type=int, default=0, metavar='TICKS',
+                        help="With --costs, fill this many ticks after the decision")
+    parser.add_argument('--show-trades', type=int, default=10, metavar='N',
+                        help="Print the last N trades (default: 10)")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        dates, pairs, rates = generate_rates(args.pairs.split(','), args.generate, seed=args.seed)
+        if args.rates_file:
+            save_rates(args.rates_file, dates, pairs, rates)
+            print(f"💾 Saved {len(dates)} days of generated rates to {args.rates_file}")
+    elif args.rates_file and args.rates_file.endswith('.db'):
+        from rate_cache import load_cached_rates
+        dates, pairs, rates = load_cached_rates(args.rates_file)
+    elif args.rates_file:
+        dates, pairs, rates = load_rates(args.rates_file)
+    else:
+        parser.error("a rates file or --generate is required")
+
+    fill_model = None
+    if args.costs:
+        from execution import SpreadSlippageModel
+        fill_model = SpreadSlippageModel(latency_ticks=args.latency, seed=args.seed)
+
+    start = time.perf_counter()
+    result = run_backtest(
+        rates, pairs, dates=dates,
+        buy_threshold=args.buy_threshold,
+        sell_threshold=args.sell_threshold,
+        trade_amount=args.trade_amount,
+        initial_balance=args.initial_balance,
+        fill_model=fill_model,
+    )
+    elapsed = time.perf_counter() - start
+
+    print("📈 Backtest Results")
+    print("=" * 50)
+    print(f"  Pairs: {', '.join(pairs)}")
+    print(f"  Period: {dates[0]} → {dates[-1]} ({len(dates)} ticks)")
+    for key, value in result.summary().items():
+        print(f"  {key.replace('_', ' ').title()}: {value}")
+    print(f"  Evaluated in {elapsed * 1000:.1f} ms")
+
+    if args.show_trades:
+        print()
+        print(f"🧾 Last {args.show_trades} trades:")
+        for day, pair, action, price, balance in result.trades[-args.show_trades:]:
+            print(f"  {day}  {action:<4} {pair}  at {price:.5f}  balance ${balance:,.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Archive Benchmark
+Fills a database with a bot-like history (a balance heartbeat and a price tick per
+pair every minute, trades on a fraction of ticks), runs the retention job over it and
+reports the database size before and after, the segment sizes, and the time to read
+a recent day (hot rows only) and an old month (cold segments) through trade_history().
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from archive import Archiver, balance_history, trade_history  # noqa: E402
+from storage import TradeStore, connect  # noqa: E402
+
+PAIRS = ['EUR', 'GBP', 'JPY']
+
+
+def fill(store, days, trade_rate, seed=7):
+    """Write `days` days of one-minute cycles, one day per transaction. Returns the last timestamp."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    balance = 10000.0
+    for day in range(days):
+        trades, balances, prices = [], [], []
+        for minute in range(1440):
+            timestamp = start + timedelta(days=day, minutes=minute)
+            for pair in PAIRS:
+                price = 1.0 + rng.random() / 10
+                prices.append((timestamp, pair, price))
+                if rng.random() < trade_rate:
+                    balance += rng.uniform(-5, 5)
+                    trades.append((timestamp, pair, rng.choice(('BUY', 'SELL')), price, balance, 'default'))
+            balances.append((timestamp, balance, 'default'))
+        store.write_many(trades, balances, (), prices)
+    return start + timedelta(days=days)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the retention job and the hot/cold query layer")
+    parser.add_argument('--days', type=int, default=365, help="Days of history")
+    parser.add_argument('--keep', type=int, default=30, help="Days kept in the database")
+    parser.add_argument('--trade-rate', type=float, default=0.1, help="Chance of a trade per pair per minute")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        store = TradeStore(db_path)
+        print(f"📦 Writing {args.days} days of one-minute history...")
+        end = fill(store, args.days, args.trade_rate)
+
+        started = time.perf_counter()
+        stats = Archiver(store).run(end - timedelta(days=args.keep))
+        elapsed = time.perf_counter() - started
+        store.close()
+
+        print(f"🧊 Archived {stats['trades']:,} trades and {stats['balance_snapshots']:,} snapshots "
+              f"into {stats['segments']} segments in {elapsed:.1f}s")
+        print(f"  Database: {stats['size_before'] / 1e6:,.1f} MB → {stats['size_after'] / 1e6:,.1f} MB")
+        print(f"  Segments: {stats['bytes'] / 1e6:,.1f} MB, minute bars dropped: {stats['rollups']:,}")
+
+        conn = connect(db_path)
+        queries = (
+            ('last day (hot)', lambda: trade_history(conn, end - timedelta(days=1), end)),
+            ('old month (cold)', lambda: trade_history(conn, end - timedelta(days=args.days),
+                                                       end - timedelta(days=args.days - 30))),
+            ('old month, EUR', lambda: trade_history(conn, end - timedelta(days=args.days),
+                                                     end - timedelta(days=args.days - 30), pair='EUR')),
+            ('all balances', lambda: balance_history(conn)),
+        )
+        for label, query in queries:
+            elapsed, rows = timed(query)
+            print(f"  {label:<17} {elapsed:10.2f} ms  {len(rows):>9,} rows")
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
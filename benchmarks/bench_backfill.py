@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Backfill Benchmark
+Starts a local stand-in for Frankfurter's time-series endpoint (synthetic weekday
+rates, configurable latency and error rate) and times a ten-year, 30-currency
+backfill three ways: a cold download, a resumed run over the same database, and a
+load into a fresh database from the response cache.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from backfill import Backfill  # noqa: E402
+from backtest import generate_rates  # noqa: E402
+from storage import TradeStore  # noqa: E402
+
+CURRENCIES = ['EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD', 'NZD', 'SEK', 'NOK', 'DKK',
+              'SGD', 'HKD', 'CNY', 'MXN', 'PLN', 'CZK', 'HUF', 'TRY', 'ZAR', 'BRL',
+              'INR', 'KRW', 'IDR', 'ILS', 'ISK', 'MYR', 'PHP', 'THB', 'RON', 'BGN']
+
+
+class StandInServer:
+    """Frankfurter-style /{start}..{end}?from=USD&to=... server over generated rates."""
+
+    def __init__(self, start, end, latency=0.05, error_rate=0.0, seed=5):
+        days = (end - start).days + 1
+        self.start = start
+        _, _, self.rates = generate_rates(CURRENCIES, days, seed=seed, start=start)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.latency)
+                if server.rng.random() < server.error_rate:
+                    server.errors += 1
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                parts = urllib.parse.urlsplit(self.path)
+                first, last = (date.fromisoformat(d) for d in parts.path.strip('/').split('..'))
+                query = urllib.parse.parse_qs(parts.query)
+                symbols = query['to'][0].split(',') if 'to' in query else CURRENCIES
+                body = json.dumps(server.series(first, last, symbols)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def series(self, first, last, symbols):
+        columns = [CURRENCIES.index(symbol) for symbol in symbols]
+        rates = {}
+        day = first
+        while day <= last:
+            if day.weekday() < 5:
+                row = self.rates[(day - self.start).days]
+                rates[day.isoformat()] = {CURRENCIES[i]: round(float(row[i]), 6) for i in columns}
+            day += timedelta(days=1)
+        return {'amount': 1.0, 'base': 'USD', 'start_date': first.isoformat(),
+                'end_date': last.isoformat(), 'rates': rates}
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def timed_run(db_path, server, start, end, args, cache_dir):
+    store = TradeStore(db_path)
+    backfill = Backfill(store, api_root=server.url, chunk_days=args.chunk_days, workers=args.workers,
+                        retry_delay=0.05, cache_dir=cache_dir)
+    started = time.perf_counter()
+    try:
+        stats = backfill.run(start, end)
+    finally:
+        backfill.client.close()
+        store.close()
+    return time.perf_counter() - started, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the concurrent history backfill")
+    parser.add_argument('--years', type=int, default=10, help="Years of history")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent requests")
+    parser.add_argument('--chunk-days', type=int, default=90, help="Days per request")
+    parser.add_argument('--latency', type=float, default=0.05, help="Stand-in server latency per request (s)")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="Fraction of requests answered with 503")
+    args = parser.parse_args(argv)
+
+    # Injected errors are retried; only report chunks that are given up on
+    logging.getLogger('backfill').setLevel(logging.ERROR)
+
+    end = date(2024, 12, 31)
+    start = end - timedelta(days=365 * args.years)
+    server = StandInServer(start, end, latency=args.latency, error_rate=args.error_rate)
+
+    print("📥 Backfill Benchmark")
+    print("=" * 50)
+    print(f"  {start} → {end}, {len(CURRENCIES)} currencies, {args.workers} workers, "
+          f"{args.latency * 1000:.0f} ms latency, {args.error_rate:.0%} errors")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            runs = (
+                ('cold', os.path.join(tmp, 'a.db')),
+                ('resume', os.path.join(tmp, 'a.db')),
+                ('from cache', os.path.join(tmp, 'b.db')),
+            )
+            for label, db_path in runs:
+                elapsed, stats = timed_run(db_path, server, start, end, args, cache_dir)
+                print(f"  {label:<11} {elapsed:6.2f}s  rows {stats['rows']:>7,}  fetched {stats['fetched']:>3}  "
+                      f"cached {stats['cached']:>3}  skipped {stats['skipped']:>3}  retries {stats['retries']}")
+    finally:
+        server.close()
+    print(f"  Server: {server.requests} requests, {server.errors} injected errors")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Dashboard Query Benchmark
+Builds a database in the old layout (ISO-8601 TEXT timestamps, no secondary
+indexes) holding a large trade history, times the dashboards' original queries
+on it, migrates it in place with TradeStore and times the replacements, which
+read the covering indexes, the summary tables and the balance rollups.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from storage import (TradeStore, balance_series, latest_balance, recent_trades,  # noqa: E402
+                     rollup_history, trade_counts)
+
+PAIRS = ['EUR', 'GBP', 'JPY']
+
+LEGACY_QUERIES = (
+    ('recent trades', """SELECT timestamp, pair, action, price, balance FROM trades
+                         WHERE pair != 'SYSTEM' ORDER BY timestamp DESC LIMIT 50"""),
+    ('trade counts', "SELECT COUNT(*) FROM trades WHERE pair != 'SYSTEM'"),
+    ('buy count', "SELECT COUNT(*) FROM trades WHERE action = 'BUY' AND pair != 'SYSTEM'"),
+    ('sell count', "SELECT COUNT(*) FROM trades WHERE action = 'SELL' AND pair != 'SYSTEM'"),
+    ('latest balance', "SELECT balance FROM balances ORDER BY timestamp DESC LIMIT 1"),
+    ('balance chart', "SELECT timestamp, balance FROM balances ORDER BY timestamp ASC"),
+)
+CHART_WIDTH = 1200
+
+
+def legacy_rows(rows):
+    """A bot-like history: per cycle, one trade per pair followed by a SYSTEM balance update."""
+    start = datetime(2020, 1, 1)
+    per_cycle = len(PAIRS) + 1
+    for i in range(rows):
+        timestamp = (start + timedelta(seconds=i // per_cycle, microseconds=i % per_cycle)).isoformat()
+        slot = i % per_cycle
+        if slot == len(PAIRS):
+            yield timestamp, 'SYSTEM', 'BALANCE_UPDATE', 0.0, 10000.0
+        else:
+            yield timestamp, PAIRS[slot], 'BUY' if (i // per_cycle) % 2 else 'SELL', 1.0 + (i % 100) / 1000, 10000.0
+
+
+def build_legacy(db_path, rows):
+    """The schema as it was before versioning: TEXT timestamps and no indexes on trades."""
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute('''
+            CREATE TABLE trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                pair TEXT NOT NULL,
+                action TEXT NOT NULL,
+                price REAL NOT NULL,
+                balance REAL NOT NULL,
+                account_id TEXT NOT NULL DEFAULT 'default'
+            )
+        ''')
+        conn.execute("CREATE TABLE balances (timestamp TEXT PRIMARY KEY, balance REAL NOT NULL)")
+        conn.executemany("INSERT INTO trades (timestamp, pair, action, price, balance) VALUES (?, ?, ?, ?, ?)",
+                         legacy_rows(rows))
+        conn.execute('''
+            INSERT INTO balances (timestamp, balance)
+            SELECT timestamp, balance FROM trades WHERE pair = 'SYSTEM'
+        ''')
+    conn.close()
+
+
+def timed(function, repeat):
+    """Best wall time of `repeat` calls, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard queries before and after the schema migration")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Trade rows in the database")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per query (best is reported)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'legacy.db')
+        print(f"📦 Building a legacy database with {args.rows:,} trade rows...")
+        build_legacy(db_path, args.rows)
+
+        print("🐢 Before (TEXT timestamps, no indexes)")
+        conn = sqlite3.connect(db_path)
+        before = 0.0
+        for label, query in LEGACY_QUERIES:
+            elapsed = timed(lambda: conn.execute(query).fetchall(), args.repeat)
+            before += elapsed
+            print(f"  {label:<15} {elapsed:10.2f} ms")
+        conn.close()
+
+        start = time.perf_counter()
+        TradeStore(db_path).close()
+        print(f"🔧 Migrated in place in {time.perf_counter() - start:.1f}s")
+
+        print("🚀 After (integer timestamps, covering indexes, summary tables, rollups)")
+        conn = sqlite3.connect(db_path)
+        queries = (
+            ('recent trades', lambda: recent_trades(conn, 50)),
+            ('trade counts', lambda: trade_counts(conn)),
+            ('latest balance', lambda: latest_balance(conn)),
+            ('balance chart', lambda: rollup_history(conn, balance_series(), CHART_WIDTH)),
+            ('recent EUR', lambda: recent_trades(conn, 50, pair='EUR')),
+        )
+        after = 0.0
+        for label, query in queries[:4]:
+            elapsed = timed(query, args.repeat)
+            after += elapsed
+            print(f"  {label:<15} {elapsed:10.2f} ms")
+        print(f"  {queries[4][0]:<15} {timed(queries[4][1], args.repeat):10.2f} ms")
+        resolution, bars = rollup_history(conn, balance_series(), CHART_WIDTH)
+        print(f"  Chart {CHART_WIDTH} px wide: {len(bars):,} bars of {resolution}s")
+        conn.close()
+
+    print(f"  Dashboard refresh: {before:,.1f} ms → {after:,.1f} ms ({before / after:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Hot Path Stress Benchmark
+Drives the unchanged ForexTradingBot loop from the synthetic tick feed on a simulated
+clock and reports end-to-end ticks/sec, per-tick latency of the trading cycle and
+write-behind queue behaviour, next to the raw generator throughput.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bot import ForexTradingBot  # noqa: E402
+from clock import SimulatedClock  # noqa: E402
+from price_feed import percentile  # noqa: E402
+from synthetic_feed import START_PRICES, SyntheticFeed  # noqa: E402
+
+
+def bench_generator(currencies, ticks):
+    """Ticks/sec for block generation and for poll() responses."""
+    feed = SyntheticFeed(currencies, seed=1)
+    start = time.perf_counter()
+    feed.generate(ticks)
+    generated = ticks / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        feed.poll()
+    polled = ticks / (time.perf_counter() - start)
+    return generated, polled
+
+
+def bench_bot(currencies, ticks, db_path, jump_intensity):
+    """Run the bot over `ticks` synthetic ticks; returns (elapsed, per-tick samples, bot)."""
+    clock = SimulatedClock()
+    feed = SyntheticFeed(currencies, volatility=5e-4, jump_intensity=jump_intensity,
+                         rate=1000, ticks=ticks, clock=clock, seed=2)
+    bot = ForexTradingBot(db_path=db_path, clock=clock, seed=3, feed=feed)
+    bot.cycle_interval = 0
+
+    samples = []
+    trade_on_prices = bot.trade_on_prices
+
+    def timed(prices):
+        start = time.perf_counter()
+        trade_on_prices(prices)
+        samples.append(time.perf_counter() - start)
+
+    bot.trade_on_prices = timed
+    writer_stats = {}
+    close_writer = bot.writer.close
+
+    def close_and_record():
+        close_writer()
+        writer_stats.update(bot.writer.stats())
+
+    bot.writer.close = close_and_record
+
+    start = time.perf_counter()
+    bot.run(cycles=ticks)
+    return time.perf_counter() - start, samples, bot, writer_stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress the bot's hot path with synthetic ticks")
+    parser.add_argument('--currencies', type=int, default=len(START_PRICES), help="Number of currencies")
+    parser.add_argument('--ticks', type=int, default=20_000, help="Ticks to push through the bot")
+    parser.add_argument('--jumps', type=float, default=0.001, help="Jump probability per tick")
+    args = parser.parse_args(argv)
+
+    # Per-pair log lines would dominate; keep only warnings and errors
+    logging.getLogger('bot').setLevel(logging.WARNING)
+
+    currencies = list(START_PRICES)[:args.currencies]
+    currencies += [f"X{i:02d}" for i in range(args.currencies - len(currencies))]
+
+    print("🔥 Hot Path Stress Benchmark")
+    print("=" * 50)
+    generated, polled = bench_generator(currencies, 200_000)
+    print(f"  Generator: {generated:,.0f} ticks/sec (blocks), {polled:,.0f} ticks/sec (poll)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        elapsed, samples, bot, writer = bench_bot(currencies, args.ticks, os.path.join(tmp, 'stress.db'), args.jumps)
+
+    ordered = sorted(samples)
+    print(f"  Bot: {args.ticks:,} ticks x {len(currencies)} currencies in {elapsed:.2f}s "
+          f"({args.ticks / elapsed:,.0f} ticks/sec)")
+    print(f"  Trading cycle: p50 {percentile(ordered, 50) * 1e6:,.0f} µs  "
+          f"p99 {percentile(ordered, 99) * 1e6:,.0f} µs  max {ordered[-1] * 1e6:,.0f} µs")
+    print(f"  Trades: {bot.trade_count:,}  Final balance: ${bot.simulated_balance:,.2f}")
+    print(f"  Write-behind: {writer['written']:,} written in {writer['batches']:,} batches, "
+          f"max queue depth {writer['max_depth']:,}, blocked puts {writer['blocked_puts']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Order Book Benchmark
+Rests 100k limit, stop and take-profit orders across 30 pairs, then feeds random-walk
+ticks for every pair and measures per-tick matching time with the heap-indexed
+OrderBook against a scan over every resting order.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from orders import ORDER_TYPES, TRIGGERS_ON_RISE, OrderBook  # noqa: E402
+from price_feed import percentile  # noqa: E402
+
+
+def build_book(pairs, orders, rng):
+    """Rest `orders` random orders up to 5% away from the starting price of 1.0 and return the book.
+
+    Levels are on the untriggered side, so orders fill as the walk reaches them.
+    """
+    book = OrderBook()
+    for _ in range(orders):
+        pair = rng.choice(pairs)
+        side = rng.choice(('BUY', 'SELL'))
+        order_type = rng.choice(ORDER_TYPES)
+        distance = rng.uniform(0.0001, 0.05)
+        book.place(pair, side, order_type, 1.0 + distance if TRIGGERS_ON_RISE[(side, order_type)] else 1.0 - distance)
+    return book
+
+
+def bench_heap(book, pairs, ticks, rng):
+    """Per-tick time (all pairs) with OrderBook.on_prices."""
+    prices = {pair: 1.0 for pair in pairs}
+    samples = []
+    triggered = 0
+    for _ in range(ticks):
+        for pair in pairs:
+            prices[pair] *= 1 + rng.gauss(0, 0.0005)
+        values = [prices[pair] for pair in pairs]
+        start = time.perf_counter()
+        triggered += len(book.on_prices(pairs, values))
+        samples.append(time.perf_counter() - start)
+    return samples, triggered
+
+
+def bench_scan(book, pairs, ticks, rng):
+    """Per-tick time checking every resting order against its pair's price."""
+    resting = [(order, order.triggers_on_rise) for order in book.orders()]
+    prices = {pair: 1.0 for pair in pairs}
+    samples = []
+    triggered = 0
+    for _ in range(ticks):
+        for pair in pairs:
+            prices[pair] *= 1 + rng.gauss(0, 0.0005)
+        start = time.perf_counter()
+        remaining = []
+        for order, on_rise in resting:
+            price = prices[order.pair]
+            if (price >= order.level) if on_rise else (price <= order.level):
+                triggered += 1
+            else:
+                remaining.append((order, on_rise))
+        resting = remaining
+        samples.append(time.perf_counter() - start)
+    return samples, triggered
+
+
+def report(label, samples, triggered):
+    ordered = sorted(samples)
+    print(f"  {label:<12} p50 {percentile(ordered, 50) * 1000:7.3f} ms  "
+          f"p99 {percentile(ordered, 99) * 1000:7.3f} ms  max {ordered[-1] * 1000:7.3f} ms  "
+          f"triggered {triggered:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark order-book trigger matching")
+    parser.add_argument('--orders', type=int, default=100_000, help="Resting orders")
+    parser.add_argument('--pairs', type=int, default=30, help="Number of pairs")
+    parser.add_argument('--ticks', type=int, default=1000, help="Ticks to feed (each moves every pair)")
+    parser.add_argument('--scan-ticks', type=int, default=50, help="Ticks for the (slow) full-scan baseline")
+    parser.add_argument('--seed', type=int, default=7, help="Random seed")
+    args = parser.parse_args(argv)
+
+    pairs = [f"P{i:02d}" for i in range(args.pairs)]
+
+    print("📚 Order Book Benchmark")
+    print("=" * 50)
+    print(f"  {args.orders:,} resting orders over {args.pairs} pairs, {args.ticks:,} ticks "
+          f"({args.scan_ticks:,} for the full scan)")
+
+    start = time.perf_counter()
+    book = build_book(pairs, args.orders, random.Random(args.seed))
+    print(f"  Placed in {time.perf_counter() - start:.2f}s")
+
+    report("heap", *bench_heap(book, pairs, args.ticks, random.Random(args.seed + 1)))
+    scan_book = build_book(pairs, args.orders, random.Random(args.seed))
+    report("full scan", *bench_scan(scan_book, pairs, args.scan_ticks, random.Random(args.seed + 1)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
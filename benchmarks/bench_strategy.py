@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Strategy Decision Benchmark
+Time per cycle against the number of pairs: the original per-pair Python threshold
+loop versus one vectorized MomentumStrategy.decide() call, both for the decision
+alone and for the whole cycle with the bot's logging and order dispatch, where the
+vectorized path only visits the pairs that trade.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from strategies import ACTION_NAMES, MomentumStrategy, percent_change  # noqa: E402
+
+logger = logging.getLogger('bench_strategy')
+
+
+def loop_decide(pairs, current_prices, previous_prices, buy_threshold=0.05, sell_threshold=-0.05):
+    """The original analyze_and_trade decision loop, without logging or execution."""
+    actions = {}
+    for pair in pairs:
+        current_price = current_prices[pair]
+        previous_price = previous_prices[pair]
+        price_change_pct = ((current_price - previous_price) / previous_price) * 100
+        action = "HOLD"
+        if price_change_pct > buy_threshold:
+            action = "BUY"
+        elif price_change_pct < sell_threshold:
+            action = "SELL"
+        actions[pair] = action
+    return actions
+
+
+def loop_cycle(pairs, current_prices, previous_prices, execute, buy_threshold=0.05, sell_threshold=-0.05):
+    """The original loop with its log line per pair and an order for every BUY/SELL."""
+    for pair in pairs:
+        current_price = current_prices[pair]
+        previous_price = previous_prices[pair]
+        price_change_pct = ((current_price - previous_price) / previous_price) * 100
+        action = "HOLD"
+        if price_change_pct > buy_threshold:
+            action = "BUY"
+        elif price_change_pct < sell_threshold:
+            action = "SELL"
+        logger.info(f"{pair}: Price change {price_change_pct:.3f}% - {action}")
+        if action != "HOLD":
+            execute(pair, action, current_price)
+
+
+def vector_cycle(strategy, pairs, prices, previous, current_prices, execute):
+    """ForexTradingBot.trade_on_prices: one decide() call, then only the non-HOLD pairs."""
+    actions = strategy.decide(pairs, prices, previous)
+    change_pct = percent_change(prices, previous)
+    for i in np.flatnonzero(actions).tolist():
+        pair = pairs[i]
+        action = ACTION_NAMES[int(actions[i])]
+        logger.info(f"{pair}: Price change {change_pct[i]:.3f}% - {action}")
+        execute(pair, action, current_prices[pair])
+
+
+def per_cycle(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark strategy decision time per cycle")
+    parser.add_argument('--pair-counts', default='2,10,30,100,300,1000')
+    parser.add_argument('--repeats', type=int, default=2000)
+    parser.add_argument('--volatility', type=float, default=0.0003,
+                        help="Standard deviation of the per-cycle price change (0.0003 = 0.03%%)")
+    args = parser.parse_args(argv)
+
+    # Log lines are formatted and written as the bot's are, to a sink instead of a file
+    handler = logging.FileHandler(os.devnull)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    rng = np.random.default_rng(0)
+    strategy = MomentumStrategy()
+    orders = []
+
+    def execute(pair, action, price):
+        orders.append((pair, action, price))
+
+    print(f"{'Pairs':>6}  {'Trading':>7}  {'Decide: loop':>12}  {'vector':>9}  {'speedup':>7}  "
+          f"{'Cycle: loop':>11}  {'vector':>9}  {'speedup':>7}")
+    print("-" * 86)
+    for count in (int(value) for value in args.pair_counts.split(',')):
+        pairs = [f"C{i:03d}" for i in range(count)]
+        previous = rng.uniform(0.5, 150.0, count)
+        prices = previous * (1 + rng.normal(0, args.volatility, count))
+        previous_dict = dict(zip(pairs, previous.tolist()))
+        prices_dict = dict(zip(pairs, prices.tolist()))
+        trading = np.count_nonzero(strategy.decide(pairs, prices, previous)) / count
+
+        loop_time = per_cycle(lambda: loop_decide(pairs, prices_dict, previous_dict), args.repeats)
+        vector_time = per_cycle(lambda: strategy.decide(pairs, prices, previous), args.repeats)
+        loop_cycle_time = per_cycle(lambda: loop_cycle(pairs, prices_dict, previous_dict, execute), args.repeats)
+        vector_cycle_time = per_cycle(
+            lambda: vector_cycle(strategy, pairs, prices, previous, prices_dict, execute), args.repeats)
+        orders.clear()
+
+        print(f"{count:>6}  {trading:>6.0%}  {loop_time * 1e6:>9.1f} µs  {vector_time * 1e6:>6.1f} µs  "
+              f"{loop_time / vector_time:>6.1f}x  {loop_cycle_time * 1e6:>8.1f} µs  "
+              f"{vector_cycle_time * 1e6:>6.1f} µs  {loop_cycle_time / vector_cycle_time:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Trade Logging Benchmark
+Compares the old per-trade logging (new connection, two inserts, commit, close)
+with the long-lived WAL TradeStore and per-cycle group commit, on databases that
+already hold a large trade history.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from storage import TradeStore, to_micros  # noqa: E402
+
+PAIRS = ['EUR', 'GBP', 'JPY']
+
+
+def prefill(db_path, rows):
+    """Create the schema and load `rows` historical trades in one transaction."""
+    TradeStore(db_path).close()
+    conn = sqlite3.connect(db_path)
+    start = datetime(2020, 1, 1)
+    with conn:
+        conn.executemany(
+            "INSERT INTO trades (ts, pair, action, price, balance) VALUES (?, ?, ?, ?, ?)",
+            ((
+                to_micros(start + timedelta(seconds=i)),
+                PAIRS[i % len(PAIRS)],
+                'BUY' if i % 2 else 'SELL',
+                1.0 + (i % 100) / 1000,
+                10000.0,
+            ) for i in range(rows)),
+        )
+        conn.executemany(
+            "INSERT INTO balance_snapshots (ts, balance) VALUES (?, ?)",
+            ((to_micros(start + timedelta(seconds=i, microseconds=1)), 10000.0) for i in range(rows)),
+        )
+    # Hand the file back in the default rollback-journal mode, as the old bot found it
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+
+def trade_records(count):
+    now = datetime.now()
+    return [
+        ((now + timedelta(microseconds=i)).isoformat(), PAIRS[i % len(PAIRS)], 'BUY', 1.1, 10000.0 - i)
+        for i in range(count)
+    ]
+
+
+def bench_before(db_path, trades):
+    """The original execute_trade: a fresh connection and commit for every trade."""
+    records = trade_records(trades)
+    start = time.perf_counter()
+    for timestamp, pair, action, price, balance in records:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        ts = to_micros(timestamp)
+        cursor.execute(
+            "INSERT INTO trades (ts, pair, action, price, balance) VALUES (?, ?, ?, ?, ?)",
+            (ts, pair, action, price, balance))
+        cursor.execute("INSERT INTO balance_snapshots (ts, balance) VALUES (?, ?)", (ts, balance))
+        conn.commit()
+        conn.close()
+    return trades / (time.perf_counter() - start)
+
+
+def bench_after(db_path, trades, per_cycle):
+    """TradeStore: one WAL connection, every write of a cycle in one transaction.
+
+    Each trade is logged with a balance snapshot, so both sides store the same rows.
+    """
+    records = trade_records(trades)
+    store = TradeStore(db_path)
+    start = time.perf_counter()
+    for i in range(0, trades, per_cycle):
+        with store.batch():
+            for record in records[i:i + per_cycle]:
+                store.log_trades([record])
+                store.log_balance(record[0], record[4])
+    elapsed = time.perf_counter() - start
+    store.close()
+    return trades / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark trade logging throughput")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Existing trades in the database")
+    parser.add_argument('--trades', type=int, default=2000, help="Trades to log per run")
+    parser.add_argument('--per-cycle', type=int, default=4, help="Trades per trading cycle (one transaction), each logged with its balance snapshot")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_db = os.path.join(tmp, 'before.db')
+        after_db = os.path.join(tmp, 'after.db')
+        print(f"📦 Prefilling two databases with {args.rows:,} trades...")
+        prefill(before_db, args.rows)
+        prefill(after_db, args.rows)
+
+        before = bench_before(before_db, args.trades)
+        after = bench_after(after_db, args.trades, args.per_cycle)
+
+    print(f"  Before (connect + commit per trade):   {before:>10,.0f} trades/sec")
+    print(f"  After  (WAL + group commit per cycle): {after:>10,.0f} trades/sec")
+    print(f"  Speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
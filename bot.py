@@ -6,14 +6,22 @@ Runs continuously, fetching data every minute and making trading decisions.
 No registration or API keys required - completely free to use.
 """
 
-import time
-import sqlite3
+import argparse
 import logging
-from datetime import datetime
+from collections import deque
 from typing import Dict, Optional
-import urllib.request
-import json
-import random
+
+import numpy as np
+
+from clock import SystemClock
+from execution import SpreadSlippageModel
+from ledger import PositionLedger
+from orders import OrderBook
+from price_feed import (FRANKFURTER_URL, ExchangeRateHostProvider, FrankfurterProvider, HedgedFetcher, HTTPClient,
+                        RateFeed, cross_rate_matrix)
+from price_history import PriceHistory
+from storage import DEFAULT_ACCOUNT, TradeStore, WriteBehindWriter, to_micros
+from strategies import ACTION_NAMES, MomentumStrategy, percent_change
 
 # Configure logging
 logging.basicConfig(
@@ -27,23 +35,82 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class ForexTradingBot:
-    def __init__(self):
-        """Initialize the trading bot with public Forex API and database."""
+    def __init__(self, db_path: str = 'forex_trading.db', clock=None, seed: Optional[int] = None, feed=None,
+                 hedged_fetcher=None, hedged: bool = False):
+        """Initialize the trading bot with public Forex API and database.
+        
+        clock, seed and feed are injectable so replay.py can drive the unchanged loop
+        from a recorded tape on simulated time with reproducible randomness.
+        hedged_fetcher (a price_feed.HedgedFetcher) replaces the feed with hedged requests;
+        hedged=True builds the default one, Frankfurter hedged by exchangerate.host.
+        """
+        self.db_path = db_path
+        self.clock = clock or SystemClock()
+        
         # Public Forex API - no registration required
-        self.api_url = "https://api.frankfurter.app/latest"
+        self.api_url = FRANKFURTER_URL
+        
+        # Keep-alive client with explicit timeouts, reused every cycle
+        self.http_client = HTTPClient(connect_timeout=5.0, read_timeout=10.0)
         
         # Trading pairs to monitor (USD base currency)
-        self.pairs = ['EUR', 'GBP']  # Will fetch USD→EUR and USD→GBP rates
+        # None = every currency the provider publishes, or e.g. ['EUR', 'GBP'] to restrict
+        self.pairs = None
+        
+        # Conditional-request feed: returns None when the rates have not changed
+        self.feed = feed or RateFeed(self.api_url, base='USD', symbols=self.pairs, client=self.http_client)
+        
+        # Optional hedged mode: hedges slow primary responses with a second provider
+        if hedged_fetcher is None and hedged:
+            hedged_fetcher = HedgedFetcher(FrankfurterProvider(), ExchangeRateHostProvider(),
+                                           client=self.http_client)
+        self.hedged_fetcher = hedged_fetcher
+        # Last rates the hedged fetcher returned, to detect unchanged cycles the way the feed does
+        self.last_fetched_prices = None
+        
+        # Cross rates for every currency pair, derived from the USD rates each cycle
+        self.currencies = []
+        self.cross_rates = None
         
         # Simulated account balance (starts at $10,000)
         self.simulated_balance = 10000.0
         
+        # Strategy parameters (percent change per cycle); tune with sweep.py
+        self.buy_threshold = 0.05
+        self.sell_threshold = -0.05
+        self.trade_amount = 100.0  # Fixed trade size
+        
+        # Open positions per pair with average cost and realized/unrealized P&L
+        self.ledger = PositionLedger()
+        
+        # Resting limit/stop/take-profit orders, matched against every tick
+        self.order_book = OrderBook()
+        
+        # Fill model: bid/ask spread, size-dependent and seeded random slippage, latency in ticks
+        self.fill_model = SpreadSlippageModel(seed=seed)
+        
+        # Market orders waiting out the fill model's latency: (due tick, pair, action, amount)
+        self.pending_orders = deque()
+        
+        # Strategy plugin: receives every pair at once and returns an action vector
+        self.strategy = MomentumStrategy(self.buy_threshold, self.sell_threshold)
+        
+        # Seconds between trading cycles
+        self.cycle_interval = 60
+        
         # Initialize database
         self.init_database()
         
         # Track previous prices for strategy
         self.previous_prices = {}
         
+        # Streaming indicators per strategy and pair, kept only for strategies that use them
+        self.indicators = {}
+        
+        # Every tick seen, as zero-copy NumPy columns per currency
+        self.history = PriceHistory()
+        self.tick_time = None
+        
         # Track trade count for balance simulation
         self.trade_count = 0
         
@@ -52,119 +119,90 @@ class ForexTradingBot:
         logger.info(f"Simulated starting balance: ${self.simulated_balance:,.2f}")
     
     def init_database(self):
-        """Initialize SQLite database with required tables."""
+        """Open the long-lived database connection and record the starting balance."""
         try:
-            conn = sqlite3.connect('forex_trading.db')
-            cursor = conn.cursor()
-            
-            # Create trades table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS trades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    pair TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    balance REAL NOT NULL
-                )
-            ''')
+            # One WAL-mode connection for the bot's lifetime instead of one per trade
+            self.store = TradeStore(self.db_path)
             
-            # Create balances table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS balances (
-                    timestamp TEXT PRIMARY KEY,
-                    balance REAL NOT NULL
-                )
-            ''')
+            # Trades are queued and written in bulk by a background thread
+            self.writer = WriteBehindWriter(self.store)
             
             # Insert initial balance
-            cursor.execute('''
-                INSERT OR REPLACE INTO balances (timestamp, balance)
-                VALUES (?, ?)
-            ''', (datetime.now().isoformat(), self.simulated_balance))
+            self.store.log_balance(self.clock.now().isoformat(), self.simulated_balance)
             
-            conn.commit()
-            conn.close()
             logger.info("Database initialized successfully")
             
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
             raise
     
-    def get_current_prices(self) -> Dict[str, float]:
-        """Get current exchange rates from public Forex API."""
+    def get_current_prices(self) -> Optional[Dict[str, float]]:
+        """Get current exchange rates from public Forex API, or None if unchanged since last cycle."""
         try:
-            # Fetch USD rates for EUR and GBP
-            url = f"{self.api_url}?from=USD&to=EUR,GBP"
-            
-            with urllib.request.urlopen(url) as response:
-                data = json.loads(response.read().decode())
-            
-            rates = data.get('rates', {})
+            # One request per cycle covers the whole currency universe
+            if self.hedged_fetcher is not None:
+                # Hedged mode: race the secondary provider when the primary is slow
+                source, prices = self.hedged_fetcher.fetch(self.pairs)
+                logger.info(f"Hedge stats: {self.hedged_fetcher.stats()}")
+                # No validators across two providers: identical rates mean nothing was published
+                if prices == self.last_fetched_prices:
+                    return None
+                self.last_fetched_prices = prices
+                logger.info(f"Fetched {len(prices)} rates from {source}: {prices}")
+            else:
+                data = self.feed.poll()
+                if data is None:
+                    return None
+                
+                # Extract rates (these are USD→currency rates)
+                prices = dict(data.get('rates', {}))
+                logger.info(f"Fetched {len(prices)} rates for {data.get('date')}: {prices}")
             
-            # Extract rates (these are USD→EUR and USD→GBP rates)
-            prices = {}
-            if 'EUR' in rates:
-                prices['EUR'] = rates['EUR']
-            if 'GBP' in rates:
-                prices['GBP'] = rates['GBP']
+            # Derive the full N×N cross-rate matrix from the USD vector
+            if prices:
+                self.currencies, self.cross_rates = cross_rate_matrix(prices)
             
-            logger.info(f"Fetched rates: {prices}")
             return prices
             
         except Exception as e:
             logger.error(f"Failed to fetch exchange rates: {e}")
             return {}
     
-    def simulate_trade_execution(self, pair: str, action: str, price: float) -> float:
-        """Simulate trade execution and update balance."""
+    def simulate_trade_execution(self, pair: str, action: str, price: float, amount: Optional[float] = None) -> float:
+        """Simulate trade execution through the fill model and update balance."""
         # Simple simulation: each trade affects balance by a small amount
-        trade_amount = 100.0  # Fixed trade size
+        trade_amount = amount or self.trade_amount
         
         if action == "BUY":
-            # Simulate buying foreign currency (costs USD)
-            cost = trade_amount * price
+            # Simulate buying foreign currency (costs USD). Each unit costs 1 / price USD,
+            # so the purchase fills at the ask of that inverse quote, as the ledger records it
+            unit_cost = self.fill_model.fill_price(pair, 1, 1.0 / price, trade_amount)
+            cost = trade_amount * unit_cost
             self.simulated_balance -= cost
-            logger.info(f"Simulated BUY: Spent ${cost:.2f} to buy {trade_amount} {pair}")
+            self.ledger.fill(pair, trade_amount, unit_cost)
+            logger.info(f"Simulated BUY: Spent ${cost:.2f} to buy {trade_amount} {pair} at {1.0 / unit_cost:.5f}")
             
         elif action == "SELL":
-            # Simulate selling foreign currency (earns USD)
-            earnings = trade_amount / price
+            # Simulate selling foreign currency (earns USD). Each unit is worth 1 / price USD,
+            # so the sale fills at the bid of that inverse quote
+            unit_value = self.fill_model.fill_price(pair, -1, 1.0 / price, trade_amount)
+            earnings = trade_amount * unit_value
             self.simulated_balance += earnings
-            logger.info(f"Simulated SELL: Earned ${earnings:.2f} from selling {trade_amount} {pair}")
-        
-        # Add some random variation to make it more realistic
-        variation = random.uniform(-0.5, 0.5)  # Small random change
-        self.simulated_balance += variation
+            self.ledger.fill(pair, -trade_amount, unit_value)
+            logger.info(f"Simulated SELL: Earned ${earnings:.2f} from selling {trade_amount} {pair} at {1.0 / unit_value:.5f}")
         
         # Ensure balance doesn't go negative
         self.simulated_balance = max(0.0, self.simulated_balance)
         
         return self.simulated_balance
     
-    def execute_trade(self, pair: str, action: str, price: float):
+    def execute_trade(self, pair: str, action: str, price: float, amount: Optional[float] = None):
         """Execute a simulated trade and log it to the database."""
         try:
             # Simulate the trade and get new balance
-            new_balance = self.simulate_trade_execution(pair, action, price)
-            
-            conn = sqlite3.connect('forex_trading.db')
-            cursor = conn.cursor()
-            
-            # Log the trade
-            cursor.execute('''
-                INSERT INTO trades (timestamp, pair, action, price, balance)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (datetime.now().isoformat(), pair, action, price, new_balance))
+            new_balance = self.simulate_trade_execution(pair, action, price, amount)
             
-            # Log the balance
-            cursor.execute('''
-                INSERT OR REPLACE INTO balances (timestamp, balance)
-                VALUES (?, ?)
-            ''', (datetime.now().isoformat(), new_balance))
-            
-            conn.commit()
-            conn.close()
+            self.log_trades([(self.clock.now().isoformat(), pair, action, price, new_balance)])
             
             self.trade_count += 1
             logger.info(f"Trade executed: {action} {pair} at {price:.5f}, New Balance: ${new_balance:,.2f}")
@@ -172,81 +210,160 @@ class ForexTradingBot:
         except Exception as e:
             logger.error(f"Failed to log trade: {e}")
     
+    def place_market_order(self, pair: str, action: str, price: float, amount: Optional[float] = None):
+        """Execute now, or queue the order to fill fill_model.latency_ticks ticks later at that tick's price."""
+        latency = self.fill_model.latency_ticks
+        if latency:
+            self.pending_orders.append((len(self.history) - 1 + latency, pair, action, amount))
+        else:
+            self.execute_trade(pair, action, price, amount)
+    
+    def fill_pending_orders(self, current_prices: Dict[str, float]):
+        """Execute queued market orders whose latency has elapsed."""
+        tick = len(self.history) - 1
+        deferred = []
+        while self.pending_orders and self.pending_orders[0][0] <= tick:
+            due, pair, action, amount = self.pending_orders.popleft()
+            if pair in current_prices:
+                self.execute_trade(pair, action, current_prices[pair], amount)
+            else:
+                # No price this tick: fill on the next tick that quotes the pair
+                deferred.append((tick + 1, pair, action, amount))
+        self.pending_orders.extendleft(reversed(deferred))
+    
+    def log_trades(self, records):
+        """Queue (timestamp, pair, action, price, balance) records for the background writer."""
+        self.writer.submit_trades(records)
+    
     def analyze_and_trade(self):
         """Analyze current prices and execute trading strategy."""
-        current_time = datetime.now()
-        
         # Fetch current prices from public API
         current_prices = self.get_current_prices()
         
+        # Reference rates change once per business day: skip strategy and persistence until they do
+        if current_prices is None:
+            since = 'the last cycle' if self.hedged_fetcher is not None else self.feed.date
+            logger.info(f"Rates unchanged since {since}, skipping trading cycle")
+            return
+        
         if not current_prices:
             logger.warning("No prices fetched, skipping trading cycle")
             return
         
-        for pair in self.pairs:
-            if pair not in current_prices:
-                continue
-                
-            current_price = current_prices[pair]
-            
-            # Get previous price for this pair
-            if pair not in self.previous_prices:
-                self.previous_prices[pair] = current_price
-                logger.info(f"Initial price for {pair}: {current_price:.5f}")
-                continue
-            
-            previous_price = self.previous_prices[pair]
-            
-            # Calculate price change percentage
-            price_change_pct = ((current_price - previous_price) / previous_price) * 100
-            
-            # Trading strategy (simplified for demo)
-            action = "HOLD"
-            if price_change_pct > 0.05:  # Reduced threshold for more frequent trades
-                action = "BUY"
-                logger.info(f"{pair}: Price increased {price_change_pct:.3f}% - BUY signal")
-            elif price_change_pct < -0.05:
-                action = "SELL"
-                logger.info(f"{pair}: Price decreased {abs(price_change_pct):.3f}% - SELL signal")
-            else:
-                logger.info(f"{pair}: Price change {price_change_pct:.3f}% - HOLD")
-            
-            # Execute trade if not HOLD
-            if action != "HOLD":
-                self.execute_trade(pair, action, current_price)
-            
-            # Update previous price
-            self.previous_prices[pair] = current_price
+        self.trade_on_prices(current_prices)
+        logger.info(f"Feed latency stats: {self.http_client.stats()}")
+        logger.info(f"Write-behind stats: {self.writer.stats()}")
+    
+    def indicator_strategies(self):
+        """Strategies whose per-pair indicators update_market_state() maintains."""
+        return [self.strategy] if self.strategy.uses_indicators else []
+    
+    def update_market_state(self, current_prices: Dict[str, float]):
+        """Record one tick in the history, indicators and rollups; return (pairs, prices, previous) vectors."""
+        self.tick_time = self.clock.now()
+        self.history.append(to_micros(self.tick_time), current_prices)
+        
+        pairs = [pair for pair in (self.pairs or sorted(current_prices)) if pair in current_prices]
+        prices = np.array([current_prices[pair] for pair in pairs], dtype=np.float64)
+        previous = np.array([self.previous_prices.get(pair, np.nan) for pair in pairs], dtype=np.float64)
         
-        # Log current balance every cycle
-        self.execute_trade("SYSTEM", "BALANCE_UPDATE", 0.0)
+        # Keep the streaming indicators current for every strategy that reads them
+        for strategy in self.indicator_strategies():
+            indicators = self.indicators.setdefault(id(strategy), {})
+            for pair in pairs:
+                if pair not in indicators:
+                    indicators[pair] = strategy.new_indicators()
+                indicators[pair].update(current_prices[pair])
         
-        logger.info(f"Trading cycle complete. Current balance: ${self.simulated_balance:,.2f}")
+        # Every tick feeds the price chart rollups
+        self.writer.submit_prices(self.tick_time.isoformat(), pairs, prices.tolist())
+        
+        return pairs, prices, previous
     
-    def run(self):
-        """Main loop - run the trading bot continuously."""
+    def trade_on_prices(self, current_prices: Dict[str, float]):
+        """Run the trading strategy against one set of fetched prices."""
+        pairs, prices, previous = self.update_market_state(current_prices)
+        self.fill_pending_orders(current_prices)
+        
+        # Re-mark open positions only where the price moved, in USD per unit
+        changed = np.flatnonzero(prices != previous).tolist()
+        changed_pairs = [pairs[i] for i in changed]
+        changed_values = [1.0 / price for price in prices[changed].tolist()]
+        self.ledger.mark_many(changed_pairs, changed_values)
+        
+        # Fill resting orders whose level the move crossed; levels are USD per unit too
+        for order in self.order_book.on_prices(changed_pairs, changed_values):
+            logger.info(f"{order.pair}: {order.side} {order.order_type} at ${order.level:.5f} "
+                        f"triggered at ${order.trigger_price:.5f}")
+            self.place_market_order(order.pair, order.side, 1.0 / order.trigger_price, order.quantity)
+        
+        # One strategy call decides for every pair
+        actions = self.strategy.decide(pairs, prices, previous, self.history,
+                                       self.indicators.get(id(self.strategy)))
+        change_pct = percent_change(prices, previous)
+        first_seen = np.isnan(previous)
+        if first_seen.any():
+            logger.info(f"Initial prices for {', '.join(pair for pair, new in zip(pairs, first_seen.tolist()) if new)}")
+        
+        # Only BUY/SELL pairs are logged and executed; HOLDs cost nothing per pair
+        for i in np.flatnonzero((actions != 0) & ~first_seen).tolist():
+            pair = pairs[i]
+            action = ACTION_NAMES[int(actions[i])]
+            logger.info(f"{pair}: Price change {change_pct[i]:.3f}% - {action}")
+            self.place_market_order(pair, action, current_prices[pair])
+        
+        # Update previous prices
+        self.previous_prices.update(zip(pairs, prices.tolist()))
+        
+        # Snapshot the balance every cycle
+        self.writer.submit_balance(self.clock.now().isoformat(), self.simulated_balance)
+        
+        # Persist only the positions that changed this cycle
+        self.writer.submit_positions(self.ledger.snapshot(DEFAULT_ACCOUNT, self.tick_time.isoformat()))
+        
+        logger.info(f"Trading cycle complete. Current balance: ${self.simulated_balance:,.2f}, "
+                    f"unrealized P&L: ${self.ledger.total_unrealized:,.2f}, "
+                    f"realized P&L: ${self.ledger.total_realized:,.2f}")
+    
+    def run(self, cycles: Optional[int] = None):
+        """Main loop - run the trading bot continuously (or for a fixed number of cycles)."""
         logger.info("Starting Forex Trading Bot with public API...")
         logger.info("No registration required - using free public Forex rates")
         
         try:
-            while True:
+            completed = 0
+            while cycles is None or completed < cycles:
                 logger.info("Starting trading cycle...")
                 self.analyze_and_trade()
+                completed += 1
                 
                 # Wait for 1 minute before next cycle
-                logger.info("Waiting 60 seconds until next cycle...")
-                time.sleep(60)
+                logger.info(f"Waiting {self.cycle_interval} seconds until next cycle...")
+                self.clock.sleep(self.cycle_interval)
                 
         except KeyboardInterrupt:
             logger.info("Trading bot stopped by user")
         except Exception as e:
             logger.error(f"Trading bot error: {e}")
             raise
+        finally:
+            if self.hedged_fetcher is not None:
+                self.hedged_fetcher.close()
+            self.http_client.close()
+            # Flush queued trades before the connection goes away (including on Ctrl+C)
+            self.writer.close()
+            self.store.close()
 
-def main():
+def main(argv=None):
     """Main function to run the trading bot."""
+    parser = argparse.ArgumentParser(description="Run the simulated Forex trading bot")
+    parser.add_argument('--db', default='forex_trading.db', help="Database to trade into")
+    parser.add_argument('--hedged', action='store_true',
+                        help="Hedge slow Frankfurter responses with a request to exchangerate.host")
+    args = parser.parse_args(argv)
+    
     try:
-        bot = ForexTradingBot()
+        bot = ForexTradingBot(db_path=args.db, hedged=args.hedged)
         bot.run()
     except Exception as e:
         logger.error(f"Failed to start trading bot: {e}")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Async Forex Trading Bot
+asyncio runtime for ForexTradingBot. Every cycle queries several rate providers
+concurrently under per-provider timeouts, while strategy evaluation and database
+persistence run as separate tasks so a slow feed never delays either of them.
+"""
+
+import asyncio
+import logging
+
+from bot import ForexTradingBot
+from price_feed import FeedError, default_providers
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncForexTradingBot(ForexTradingBot):
+    def __init__(self, providers=None, interval=60.0, **kwargs):
+        """Initialize the async bot with a list of providers in priority order."""
+        super().__init__(**kwargs)
+        self.providers = providers if providers is not None else default_providers()
+        self.interval = interval
+
+        # Latest merged prices, kept to detect unchanged cycles
+        self.last_merged_prices = None
+
+        # Trades waiting for the persistence task
+        self.persist_queue = None
+
+        logger.info(f"Async runtime providers: {', '.join(p.name for p in self.providers)}")
+
+    async def fetch_provider(self, provider):
+        """Fetch one provider under its own timeout. Returns (provider, rates or None)."""
+        try:
+            rates = await asyncio.wait_for(
+                asyncio.to_thread(provider.fetch, self.http_client, self.pairs),
+                timeout=provider.timeout,
+            )
+            return provider, rates
+        except asyncio.TimeoutError:
+            logger.warning(f"{provider.name}: no response within {provider.timeout:.1f}s")
+        except FeedError as e:
+            logger.warning(f"{provider.name}: {e}")
+        except Exception as e:
+            logger.error(f"{provider.name}: unexpected error: {e}")
+        return provider, None
+
+    async def fetch_prices(self):
+        """Query every provider concurrently and merge the answers by provider priority."""
+        results = await asyncio.gather(*(self.fetch_provider(p) for p in self.providers))
+
+        merged = {}
+        sources = {}
+        for provider, rates in results:
+            if not rates:
+                continue
+            for currency, rate in rates.items():
+                if currency not in merged:
+                    merged[currency] = rate
+                    sources[currency] = provider.name
+
+        if merged:
+            answered = sorted(set(sources.values()))
+            logger.info(f"Fetched {len(merged)} rates from {', '.join(answered)}")
+        return merged
+
+    def execute_trade(self, pair, action, price, amount=None):
+        """Simulate a trade and hand the record to the persistence task instead of writing inline."""
+        try:
+            new_balance = self.simulate_trade_execution(pair, action, price, amount)
+            self.persist_queue.put_nowait((self.clock.now().isoformat(), pair, action, price, new_balance))
+            self.trade_count += 1
+            logger.info(f"Trade executed: {action} {pair} at {price:.5f}, New Balance: ${new_balance:,.2f}")
+        except Exception as e:
+            logger.error(f"Failed to queue trade: {e}")
+
+    async def fetch_loop(self, prices_queue, cycles=None):
+        """Start a fetch every `interval` seconds on a fixed schedule."""
+        loop = asyncio.get_running_loop()
+        next_start = loop.time()
+        completed = 0
+
+        while cycles is None or completed < cycles:
+            logger.info("Starting trading cycle...")
+            prices = await self.fetch_prices()
+            completed += 1
+
+            if not prices:
+                logger.warning("No prices fetched, skipping trading cycle")
+            elif prices == self.last_merged_prices:
+                logger.info("Rates unchanged since last cycle, skipping trading cycle")
+            else:
+                self.last_merged_prices = prices
+                # Only the newest prices matter: replace anything the strategy has not picked up
+                if prices_queue.full():
+                    prices_queue.get_nowait()
+                prices_queue.put_nowait(prices)
+
+            # Schedule from the cycle start so fetch time does not push later cycles back
+            next_start += self.interval
+            delay = next_start - loop.time()
+            if delay > 0 and (cycles is None or completed < cycles):
+                await asyncio.sleep(delay)
+            elif delay <= 0:
+                next_start = loop.time()
+
+        await prices_queue.put(None)
+
+    async def strategy_loop(self, prices_queue):
+        """Evaluate the strategy whenever new prices arrive."""
+        while True:
+            prices = await prices_queue.get()
+            if prices is None:
+                break
+            self.trade_on_prices(prices)
+        await self.persist_queue.put(None)
+
+    async def persistence_loop(self):
+        """Write queued trades in batches on a worker thread."""
+        done = False
+        while not done:
+            batch = [await self.persist_queue.get()]
+            while not self.persist_queue.empty():
+                batch.append(self.persist_queue.get_nowait())
+
+            if batch[-1] is None:
+                done = True
+                batch.pop()
+            if batch:
+                try:
+                    await asyncio.to_thread(self.log_trades, batch)
+                except Exception as e:
+                    logger.error(f"Failed to log {len(batch)} trades: {e}")
+
+    async def run_async(self, cycles=None):
+        """Run the fetch, strategy and persistence tasks until `cycles` fetches complete."""
+        prices_queue = asyncio.Queue(maxsize=1)
+        self.persist_queue = asyncio.Queue()
+
+        tasks = [
+            asyncio.create_task(self.fetch_loop(prices_queue, cycles), name='fetch'),
+            asyncio.create_task(self.strategy_loop(prices_queue), name='strategy'),
+            asyncio.create_task(self.persistence_loop(), name='persistence'),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Drain whatever the strategy already produced before shutting down
+            pending = []
+            while not self.persist_queue.empty():
+                record = self.persist_queue.get_nowait()
+                if record is not None:
+                    pending.append(record)
+            if pending:
+                self.log_trades(pending)
+
+    def run(self):
+        """Main loop - run the async trading bot continuously."""
+        logger.info("Starting async Forex Trading Bot with multiple public APIs...")
+
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            logger.info("Trading bot stopped by user")
+        except Exception as e:
+            logger.error(f"Trading bot error: {e}")
+            raise
+        finally:
+            self.http_client.close()
+            self.writer.close()
+            self.store.close()
+
+
+def main():
+    """Main function to run the async trading bot."""
+    try:
+        bot = AsyncForexTradingBot()
+        bot.run()
+    except Exception as e:
+        logger.error(f"Failed to start trading bot: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
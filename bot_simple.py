@@ -6,13 +6,13 @@ Minimal dependencies - works with basic Python installation.
 """
 
 import time
-import sqlite3
 import logging
 from datetime import datetime
-import urllib.request
-import json
 import random
 
+from price_feed import FRANKFURTER_URL, HTTPClient, RateFeed
+from storage import TradeStore
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,14 +28,26 @@ class SimpleForexTradingBot:
     def __init__(self):
         """Initialize the simplified trading bot."""
         # Public Forex API - no registration required
-        self.api_url = "https://api.frankfurter.app/latest"
+        self.api_url = FRANKFURTER_URL
+        
+        # Keep-alive client with explicit timeouts, reused every cycle
+        self.http_client = HTTPClient(connect_timeout=5.0, read_timeout=10.0)
         
         # Trading pairs to monitor (USD base currency)
-        self.pairs = ['EUR', 'GBP']  # Will fetch USD→EUR and USD→GBP rates
+        # None = every currency the provider publishes, or e.g. ['EUR', 'GBP'] to restrict
+        self.pairs = None
+        
+        # Conditional-request feed: returns None when the rates have not changed
+        self.feed = RateFeed(self.api_url, base='USD', symbols=self.pairs, client=self.http_client)
         
         # Simulated account balance (starts at $10,000)
         self.simulated_balance = 10000.0
         
+        # Strategy parameters (percent change per cycle); tune with sweep.py
+        self.buy_threshold = 0.05
+        self.sell_threshold = -0.05
+        self.trade_amount = 100.0  # Fixed trade size
+        
         # Initialize database
         self.init_database()
         
@@ -50,39 +62,14 @@ class SimpleForexTradingBot:
         logger.info(f"Simulated starting balance: ${self.simulated_balance:,.2f}")
     
     def init_database(self):
-        """Initialize SQLite database with required tables."""
+        """Open the long-lived database connection and record the starting balance."""
         try:
-            conn = sqlite3.connect('forex_trading.db')
-            cursor = conn.cursor()
-            
-            # Create trades table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS trades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    pair TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    balance REAL NOT NULL
-                )
-            ''')
-            
-            # Create balances table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS balances (
-                    timestamp TEXT PRIMARY KEY,
-                    balance REAL NOT NULL
-                )
-            ''')
+            # One WAL-mode connection for the bot's lifetime instead of one per trade
+            self.store = TradeStore('forex_trading.db')
             
             # Insert initial balance
-            cursor.execute('''
-                INSERT OR REPLACE INTO balances (timestamp, balance)
-                VALUES (?, ?)
-            ''', (datetime.now().isoformat(), self.simulated_balance))
+            self.store.log_balance(datetime.now().isoformat(), self.simulated_balance)
             
-            conn.commit()
-            conn.close()
             logger.info("Database initialized successfully")
             
         except Exception as e:
@@ -90,24 +77,17 @@ class SimpleForexTradingBot:
             raise
     
     def get_current_prices(self):
-        """Get current exchange rates from public Forex API using urllib."""
+        """Get current exchange rates from public Forex API, or None if unchanged since last cycle."""
         try:
-            # Fetch USD rates for EUR and GBP
-            url = f"{self.api_url}?from=USD&to=EUR,GBP"
+            # One request per cycle covers the whole currency universe
+            data = self.feed.poll()
+            if data is None:
+                return None
             
-            with urllib.request.urlopen(url) as response:
-                data = json.loads(response.read().decode())
+            # Extract rates (these are USD→currency rates)
+            prices = dict(data.get('rates', {}))
             
-            rates = data.get('rates', {})
-            
-            # Extract rates (these are USD→EUR and USD→GBP rates)
-            prices = {}
-            if 'EUR' in rates:
-                prices['EUR'] = rates['EUR']
-            if 'GBP' in rates:
-                prices['GBP'] = rates['GBP']
-            
-            logger.info(f"Fetched rates: {prices}")
+            logger.info(f"Fetched {len(prices)} rates for {data.get('date')}: {prices}")
             return prices
             
         except Exception as e:
@@ -117,7 +97,7 @@ class SimpleForexTradingBot:
     def simulate_trade_execution(self, pair, action, price):
         """Simulate trade execution and update balance."""
         # Simple simulation: each trade affects balance by a small amount
-        trade_amount = 100.0  # Fixed trade size
+        trade_amount = self.trade_amount
         
         if action == "BUY":
             # Simulate buying foreign currency (costs USD)
@@ -146,23 +126,8 @@ class SimpleForexTradingBot:
             # Simulate the trade and get new balance
             new_balance = self.simulate_trade_execution(pair, action, price)
             
-            conn = sqlite3.connect('forex_trading.db')
-            cursor = conn.cursor()
-            
-            # Log the trade
-            cursor.execute('''
-                INSERT INTO trades (timestamp, pair, action, price, balance)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (datetime.now().isoformat(), pair, action, price, new_balance))
-            
-            # Log the balance
-            cursor.execute('''
-                INSERT OR REPLACE INTO balances (timestamp, balance)
-                VALUES (?, ?)
-            ''', (datetime.now().isoformat(), new_balance))
-            
-            conn.commit()
-            conn.close()
+            # Log the trade and balance (buffered until the cycle's batch commits)
+            self.store.log_trades([(datetime.now().isoformat(), pair, action, price, new_balance)])
             
             self.trade_count += 1
             logger.info(f"Trade executed: {action} {pair} at {price:.5f}, New Balance: ${new_balance:,.2f}")
@@ -177,11 +142,26 @@ class SimpleForexTradingBot:
         # Fetch current prices from public API
         current_prices = self.get_current_prices()
         
+        # Reference rates change once per business day: skip strategy and persistence until they do
+        if current_prices is None:
+            logger.info(f"Rates unchanged since {self.feed.date}, skipping trading cycle")
+            return
+        
         if not current_prices:
             logger.warning("No prices fetched, skipping trading cycle")
             return
         
-        for pair in self.pairs:
+        # Group every write from this cycle into one transaction
+        try:
+            with self.store.batch():
+                self.trade_on_prices(current_prices)
+        except Exception as e:
+            logger.error(f"Failed to log trades: {e}")
+        logger.info(f"Feed latency stats: {self.http_client.stats()}")
+    
+    def trade_on_prices(self, current_prices):
+        """Run the trading strategy against one set of fetched prices."""
+        for pair in self.pairs or sorted(current_prices):
             if pair not in current_prices:
                 continue
                 
@@ -200,10 +180,10 @@ class SimpleForexTradingBot:
             
             # Trading strategy (simplified for demo)
             action = "HOLD"
-            if price_change_pct > 0.05:  # Reduced threshold for more frequent trades
+            if price_change_pct > self.buy_threshold:
                 action = "BUY"
                 logger.info(f"{pair}: Price increased {price_change_pct:.3f}% - BUY signal")
-            elif price_change_pct < -0.05:
+            elif price_change_pct < self.sell_threshold:
                 action = "SELL"
                 logger.info(f"{pair}: Price decreased {abs(price_change_pct):.3f}% - SELL signal")
             else:
@@ -216,8 +196,9 @@ class SimpleForexTradingBot:
             # Update previous price
             self.previous_prices[pair] = current_price
         
-        # Log current balance every cycle
-        self.execute_trade("SYSTEM", "BALANCE_UPDATE", 0.0)
+        # Snapshot the balance every cycle (it still drifts by the simulated variation)
+        new_balance = self.simulate_trade_execution("SYSTEM", "BALANCE_UPDATE", 0.0)
+        self.store.log_balance(datetime.now().isoformat(), new_balance)
         
         logger.info(f"Trading cycle complete. Current balance: ${self.simulated_balance:,.2f}")
     
@@ -240,6 +221,9 @@ class SimpleForexTradingBot:
         except Exception as e:
             logger.error(f"Trading bot error: {e}")
             raise
+        finally:
+            self.http_client.close()
+            self.store.close()
 
 def main():
     """Main function to run the trading bot."""
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Forex Bot Clocks
+Injectable time sources for the trading bots. SystemClock is the live wall clock;
+SimulatedClock advances instantly on sleep() so a replay runs as fast as the CPU
+allows and produces the same timestamps on every run.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """Wall-clock time, used by the live bot."""
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """Deterministic clock: starts at a fixed instant and only moves when told to.
+
+    Each now() call also advances by `step` (one microsecond by default) so records
+    written within one cycle keep distinct, reproducible timestamps.
+    """
+
+    def __init__(self, start=datetime(2020, 1, 1), step=timedelta(microseconds=1)):
+        self.current = start
+        self.step = step
+
+    def now(self):
+        self.current += self.step
+        return self.current
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        self.current += timedelta(seconds=seconds)
+
+    def set(self, moment):
+        """Jump to a given instant (never backwards)."""
+        if moment > self.current:
+            self.current = moment
@@ -14,6 +14,10 @@ from datetime import datetime, timedelta
 import time
 import threading
 
+from archive import trade_history
+from storage import (DB_PATH, DEFAULT_ACCOUNT, account_ids, balance_series, connect, latest_balance,
+                     recent_trades, rollup_history, trade_counts)
+
 # Page configuration
 st.set_page_config(
     page_title="Forex Trading Bot Dashboard",
@@ -23,37 +27,35 @@ st.set_page_config(
 )
 
 class TradingDashboard:
-    def __init__(self):
-        """Initialize the trading dashboard."""
-        self.db_path = 'forex_trading.db'
+    def __init__(self, account_id: str = DEFAULT_ACCOUNT):
+        """Initialize the trading dashboard for one account (the bot's own by default)."""
+        self.db_path = DB_PATH
+        self.account_id = account_id
         self.update_interval = 60  # seconds
+        self.history_limit = 1000  # most recent trades shown and downloadable
+        self.chart_width = 1200  # pixels; the balance chart gets about one bar per pixel
         
     def get_database_connection(self):
         """Create a connection to the SQLite database."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path)
             return conn
         except Exception as e:
             st.error(f"Database connection failed: {e}")
             return None
     
     def get_trades_data(self) -> pd.DataFrame:
-        """Fetch all trades from the database."""
+        """Fetch the most recent trades from the database."""
         conn = self.get_database_connection()
         if conn is None:
             return pd.DataFrame()
         
         try:
-            query = """
-                SELECT timestamp, pair, action, price, balance
-                FROM trades
-                WHERE pair != 'SYSTEM'
-                ORDER BY timestamp DESC
-            """
-            df = pd.read_sql_query(query, conn)
+            df = pd.DataFrame(recent_trades(conn, self.history_limit, account_id=self.account_id),
+                              columns=['timestamp', 'pair', 'action', 'price', 'balance'])
             
             if not df.empty:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='us')
                 df['price'] = df['price'].round(5)
                 df['balance'] = df['balance'].round(2)
             
@@ -64,22 +66,37 @@ class TradingDashboard:
         finally:
             conn.close()
     
+    def get_trade_history(self, start_date, end_date) -> pd.DataFrame:
+        """Fetch every trade between two dates (inclusive), including archived ones."""
+        conn = self.get_database_connection()
+        if conn is None:
+            return pd.DataFrame()
+        
+        try:
+            end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+            df = pd.DataFrame(trade_history(conn, datetime.combine(start_date, datetime.min.time()), end,
+                                            account_id=self.account_id),
+                              columns=['timestamp', 'pair', 'action', 'price', 'balance', 'account_id'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='us')
+            return df
+        except Exception as e:
+            st.error(f"Failed to fetch trade history: {e}")
+            return pd.DataFrame()
+        finally:
+            conn.close()
+    
     def get_balances_data(self) -> pd.DataFrame:
-        """Fetch balance history from the database."""
+        """Fetch the balance history as OHLC bars sized for the chart (close in 'balance')."""
         conn = self.get_database_connection()
         if conn is None:
             return pd.DataFrame()
         
         try:
-            query = """
-                SELECT timestamp, balance
-                FROM balances
-                ORDER BY timestamp ASC
-            """
-            df = pd.read_sql_query(query, conn)
+            resolution, bars = rollup_history(conn, balance_series(self.account_id), self.chart_width)
+            df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'balance'])
             
             if not df.empty:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='us')
                 df['balance'] = df['balance'].round(2)
             
             return df
@@ -89,6 +106,29 @@ class TradingDashboard:
         finally:
             conn.close()
     
+    def get_positions_data(self) -> pd.DataFrame:
+        """Fetch the bot's positions (including closed ones) with their P&L."""
+        conn = self.get_database_connection()
+        if conn is None:
+            return pd.DataFrame()
+        
+        try:
+            query = """
+                SELECT pair, quantity, avg_cost, last_price, unrealized_pnl, realized_pnl, updated
+                FROM positions
+                WHERE account_id = ?
+                ORDER BY pair
+            """
+            return pd.read_sql_query(query, conn, params=(self.account_id,))
+        except sqlite3.OperationalError:
+            # Written by newer bots only; older databases have no positions yet
+            return pd.DataFrame()
+        except Exception as e:
+            st.error(f"Failed to fetch positions: {e}")
+            return pd.DataFrame()
+        finally:
+            conn.close()
+    
     def get_current_balance(self) -> float:
         """Get the most recent account balance."""
         conn = self.get_database_connection()
@@ -96,19 +136,44 @@ class TradingDashboard:
             return 0.0
         
         try:
-            query = "SELECT balance FROM balances ORDER BY timestamp DESC LIMIT 1"
-            cursor = conn.cursor()
-            cursor.execute(query)
-            result = cursor.fetchone()
+            balance = latest_balance(conn, self.account_id)
             
-            return float(result[0]) if result else 0.0
+            return float(balance) if balance is not None else 0.0
         except Exception as e:
             st.error(f"Failed to get current balance: {e}")
             return 0.0
         finally:
             conn.close()
     
-    def calculate_summary_stats(self, trades_df: pd.DataFrame, balances_df: pd.DataFrame) -> dict:
+    def get_trade_counts(self) -> dict:
+        """Count BUY and SELL trades over the whole history."""
+        conn = self.get_database_connection()
+        if conn is None:
+            return {}
+        
+        try:
+            return trade_counts(conn, self.account_id)
+        except Exception as e:
+            st.error(f"Failed to count trades: {e}")
+            return {}
+        finally:
+            conn.close()
+    
+    def get_account_ids(self) -> list:
+        """Accounts recorded in the database, the bot's own first."""
+        conn = self.get_database_connection()
+        if conn is None:
+            return []
+        
+        try:
+            return account_ids(conn)
+        except Exception as e:
+            st.error(f"Failed to list accounts: {e}")
+            return []
+        finally:
+            conn.close()
+    
+    def calculate_summary_stats(self, counts: dict, balances_df: pd.DataFrame, current_balance: float) -> dict:
         """Calculate summary statistics for the dashboard."""
         stats = {
             'total_trades': 0,
@@ -119,14 +184,14 @@ class TradingDashboard:
             'current_balance': 0.0
         }
         
-        if not trades_df.empty:
-            stats['total_trades'] = len(trades_df)
-            stats['buy_trades'] = len(trades_df[trades_df['action'] == 'BUY'])
-            stats['sell_trades'] = len(trades_df[trades_df['action'] == 'SELL'])
+        if counts:
+            stats['buy_trades'] = counts['BUY']
+            stats['sell_trades'] = counts['SELL']
+            stats['total_trades'] = stats['buy_trades'] + stats['sell_trades']
         
         if not balances_df.empty:
-            stats['initial_balance'] = balances_df['balance'].iloc[0]
-            stats['current_balance'] = balances_df['balance'].iloc[-1]
+            stats['initial_balance'] = balances_df['open'].iloc[0]
+            stats['current_balance'] = current_balance
             stats['total_profit_loss'] = stats['current_balance'] - stats['initial_balance']
         
         return stats
@@ -196,6 +261,26 @@ class TradingDashboard:
         if st.sidebar.button("🔄 Refresh Now"):
             st.rerun()
         
+        # accounts.py stores several accounts in one database; show one at a time
+        accounts = self.get_account_ids()
+        if len(accounts) > 1:
+            self.account_id = st.sidebar.selectbox(
+                "Account", accounts,
+                index=accounts.index(self.account_id) if self.account_id in accounts else 0)
+        
+        # Export a date range; older trades are read from the archive segments
+        st.sidebar.header("📦 Export")
+        today = datetime.now().date()
+        export_range = st.sidebar.date_input("Trades between", value=(today - timedelta(days=30), today))
+        if len(export_range) == 2 and st.sidebar.button("Prepare CSV"):
+            history_df = self.get_trade_history(*export_range)
+            st.sidebar.download_button(
+                label=f"📥 Download {len(history_df):,} Trades (CSV)",
+                data=history_df.to_csv(index=False),
+                file_name=f"forex_trades_{export_range[0]}_{export_range[1]}.csv",
+                mime="text/csv"
+            )
+        
         # Main content area
         col1, col2 = st.columns([2, 1])
         
@@ -206,7 +291,7 @@ class TradingDashboard:
             trades_df = self.get_trades_data()
             balances_df = self.get_balances_data()
             current_balance = self.get_current_balance()
-            stats = self.calculate_summary_stats(trades_df, balances_df)
+            stats = self.calculate_summary_stats(self.get_trade_counts(), balances_df, current_balance)
             
             # Display key metrics
             metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
@@ -255,10 +340,10 @@ class TradingDashboard:
                     height=400
                 )
                 
-                # Download button for all trades
+                # Download button for the recent trades
                 csv = trades_df.to_csv(index=False)
                 st.download_button(
-                    label="📥 Download All Trades (CSV)",
+                    label=f"📥 Download Last {len(trades_df):,} Trades (CSV)",
                     data=csv,
                     file_name=f"forex_trades_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                     mime="text/csv"
@@ -266,9 +351,27 @@ class TradingDashboard:
             else:
                 st.info("No trades recorded yet. The bot may not be running or no trades have been executed.")
         
+        # Open positions marked to the latest prices
+        st.markdown("---")
+        st.subheader("📌 Open Positions")
+        
+        positions_df = self.get_positions_data()
+        if not positions_df.empty:
+            pnl_col1, pnl_col2 = st.columns(2)
+            with pnl_col1:
+                st.metric(label="Unrealized P&L", value=f"${positions_df['unrealized_pnl'].sum():+,.2f}")
+            with pnl_col2:
+                st.metric(label="Realized P&L", value=f"${positions_df['realized_pnl'].sum():+,.2f}")
+            
+            positions_df = positions_df[positions_df['quantity'] != 0]
+            positions_df.columns = ['Pair', 'Quantity', 'Avg Cost', 'Last Price', 'Unrealized P&L', 'Realized P&L', 'Updated']
+            st.dataframe(positions_df.round(5), use_container_width=True)
+        else:
+            st.info("No open positions.")
+        
         # Full trades table at the bottom
         st.markdown("---")
-        st.subheader("📊 Complete Trading History")
+        st.subheader(f"📊 Trading History (last {self.history_limit:,} trades)")
         
         if not trades_df.empty:
             full_display_trades = self.create_trades_table(trades_df)
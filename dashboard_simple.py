@@ -4,21 +4,24 @@ Simplified Forex Trading Dashboard
 Basic dashboard that displays trading data without external dependencies.
 """
 
-import sqlite3
 import time
 from datetime import datetime
 import os
 
+from storage import (DB_PATH, DEFAULT_ACCOUNT, balance_series, connect, from_micros, latest_balance,
+                     recent_trades, rollup_history, trade_counts)
+
 class SimpleTradingDashboard:
-    def __init__(self):
-        """Initialize the simplified dashboard."""
-        self.db_path = 'forex_trading.db'
+    def __init__(self, account_id=DEFAULT_ACCOUNT):
+        """Initialize the simplified dashboard for one account (the bot's own by default)."""
+        self.db_path = DB_PATH
+        self.account_id = account_id
         self.update_interval = 30  # seconds
         
     def get_database_connection(self):
         """Create a connection to the SQLite database."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path)
             return conn
         except Exception as e:
             print(f"❌ Database connection failed: {e}")
@@ -31,18 +34,9 @@ class SimpleTradingDashboard:
             return []
         
         try:
-            query = """
-                SELECT timestamp, pair, action, price, balance
-                FROM trades
-                WHERE pair != 'SYSTEM'
-                ORDER BY timestamp DESC
-                LIMIT 20
-            """
-            cursor = conn.cursor()
-            cursor.execute(query)
-            trades = cursor.fetchall()
+            trades = recent_trades(conn, 20, account_id=self.account_id)
             
-            return trades
+            return [(from_micros(ts).isoformat(), *trade) for ts, *trade in trades]
         except Exception as e:
             print(f"❌ Failed to fetch trades: {e}")
             return []
@@ -56,17 +50,10 @@ class SimpleTradingDashboard:
             return []
         
         try:
-            query = """
-                SELECT timestamp, balance
-                FROM balances
-                ORDER BY timestamp ASC
-                LIMIT 50
-            """
-            cursor = conn.cursor()
-            cursor.execute(query)
-            balances = cursor.fetchall()
+            # About 50 bars spanning the whole history, each with its closing balance
+            resolution, bars = rollup_history(conn, balance_series(self.account_id), 50)
             
-            return balances
+            return [(from_micros(bar[0]).isoformat(), bar[4]) for bar in bars]
         except Exception as e:
             print(f"❌ Failed to fetch balances: {e}")
             return []
@@ -80,31 +67,42 @@ class SimpleTradingDashboard:
             return 0.0
         
         try:
-            query = "SELECT balance FROM balances ORDER BY timestamp DESC LIMIT 1"
-            cursor = conn.cursor()
-            cursor.execute(query)
-            result = cursor.fetchone()
+            balance = latest_balance(conn, self.account_id)
             
-            return float(result[0]) if result else 0.0
+            return float(balance) if balance is not None else 0.0
         except Exception as e:
             print(f"❌ Failed to get current balance: {e}")
             return 0.0
         finally:
             conn.close()
     
-    def calculate_summary_stats(self, trades, balances):
+    def get_trade_counts(self):
+        """Get BUY and SELL counts from the bot's running totals."""
+        conn = self.get_database_connection()
+        if conn is None:
+            return {}
+        
+        try:
+            return trade_counts(conn, self.account_id)
+        except Exception as e:
+            print(f"❌ Failed to count trades: {e}")
+            return {}
+        finally:
+            conn.close()
+    
+    def calculate_summary_stats(self, counts, current_balance):
         """Calculate summary statistics for the dashboard."""
         stats = {
-            'total_trades': len(trades),
-            'buy_trades': len([t for t in trades if t[2] == 'BUY']),
-            'sell_trades': len([t for t in trades if t[2] == 'SELL']),
+            'total_trades': counts.get('BUY', 0) + counts.get('SELL', 0),
+            'buy_trades': counts.get('BUY', 0),
+            'sell_trades': counts.get('SELL', 0),
             'total_profit_loss': 0.0,
             'initial_balance': 10000.0,
             'current_balance': 0.0
         }
         
-        if balances:
-            stats['current_balance'] = balances[-1][1]
+        if current_balance:
+            stats['current_balance'] = current_balance
             stats['total_profit_loss'] = stats['current_balance'] - stats['initial_balance']
         
         return stats
@@ -122,7 +120,7 @@ class SimpleTradingDashboard:
         trades = self.get_trades_data()
         balances = self.get_balances_data()
         current_balance = self.get_current_balance()
-        stats = self.calculate_summary_stats(trades, balances)
+        stats = self.calculate_summary_stats(self.get_trade_counts(), current_balance)
         
         # Display key metrics
         print("\n📊 Account Overview")
@@ -4,17 +4,18 @@ Forex Public API Demo
 Simple script to demonstrate the public Forex API functionality.
 """
 
-import urllib.request
-import json
 from datetime import datetime
 
+from price_feed import FRANKFURTER_URL, FeedError, HTTPClient, fetch_latest
+
 def demo_public_api():
     """Demonstrate the public Forex API functionality."""
     print("🌐 Forex Public API Demo")
     print("=" * 50)
     
     # API endpoint
-    api_url = "https://api.frankfurter.app/latest"
+    api_url = FRANKFURTER_URL
+    client = HTTPClient(connect_timeout=5.0, read_timeout=10.0)
     
     try:
         print("📡 Fetching live exchange rates...")
@@ -22,10 +23,7 @@ def demo_public_api():
         print()
         
         # Fetch USD rates for EUR and GBP
-        url = f"{api_url}?from=USD&to=EUR,GBP"
-        
-        with urllib.request.urlopen(url) as response:
-            data = json.loads(response.read().decode())
+        data = fetch_latest(api_url, base='USD', symbols=['EUR', 'GBP'], client=client)
         
         print("✅ API Response:")
         print(f"  Base Currency: {data.get('base', 'N/A')}")
@@ -66,15 +64,20 @@ def demo_public_api():
             else:
                 print("  🟡 HOLD (price change within threshold)")
         
+        print()
+        stats = client.stats()
+        print(f"⏱️  Request latency: {stats.get('mean_ms', 0):.1f} ms")
         print()
         print("🚀 Ready to run the full trading bot!")
         print("  python3 run_simple.py")
         
-    except urllib.error.URLError as e:
+    except FeedError as e:
         print(f"❌ API request failed: {e}")
         print("Check your internet connection and try again.")
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
+    finally:
+        client.close()
 
 if __name__ == "__main__":
     demo_public_api()
\ No newline at end of file
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Forex Streaming Indicators
+Technical indicators that update in constant time per tick. Windowed indicators keep
+their samples in a fixed-size array-backed ring buffer and maintain running state, so
+a 10,000-sample lookback costs the same per tick as a 10-sample one. The same objects
+serve the live bot (update() once per price) and backtests (run() over a series).
+"""
+
+import math
+from array import array
+
+
+class RingBuffer:
+    """Fixed-capacity float buffer backed by array('d'); append() returns the evicted value."""
+
+    __slots__ = ('_data', '_capacity', '_index', '_count')
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._data = array('d', bytes(8 * capacity))
+        self._capacity = capacity
+        self._index = 0
+        self._count = 0
+
+    def append(self, value):
+        """Store a value, returning the one it overwrote (None until the buffer is full)."""
+        evicted = self._data[self._index] if self._count == self._capacity else None
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+        return evicted
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def full(self):
+        return self._count == self._capacity
+
+    def last(self):
+        """Most recently appended value."""
+        if not self._count:
+            raise IndexError("ring buffer is empty")
+        return self._data[self._index - 1]
+
+    def values(self):
+        """Contents from oldest to newest (O(n); for inspection, not the hot path)."""
+        if self._count < self._capacity:
+            return list(self._data[:self._count])
+        return list(self._data[self._index:]) + list(self._data[:self._index])
+
+
+class Indicator:
+    """Base class: update() consumes one price and returns the current value (None while warming up)."""
+
+    value = None
+
+    def update(self, price):
+        raise NotImplementedError
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def run(self, prices):
+        """Backtest mode: feed a whole series and return the value after every tick."""
+        update = self.update
+        return [update(price) for price in prices]
+
+
+class SMA(Indicator):
+    """Simple moving average over the last `window` prices."""
+
+    def __init__(self, window):
+        self.window = window
+        self._buffer = RingBuffer(window)
+        self._sum = 0.0
+
+    def update(self, price):
+        evicted = self._buffer.append(price)
+        self._sum += price - (evicted or 0.0)
+        if self._buffer.full:
+            self.value = self._sum / self.window
+        return self.value
+
+
+class EMA(Indicator):
+    """Exponential moving average with smoothing 2 / (period + 1), or an explicit alpha."""
+
+    def __init__(self, period=None, alpha=None):
+        if alpha is None:
+            if not period:
+                raise ValueError("period or alpha is required")
+            alpha = 2.0 / (period + 1)
+        self.alpha = alpha
+
+    def update(self, price):
+        if self.value is None:
+            self.value = float(price)
+        else:
+            self.value += self.alpha * (price - self.value)
+        return self.value
+
+
+class RollingStats(Indicator):
+    """Rolling mean, standard deviation and z-score over the last `window` prices.
+
+    Uses a sliding-window Welford update rather than running sums of squares, which
+    would lose all precision on exchange rates whose variance is tiny next to their level.
+    value is the z-score of the latest price.
+    """
+
+    def __init__(self, window):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self._buffer = RingBuffer(window)
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, price):
+        evicted = self._buffer.append(price)
+        if evicted is None:
+            count = len(self._buffer)
+            delta = price - self.mean
+            self.mean += delta / count
+            self._m2 += delta * (price - self.mean)
+        else:
+            old_mean = self.mean
+            self.mean += (price - evicted) / self.window
+            self._m2 += (price - evicted) * (price - self.mean + evicted - old_mean)
+            self._m2 = max(self._m2, 0.0)
+
+        if self._buffer.full:
+            std = self.std
+            self.value = (price - self.mean) / std if std > 0 else 0.0
+        return self.value
+
+    @property
+    def variance(self):
+        """Sample variance of the window."""
+        count = len(self._buffer)
+        return self._m2 / (count - 1) if count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def zscore(self, price):
+        """Z-score of an arbitrary price against the current window."""
+        std = self.std
+        return (price - self.mean) / std if std > 0 else 0.0
+
+
+class BollingerBands(Indicator):
+    """Middle band = SMA(window); upper/lower = middle ± k standard deviations. value is (lower, middle, upper)."""
+
+    def __init__(self, window=20, k=2.0):
+        self.k = k
+        self._stats = RollingStats(window)
+
+    def update(self, price):
+        if self._stats.update(price) is not None:
+            middle = self._stats.mean
+            width = self.k * self._stats.std
+            self.value = (middle - width, middle, middle + width)
+        return self.value
+
+
+class RSI(Indicator):
+    """Relative Strength Index with Wilder smoothing (0-100)."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self._previous = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._seen = 0
+
+    def update(self, price):
+        if self._previous is None:
+            self._previous = price
+            return self.value
+
+        change = price - self._previous
+        self._previous = price
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        self._seen += 1
+        if self._seen <= self.period:
+            # Seed with a simple average of the first `period` changes
+            self._avg_gain += gain / self.period
+            self._avg_loss += loss / self.period
+            if self._seen < self.period:
+                return self.value
+        else:
+            self._avg_gain += (gain - self._avg_gain) / self.period
+            self._avg_loss += (loss - self._avg_loss) / self.period
+
+        if self._avg_loss == 0:
+            self.value = 100.0 if self._avg_gain > 0 else 50.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+        return self.value
+
+
+class ATR(Indicator):
+    """ATR-style average range. The feed only has one rate per tick, so the true range is
+    the absolute close-to-close move, smoothed Wilder-style over `period` ticks."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self._previous = None
+        self._seen = 0
+        self._sum = 0.0
+
+    def update(self, price):
+        if self._previous is None:
+            self._previous = price
+            return self.value
+
+        true_range = abs(price - self._previous)
+        self._previous = price
+        self._seen += 1
+        if self._seen < self.period:
+            self._sum += true_range
+        elif self._seen == self.period:
+            self.value = (self._sum + true_range) / self.period
+        else:
+            self.value += (true_range - self.value) / self.period
+        return self.value
+
+
+class IndicatorSet:
+    """A named group of indicators updated together for one pair."""
+
+    def __init__(self, **indicators):
+        self.indicators = indicators
+
+    @classmethod
+    def default(cls):
+        """The standard set tracked by the bot for every pair."""
+        return cls(
+            sma=SMA(20),
+            ema=EMA(20),
+            zscore=RollingStats(20),
+            rsi=RSI(14),
+            atr=ATR(14),
+            bollinger=BollingerBands(20, 2.0),
+        )
+
+    def update(self, price):
+        """Update every indicator and return {name: value}."""
+        return {name: indicator.update(price) for name, indicator in self.indicators.items()}
+
+    def values(self):
+        return {name: indicator.value for name, indicator in self.indicators.items()}
+
+    def __getitem__(self, name):
+        return self.indicators[name]
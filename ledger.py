@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Forex Position Ledger
+Per-currency open positions with average cost, realized P&L and mark-to-market
+unrealized P&L. Positions are array-backed columns indexed by pair; fills update
+one slot, and each tick re-marks only the pairs whose price changed while the
+account totals are adjusted by the difference, so nothing ever rescans trade history.
+"""
+
+from array import array
+
+
+class PositionLedger:
+    """Array-backed position records, one slot per pair.
+
+    quantity is signed (negative = short). avg_cost is the average entry price of the
+    open quantity, and realized P&L is booked when a fill reduces or flips a position.
+    Slots touched since the last snapshot() are tracked so only they are persisted.
+    """
+
+    __slots__ = ('pairs', '_index', 'quantity', 'avg_cost', 'realized', 'unrealized',
+                 'last_price', 'total_realized', 'total_unrealized', '_dirty')
+
+    def __init__(self):
+        self.pairs = []
+        self._index = {}
+        self.quantity = array('d')
+        self.avg_cost = array('d')
+        self.realized = array('d')
+        self.unrealized = array('d')
+        self.last_price = array('d')
+        self.total_realized = 0.0
+        self.total_unrealized = 0.0
+        self._dirty = set()
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __contains__(self, pair):
+        return pair in self._index
+
+    def _slot(self, pair):
+        slot = self._index.get(pair)
+        if slot is None:
+            slot = self._index[pair] = len(self.pairs)
+            self.pairs.append(pair)
+            for column in (self.quantity, self.avg_cost, self.realized, self.unrealized, self.last_price):
+                column.append(0.0)
+        return slot
+
+    def _remark(self, slot, price):
+        unrealized = self.quantity[slot] * (price - self.avg_cost[slot])
+        self.total_unrealized += unrealized - self.unrealized[slot]
+        self.unrealized[slot] = unrealized
+        self.last_price[slot] = price
+
+    def fill(self, pair, quantity, price):
+        """Apply a fill of `quantity` units (positive buys, negative sells) at `price`.
+
+        Returns the P&L realized by this fill.
+        """
+        if not quantity:
+            return 0.0
+        slot = self._slot(pair)
+        held = self.quantity[slot]
+        realized = 0.0
+
+        if held == 0 or (held > 0) == (quantity > 0):
+            # Opening or adding: new weighted-average entry price
+            total = held + quantity
+            self.avg_cost[slot] = (held * self.avg_cost[slot] + quantity * price) / total
+            self.quantity[slot] = total
+        else:
+            # Reducing, closing or flipping: book P&L on the closed part
+            closed = min(abs(quantity), abs(held))
+            direction = 1.0 if held > 0 else -1.0
+            realized = closed * (price - self.avg_cost[slot]) * direction
+            remaining = held + quantity
+            self.quantity[slot] = remaining
+            if remaining == 0:
+                self.avg_cost[slot] = 0.0
+            elif (remaining > 0) != (held > 0):
+                # Flipped: the remainder is a new position opened at this price
+                self.avg_cost[slot] = price
+            self.realized[slot] += realized
+            self.total_realized += realized
+
+        self._remark(slot, price)
+        self._dirty.add(slot)
+        return realized
+
+    def mark(self, pair, price):
+        """Mark one pair to a new price. Pairs without a position are ignored."""
+        slot = self._index.get(pair)
+        if slot is None or self.last_price[slot] == price:
+            return
+        self.last_price[slot] = price
+        if self.quantity[slot]:
+            self._remark(slot, price)
+            self._dirty.add(slot)
+
+    def mark_many(self, pairs, prices):
+        """Mark several pairs, e.g. only those whose price changed this tick."""
+        for pair, price in zip(pairs, prices):
+            self.mark(pair, price)
+
+    def position(self, pair):
+        """Current record for one pair as a dict."""
+        slot = self._index[pair]
+        return {
+            'pair': pair,
+            'quantity': self.quantity[slot],
+            'avg_cost': self.avg_cost[slot],
+            'realized_pnl': self.realized[slot],
+            'unrealized_pnl': self.unrealized[slot],
+            'last_price': self.last_price[slot],
+        }
+
+    def open_positions(self):
+        """Records of every pair with a non-zero quantity."""
+        return [self.position(pair) for slot, pair in enumerate(self.pairs) if self.quantity[slot]]
+
+    def snapshot(self, account_id, timestamp):
+        """Rows for the positions table covering every slot changed since the last snapshot.
+
+        Each row is (account_id, pair, quantity, avg_cost, realized_pnl, unrealized_pnl,
+        last_price, timestamp). Clears the changed set.
+        """
+        rows = [(account_id, self.pairs[slot], self.quantity[slot], self.avg_cost[slot],
+                 self.realized[slot], self.unrealized[slot], self.last_price[slot], timestamp)
+                for slot in sorted(self._dirty)]
+        self._dirty.clear()
+        return rows
@@ -5,7 +5,6 @@ Web-based dashboard accessible from any device on your network.
 Uses Python's built-in HTTP server - no external dependencies required.
 """
 
-import sqlite3
 import json
 import time
 from datetime import datetime
@@ -14,30 +13,28 @@ import urllib.parse
 import threading
 import os
 
+from storage import (DB_PATH, DEFAULT_ACCOUNT, balance_series, connect, from_micros, latest_balance,
+                     price_series, recent_trades, rollup_history, trade_counts)
+
+# Chart width assumed when a client does not send one, and the most points it may ask for
+DEFAULT_CHART_WIDTH = 600
+MAX_CHART_WIDTH = 4000
+
 class TradingDataHandler:
-    def __init__(self):
-        self.db_path = 'forex_trading.db'
+    def __init__(self, account_id=DEFAULT_ACCOUNT):
+        self.db_path = DB_PATH
+        self.account_id = account_id
     
     def get_trades_data(self):
         """Fetch all trades from the database."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT timestamp, pair, action, price, balance
-                FROM trades
-                WHERE pair != 'SYSTEM'
-                ORDER BY timestamp DESC
-                LIMIT 50
-            """
-            cursor.execute(query)
-            trades = cursor.fetchall()
+            conn = connect(self.db_path)
+            trades = recent_trades(conn, 50, account_id=self.account_id)
             
             result = []
             for trade in trades:
                 result.append({
-                    'timestamp': trade[0],
+                    'timestamp': from_micros(trade[0]).isoformat(),
                     'pair': trade[1],
                     'action': trade[2],
                     'price': round(trade[3], 5),
@@ -50,54 +47,56 @@ class TradingDataHandler:
             print(f"Error fetching trades: {e}")
             return []
     
-    def get_balances_data(self):
-        """Fetch balance history from the database."""
+    def get_balances_data(self, width=DEFAULT_CHART_WIDTH):
+        """Fetch the whole balance history as OHLC bars sized for a chart `width` pixels wide."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT timestamp, balance
-                FROM balances
-                ORDER BY timestamp ASC
-                LIMIT 100
-            """
-            cursor.execute(query)
-            balances = cursor.fetchall()
-            
-            result = []
-            for balance in balances:
-                result.append({
-                    'timestamp': balance[0],
-                    'balance': round(balance[1], 2)
-                })
-            
+            conn = connect(self.db_path)
+            resolution, bars = rollup_history(conn, balance_series(self.account_id), width)
             conn.close()
-            return result
+            return self.format_bars(bars, 'balance', 2)
         except Exception as e:
             print(f"Error fetching balances: {e}")
             return []
     
+    def get_prices_data(self, pair, width=DEFAULT_CHART_WIDTH):
+        """Fetch a pair's price history as OHLC bars sized for a chart `width` pixels wide."""
+        try:
+            conn = connect(self.db_path)
+            resolution, bars = rollup_history(conn, price_series(pair), width)
+            conn.close()
+            return self.format_bars(bars, 'price', 5)
+        except Exception as e:
+            print(f"Error fetching prices: {e}")
+            return []
+    
+    def format_bars(self, bars, close_key, digits):
+        """JSON-ready bars; the close is reported under close_key."""
+        result = []
+        for bucket, open_, high, low, close in bars:
+            result.append({
+                'timestamp': from_micros(bucket).isoformat(),
+                'open': round(open_, digits),
+                'high': round(high, digits),
+                'low': round(low, digits),
+                close_key: round(close, digits)
+            })
+        return result
+    
     def get_summary_stats(self):
         """Calculate summary statistics."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            conn = connect(self.db_path)
             
             # Get trade counts
-            cursor.execute("SELECT COUNT(*) FROM trades WHERE pair != 'SYSTEM'")
-            total_trades = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM trades WHERE action = 'BUY' AND pair != 'SYSTEM'")
-            buy_trades = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM trades WHERE action = 'SELL' AND pair != 'SYSTEM'")
-            sell_trades = cursor.fetchone()[0]
+            counts = trade_counts(conn, self.account_id)
+            buy_trades = counts['BUY']
+            sell_trades = counts['SELL']
+            total_trades = buy_trades + sell_trades
             
             # Get current balance
-            cursor.execute("SELECT balance FROM balances ORDER BY timestamp DESC LIMIT 1")
-            result = cursor.fetchone()
-            current_balance = result[0] if result else 10000.0
+            current_balance = latest_balance(conn, self.account_id)
+            if current_balance is None:
+                current_balance = 10000.0
             
             conn.close()
             
@@ -121,6 +120,9 @@ class MobileDashboardHandler(BaseHTTPRequestHandler):
         """Handle GET requests."""
         parsed_path = urllib.parse.urlparse(self.path)
         path = parsed_path.path
+        # ?account= selects one of accounts.py's accounts; the bot's own by default
+        account = urllib.parse.parse_qs(parsed_path.query).get('account', [DEFAULT_ACCOUNT])[0]
+        self.data_handler.account_id = account
         
         if path == '/':
             self.send_response(200)
@@ -141,9 +143,19 @@ class MobileDashboardHandler(BaseHTTPRequestHandler):
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            balances = self.data_handler.get_balances_data()
+            balances = self.data_handler.get_balances_data(self.chart_width(parsed_path.query))
             self.wfile.write(json.dumps(balances).encode())
         
+        elif path == '/api/prices':
+            query = urllib.parse.parse_qs(parsed_path.query)
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            prices = self.data_handler.get_prices_data(query.get('pair', ['EUR'])[0],
+                                                       self.chart_width(parsed_path.query))
+            self.wfile.write(json.dumps(prices).encode())
+        
         elif path == '/api/stats':
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -157,6 +169,14 @@ class MobileDashboardHandler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(b'Not Found')
     
+    def chart_width(self, query_string):
+        """The ?width= a chart asked for, in pixels, within sane bounds."""
+        try:
+            width = int(urllib.parse.parse_qs(query_string).get('width', [DEFAULT_CHART_WIDTH])[0])
+        except ValueError:
+            width = DEFAULT_CHART_WIDTH
+        return min(max(width, 1), MAX_CHART_WIDTH)
+    
     def get_dashboard_html(self):
         """Generate the mobile-friendly dashboard HTML."""
         return f"""
@@ -364,9 +384,12 @@ class MobileDashboardHandler(BaseHTTPRequestHandler):
         // Chart.js for balance visualization
         let balanceChart = null;
         
+        // The page's ?account= is passed on to every API call
+        const account = encodeURIComponent(new URLSearchParams(window.location.search).get('account') || 'default');
+        
         async function loadStats() {{
             try {{
-                const response = await fetch('/api/stats');
+                const response = await fetch(`/api/stats?account=${{account}}`);
                 const stats = await response.json();
                 
                 const statsGrid = document.getElementById('stats-grid');
@@ -397,7 +420,7 @@ class MobileDashboardHandler(BaseHTTPRequestHandler):
         
         async function loadTrades() {{
             try {{
-                const response = await fetch('/api/trades');
+                const response = await fetch(`/api/trades?account=${{account}}`);
                 const trades = await response.json();
                 
                 const tradesTable = document.getElementById('trades-table');
@@ -448,22 +471,36 @@ class MobileDashboardHandler(BaseHTTPRequestHandler):
         
         async function loadBalances() {{
             try {{
-                const response = await fetch('/api/balances');
+                // The server picks the bar size that gives about one bar per pixel
+                const balanceChart = document.getElementById('balance-chart');
+                const width = Math.max(100, Math.round(balanceChart.clientWidth * (window.devicePixelRatio || 1)));
+                const response = await fetch(`/api/balances?width=${{width}}&account=${{account}}`);
                 const balances = await response.json();
                 
-                const balanceChart = document.getElementById('balance-chart');
                 if (balances.length === 0) {{
                     balanceChart.innerHTML = '<p>No balance data available.</p>';
                     return;
                 }}
                 
-                // Simple text-based balance display for now
-                let chartHTML = '<div style="font-family: monospace; font-size: 14px;">';
+                // Sparkline of the closing balances, with each bar's high-low range shaded
+                const min = balances.reduce((m, b) => Math.min(m, b.low), Infinity);
+                const range = (balances.reduce((m, b) => Math.max(m, b.high), -Infinity) - min) || 1;
+                const x = i => balances.length > 1 ? i / (balances.length - 1) * width : width / 2;
+                const y = v => 120 - (v - min) / range * 110 - 5;
+                const closes = balances.map((b, i) => `${{x(i).toFixed(1)}},${{y(b.balance).toFixed(1)}}`).join(' ');
+                const band = balances.map((b, i) => `${{x(i).toFixed(1)}},${{y(b.high).toFixed(1)}}`)
+                    .concat(balances.map((b, i) => `${{x(i).toFixed(1)}},${{y(b.low).toFixed(1)}}`).reverse()).join(' ');
+                let chartHTML = `<svg viewBox="0 0 ${{width}} 120" preserveAspectRatio="none" style="width: 100%; height: 120px;">
+                    <polygon points="${{band}}" fill="rgba(102, 126, 234, 0.2)"></polygon>
+                    <polyline points="${{closes}}" fill="none" stroke="#667eea" stroke-width="2" vector-effect="non-scaling-stroke"></polyline>
+                </svg>`;
+                
+                chartHTML += '<div style="font-family: monospace; font-size: 14px;">';
                 chartHTML += '<div style="margin-bottom: 15px;"><strong>Recent Balance Changes:</strong></div>';
                 
                 balances.slice(-10).reverse().forEach(balance => {{
                     const time = new Date(balance.timestamp).toLocaleString();
-                    chartHTML += `<div>${{time}}: $${balance.balance.toLocaleString()}</div>`;
+                    chartHTML += `<div>${{time}}: $${{balance.balance.toLocaleString()}}</div>`;
                 }});
                 
                 chartHTML += '</div>';
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Forex Order Book
+Resting limit, stop and take-profit orders per pair. Every order triggers either
+when the price rises to its level or when it falls to it, so each pair keeps two
+heaps keyed by level: the cheapest "rise" trigger and the highest "fall" trigger
+sit on top. A tick pops only the orders whose level was crossed, O(k log n) for k
+triggered out of n resting orders, instead of scanning the whole book.
+"""
+
+import heapq
+import itertools
+
+LIMIT = 'LIMIT'
+STOP = 'STOP'
+TAKE_PROFIT = 'TAKE_PROFIT'
+
+ORDER_TYPES = (LIMIT, STOP, TAKE_PROFIT)
+
+# (side, type) -> True when the order triggers on the price rising to its level
+TRIGGERS_ON_RISE = {
+    ('BUY', LIMIT): False,        # buy once the price has fallen to the level
+    ('SELL', LIMIT): True,        # sell once the price has risen to the level
+    ('BUY', STOP): True,          # stop on a short: buy back when the price rises through the level
+    ('SELL', STOP): False,        # stop-loss on a long: sell when the price falls through the level
+    ('BUY', TAKE_PROFIT): False,  # take profit on a short after the price falls
+    ('SELL', TAKE_PROFIT): True,  # take profit on a long after the price rises
+}
+
+
+class Order:
+    """One resting order. quantity is in units of the pair; None means the bot's trade amount."""
+
+    __slots__ = ('order_id', 'pair', 'side', 'order_type', 'level', 'quantity', 'account_id',
+                 'active', 'trigger_price')
+
+    def __init__(self, order_id, pair, side, order_type, level, quantity=None, account_id=None):
+        self.order_id = order_id
+        self.pair = pair
+        self.side = side
+        self.order_type = order_type
+        self.level = level
+        self.quantity = quantity
+        self.account_id = account_id
+        self.active = True
+        self.trigger_price = None
+
+    @property
+    def triggers_on_rise(self):
+        return TRIGGERS_ON_RISE[(self.side, self.order_type)]
+
+    def __repr__(self):
+        return f"Order({self.order_id}, {self.side} {self.order_type} {self.pair} @ {self.level})"
+
+
+class _PairBook:
+    __slots__ = ('rise', 'fall', 'live', 'stale')
+
+    def __init__(self):
+        self.rise = []   # (level, seq, order): lowest level triggers first as the price rises
+        self.fall = []   # (-level, seq, order): highest level triggers first as the price falls
+        self.live = 0
+        self.stale = 0   # cancelled entries still sitting in the heaps
+
+
+class OrderBook:
+    """Resting orders for every pair, matched against each tick.
+
+    Cancellation is lazy: cancelled orders stay in their heap until they reach the top
+    (or until stale entries outnumber live ones and the pair's heaps are rebuilt).
+    Triggered orders fill at the tick price, which may be through the level on a gap.
+    Levels and tick prices only need to share a unit; the bot uses USD per unit.
+    """
+
+    def __init__(self):
+        self._books = {}
+        self._orders = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_id):
+        return order_id in self._orders
+
+    def place(self, pair, side, order_type, level, quantity=None, account_id=None):
+        """Add a resting order and return it."""
+        if (side, order_type) not in TRIGGERS_ON_RISE:
+            raise ValueError(f"unsupported order: {side} {order_type}")
+        if not level > 0:
+            raise ValueError("order level must be a positive price")
+
+        order = Order(next(self._ids), pair, side, order_type, float(level), quantity, account_id)
+        book = self._books.get(pair)
+        if book is None:
+            book = self._books[pair] = _PairBook()
+        if order.triggers_on_rise:
+            heapq.heappush(book.rise, (order.level, next(self._seq), order))
+        else:
+            heapq.heappush(book.fall, (-order.level, next(self._seq), order))
+        book.live += 1
+        self._orders[order.order_id] = order
+        return order
+
+    def cancel(self, order_id):
+        """Cancel a resting order. Returns False if it already triggered or was cancelled."""
+        order = self._orders.pop(order_id, None)
+        if order is None:
+            return False
+        order.active = False
+        book = self._books[order.pair]
+        book.live -= 1
+        book.stale += 1
+        if book.stale > 64 and book.stale > book.live:
+            self._compact(book)
+        return True
+
+    def _compact(self, book):
+        book.rise = [entry for entry in book.rise if entry[2].active]
+        book.fall = [entry for entry in book.fall if entry[2].active]
+        heapq.heapify(book.rise)
+        heapq.heapify(book.fall)
+        book.stale = 0
+
+    def orders(self, pair=None):
+        """Resting orders, optionally for one pair (O(n); for inspection, not the hot path)."""
+        return [order for order in self._orders.values() if pair is None or order.pair == pair]
+
+    def on_tick(self, pair, price):
+        """Pop and return every order on `pair` whose level `price` has crossed, in trigger order."""
+        book = self._books.get(pair)
+        if book is None or not book.live:
+            return []
+
+        triggered = []
+        rise = book.rise
+        while rise and rise[0][0] <= price:
+            order = heapq.heappop(rise)[2]
+            self._take(book, order, price, triggered)
+        fall = book.fall
+        while fall and -fall[0][0] >= price:
+            order = heapq.heappop(fall)[2]
+            self._take(book, order, price, triggered)
+        return triggered
+
+    def _take(self, book, order, price, triggered):
+        if not order.active:
+            book.stale -= 1
+            return
+        order.active = False
+        order.trigger_price = price
+        del self._orders[order.order_id]
+        book.live -= 1
+        triggered.append(order)
+
+    def on_prices(self, pairs, prices):
+        """on_tick() for several pairs at once, e.g. the pairs whose price changed this cycle."""
+        triggered = []
+        for pair, price in zip(pairs, prices):
+            if pair in self._books:
+                triggered.extend(self.on_tick(pair, price))
+        return triggered
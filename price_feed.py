@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Forex Price Feed
+Shared helpers for fetching exchange rates from the public Frankfurter API and
+fallback providers. Uses only the standard library so the simplified bot keeps
+working without extras.
+"""
+
+import concurrent.futures
+import http.client
+import json
+import math
+import threading
+import time
+import urllib.parse
+from collections import deque
+
+# Public Forex API - no registration required
+FRANKFURTER_URL = "https://api.frankfurter.app/latest"
+
+# Errors that mean a pooled keep-alive connection went stale and can be retried once
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class FeedError(Exception):
+    """Raised when a price feed request fails or returns an unusable response."""
+
+
+class HTTPResponse:
+    """A fully read HTTP response."""
+
+    def __init__(self, status, headers, body, latency):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.latency = latency  # seconds, including connection setup if one was needed
+
+    def json(self):
+        """Decode the body as JSON."""
+        return json.loads(self.body.decode())
+
+
+class HTTPClient:
+    """Keep-alive HTTP client with a small connection pool per host.
+
+    Connections are reused across requests so each cycle skips the TCP and TLS
+    handshake. Connect and read timeouts are explicit so a hung socket raises
+    instead of blocking the caller forever. Latency of recent requests is kept
+    for stats().
+    """
+
+    def __init__(self, connect_timeout=5.0, read_timeout=10.0, max_idle_per_host=4,
+                 stats_window=1000, user_agent="forex-trading-bot/1.0"):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.user_agent = user_agent
+
+        self._idle = {}  # (scheme, host, port) -> [connection, ...]
+        self._lock = threading.Lock()
+
+        self._latencies = deque(maxlen=stats_window)
+        self.request_count = 0
+        self.error_count = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    def _new_connection(self, scheme, host, port):
+        """Open a connection, bounding the handshake by the connect timeout."""
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=self.connect_timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.connect_timeout)
+        conn.connect()
+        # Once connected, reads are bounded by the (usually longer) read timeout
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _acquire(self, key):
+        """Take an idle connection for the host, or open a new one."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.connections_reused += 1
+                return idle.pop(), True
+        return self._new_connection(*key), False
+
+    def _release(self, key, conn):
+        """Return a connection to the pool, closing it if the pool is full."""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, url, headers=None, method='GET'):
+        """Perform a request and return the fully read HTTPResponse."""
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        send_headers = {'User-Agent': self.user_agent, 'Accept': 'application/json'}
+        if headers:
+            send_headers.update(headers)
+
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn, reused = self._acquire(key)
+            try:
+                response = self._send(conn, method, target, send_headers)
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; retry on a fresh one
+                conn = self._new_connection(*key)
+                response = self._send(conn, method, target, send_headers)
+
+            body = response.read()
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+        except (OSError, http.client.HTTPException) as e:
+            # A connection that failed mid-request is in an unknown state; never pool it
+            if conn is not None:
+                conn.close()
+            with self._lock:
+                self.error_count += 1
+            raise FeedError(f"{method} {url} failed: {e}") from e
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.request_count += 1
+            self._latencies.append(latency)
+        return HTTPResponse(response.status, response.headers, body, latency)
+
+    @staticmethod
+    def _send(conn, method, target, headers):
+        conn.request(method, target, headers=headers)
+        return conn.getresponse()
+
+    def get_json(self, url, headers=None):
+        """GET a URL and decode its JSON body, raising FeedError on HTTP errors."""
+        response = self.request(url, headers=headers)
+        if response.status >= 400:
+            raise FeedError(f"GET {url} returned HTTP {response.status}")
+        return response.json()
+
+    def stats(self):
+        """Request counts and latency percentiles (milliseconds) over the recent window."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'requests': self.request_count,
+                'errors': self.error_count,
+                'connections_opened': self.connections_opened,
+                'connections_reused': self.connections_reused,
+            }
+
+        if latencies:
+            stats.update({
+                'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+                'p90_ms': round(percentile(latencies, 90) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+                'max_ms': round(latencies[-1] * 1000, 2),
+            })
+        return stats
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list: the smallest value with
+    at least pct% of the values at or below it."""
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Process-wide HTTPClient so every feed user shares the same warm connections."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HTTPClient()
+        return _default_client
+
+
+def build_latest_url(api_url=FRANKFURTER_URL, base='USD', symbols=None):
+    """Build a /latest URL. Without symbols the provider returns every currency it publishes."""
+    url = f"{api_url}?from={base}"
+    if symbols:
+        url += f"&to={','.join(symbols)}"
+    return url
+
+
+def fetch_latest(api_url=FRANKFURTER_URL, base='USD', symbols=None, client=None):
+    """Fetch the latest rates for the whole currency universe in a single request.
+
+    Returns the decoded JSON body: {'amount', 'base', 'date', 'rates': {currency: rate}}.
+    """
+    client = client or get_default_client()
+    return client.get_json(build_latest_url(api_url, base, symbols))
+
+
+class RateFeed:
+    """Polls /latest with conditional requests and reports when nothing changed.
+
+    Frankfurter publishes reference rates once per business day, so most polls
+    return data we have already seen. The feed sends If-None-Match /
+    If-Modified-Since when the server provided validators, skips JSON parsing when
+    the body is byte-for-byte identical, and also treats a repeated `date` field as
+    unchanged.
+    """
+
+    def __init__(self, api_url=FRANKFURTER_URL, base='USD', symbols=None, client=None):
+        self.api_url = api_url
+        self.base = base
+        self.symbols = symbols
+        self.client = client or get_default_client()
+
+        self.etag = None
+        self.last_modified = None
+        self.date = None
+        self._last_body = None
+
+        self.changed_count = 0
+        self.unchanged_count = 0
+
+    def poll(self):
+        """Return the decoded body if the rates changed since the last poll, else None."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        url = build_latest_url(self.api_url, self.base, self.symbols)
+        response = self.client.request(url, headers=headers)
+
+        if response.status == 304:
+            self.unchanged_count += 1
+            return None
+        if response.status >= 400:
+            raise FeedError(f"GET {url} returned HTTP {response.status}")
+
+        self.etag = response.headers.get('ETag') or self.etag
+        self.last_modified = response.headers.get('Last-Modified') or self.last_modified
+
+        # Identical bytes need no parsing at all
+        if response.body == self._last_body:
+            self.unchanged_count += 1
+            return None
+        self._last_body = response.body
+
+        data = response.json()
+        if data.get('date') is not None and data.get('date') == self.date:
+            self.unchanged_count += 1
+            return None
+
+        self.date = data.get('date')
+        self.changed_count += 1
+        return data
+
+
+def cross_rate_matrix(rates, base='USD'):
+    """Derive every cross rate from a single base-currency rate vector.
+
+    `rates` maps currency -> units of that currency per 1 unit of `base`. Returns
+    (currencies, matrix) where matrix[i, j] is the units of currencies[j] per 1 unit
+    of currencies[i]; the base currency is included with a rate of 1.0.
+    """
+    import numpy as np
+
+    currencies = [base] + sorted(currency for currency in rates if currency != base)
+    vector = np.array([1.0] + [rates[currency] for currency in currencies[1:]], dtype=np.float64)
+
+    # (i -> base) * (base -> j) for every i, j in one outer product
+    return currencies, np.outer(1.0 / vector, vector)
+
+
+class RateProvider:
+    """A source of USD-based exchange rates for the multi-provider runtimes.
+
+    Subclasses implement fetch(), returning {currency: units per 1 USD}. Each provider
+    carries its own timeout so one slow source cannot hold up the others.
+    """
+
+    name = 'provider'
+
+    def __init__(self, base_url, timeout=5.0):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def fetch(self, client, symbols=None):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.base_url!r})"
+
+
+class FrankfurterProvider(RateProvider):
+    """ECB reference rates from api.frankfurter.app (one request for all currencies)."""
+
+    name = 'frankfurter'
+
+    def __init__(self, base_url=FRANKFURTER_URL, timeout=5.0):
+        super().__init__(base_url, timeout)
+
+    def fetch(self, client, symbols=None):
+        data = client.get_json(build_latest_url(self.base_url, 'USD', symbols))
+        return _validated_rates(data.get('rates'), self.name)
+
+
+class ExchangeRateHostProvider(RateProvider):
+    """Rates from api.exchangerate.host, the API checked by test_setup.py."""
+
+    name = 'exchangerate.host'
+
+    def __init__(self, base_url="https://api.exchangerate.host/latest", timeout=5.0):
+        super().__init__(base_url, timeout)
+
+    def fetch(self, client, symbols=None):
+        url = f"{self.base_url}?base=USD"
+        if symbols:
+            url += f"&symbols={','.join(symbols)}"
+        data = client.get_json(url)
+        return _validated_rates(data.get('rates'), self.name)
+
+
+class YahooProvider(RateProvider):
+    """Yahoo Finance chart quotes, as used by the web dashboard. One request per currency."""
+
+    name = 'yahoo'
+
+    def __init__(self, base_url="https://query1.finance.yahoo.com/v8/finance/chart", timeout=5.0,
+                 default_symbols=('EUR', 'GBP')):
+        super().__init__(base_url, timeout)
+        self.default_symbols = list(default_symbols)
+
+    def fetch(self, client, symbols=None):
+        rates = {}
+        for symbol in symbols or self.default_symbols:
+            # Yahoo's "EUR=X" ticker quotes units of EUR per 1 USD
+            data = client.get_json(f"{self.base_url}/{symbol}=X")
+            try:
+                rates[symbol] = data['chart']['result'][0]['meta']['regularMarketPrice']
+            except (KeyError, IndexError, TypeError):
+                continue
+        return _validated_rates(rates, self.name)
+
+
+def _validated_rates(rates, provider_name):
+    """Keep only positive numeric rates; raise FeedError if nothing usable remains."""
+    if not isinstance(rates, dict):
+        raise FeedError(f"{provider_name}: response has no rates")
+    valid = {
+        currency: float(rate) for currency, rate in rates.items()
+        if isinstance(rate, (int, float)) and rate > 0
+    }
+    if not valid:
+        raise FeedError(f"{provider_name}: response has no usable rates")
+    return valid
+
+
+def default_providers():
+    """Providers in priority order: Frankfurter first, the others as fallbacks."""
+    return [FrankfurterProvider(), ExchangeRateHostProvider(), YahooProvider()]
+
+
+class HedgedFetcher:
+    """Hedged requests across a primary and a secondary rate provider.
+
+    The primary is asked first. If it has not answered by a deadline taken from a
+    percentile of its own recent latencies, the same request is also sent to the
+    secondary and whichever valid answer arrives first wins. An early primary
+    failure falls over to the secondary immediately. stats() reports how often
+    the hedge fired and how much latency it saved.
+    """
+
+    def __init__(self, primary, secondary, client=None, percentile=95, initial_deadline=1.0,
+                 min_deadline=0.05, window=200):
+        self.primary = primary
+        self.secondary = secondary
+        self.client = client or get_default_client()
+        self.percentile = percentile
+        self.initial_deadline = initial_deadline
+        self.min_deadline = min_deadline
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='hedge')
+        self._lock = threading.Lock()
+        self._primary_latencies = deque(maxlen=window)
+        self._saved = deque(maxlen=window)
+
+        self.request_count = 0
+        self.hedge_count = 0
+        self.secondary_wins = 0
+        self.failures = 0
+
+    def deadline(self):
+        """Seconds to wait for the primary before hedging."""
+        with self._lock:
+            latencies = sorted(self._primary_latencies)
+        if len(latencies) < 10:
+            return self.initial_deadline
+        return max(self.min_deadline, percentile(latencies, self.percentile))
+
+    def _timed_fetch(self, provider, symbols):
+        start = time.perf_counter()
+        try:
+            return provider.fetch(self.client, symbols), time.perf_counter() - start
+        except Exception as e:
+            e.latency = time.perf_counter() - start
+            raise
+
+    def fetch(self, symbols=None):
+        """Return (provider name, rates) from the first provider to answer validly."""
+        with self._lock:
+            self.request_count += 1
+        deadline = self.deadline()
+        start = time.perf_counter()
+
+        primary = self._executor.submit(self._timed_fetch, self.primary, symbols)
+        primary.add_done_callback(self._record_primary)
+
+        done, _ = concurrent.futures.wait([primary], timeout=deadline)
+        if done and primary.exception() is None:
+            return self.primary.name, primary.result()[0]
+
+        # Primary is slow (hedge) or already failed (failover): ask the secondary too
+        hedged = not done
+        if hedged:
+            with self._lock:
+                self.hedge_count += 1
+        secondary = self._executor.submit(self._timed_fetch, self.secondary, symbols)
+
+        pending = {primary, secondary}
+        timeout = max(self.primary.timeout, self.secondary.timeout)
+        while pending:
+            remaining = timeout - (time.perf_counter() - start)
+            if remaining <= 0:
+                break
+            done, pending = concurrent.futures.wait(
+                pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    continue
+                rates = future.result()[0]
+                if future is secondary:
+                    won_at = time.perf_counter() - start
+                    with self._lock:
+                        self.secondary_wins += 1
+                    if hedged:
+                        primary.add_done_callback(lambda f, won_at=won_at: self._record_saved(f, won_at))
+                    return self.secondary.name, rates
+                return self.primary.name, rates
+
+        with self._lock:
+            self.failures += 1
+        raise FeedError(f"Neither {self.primary.name} nor {self.secondary.name} returned usable rates")
+
+    def _record_primary(self, future):
+        latency = self._future_latency(future)
+        with self._lock:
+            self._primary_latencies.append(latency)
+
+    def _record_saved(self, primary_future, won_at):
+        saved = self._future_latency(primary_future) - won_at
+        with self._lock:
+            self._saved.append(max(0.0, saved))
+
+    @staticmethod
+    def _future_latency(future):
+        error = future.exception()
+        if error is None:
+            return future.result()[1]
+        return getattr(error, 'latency', 0.0)
+
+    def stats(self):
+        """Hedge rate and latency saved (milliseconds) over the recent window."""
+        with self._lock:
+            saved = sorted(self._saved)
+            stats = {
+                'requests': self.request_count,
+                'hedges_fired': self.hedge_count,
+                'hedge_rate': round(self.hedge_count / self.request_count, 4) if self.request_count else 0.0,
+                'secondary_wins': self.secondary_wins,
+                'failures': self.failures,
+            }
+        stats['deadline_ms'] = round(self.deadline() * 1000, 2)
+        if saved:
+            stats['saved_p50_ms'] = round(percentile(saved, 50) * 1000, 2)
+            stats['saved_p99_ms'] = round(percentile(saved, 99) * 1000, 2)
+        return stats
+
+    def close(self):
+        """Stop the worker threads without waiting for in-flight requests."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Forex Price History
+Preallocated columnar in-memory store of every tick the bot has seen: one int64
+timestamp column plus one float64 column per currency. Strategies read zero-copy
+NumPy views over any window instead of re-querying SQLite.
+"""
+
+import numpy as np
+
+
+class PriceHistory:
+    """Columnar tick store with amortized (doubling) growth.
+
+    Storage is one contiguous row per currency, so a window of one pair is a
+    contiguous slice. Memory is exactly bytes_per_tick * capacity. Views returned by
+    window()/matrix() share memory with the store and stay valid until the next
+    growth, which happens only when capacity is exceeded (or a currency is added).
+    """
+
+    def __init__(self, currencies=(), capacity=4096):
+        self.currencies = list(currencies)
+        self._index = {currency: i for i, currency in enumerate(self.currencies)}
+        self._capacity = max(1, capacity)
+        self._length = 0
+        self._timestamps = np.empty(self._capacity, dtype=np.int64)  # epoch microseconds
+        self._prices = np.full((len(self.currencies), self._capacity), np.nan, dtype=np.float64)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def bytes_per_tick(self):
+        """Memory per stored tick: one int64 timestamp plus one float64 per currency."""
+        return 8 * (1 + len(self.currencies))
+
+    @property
+    def nbytes(self):
+        """Bytes currently allocated (including unused capacity)."""
+        return self._timestamps.nbytes + self._prices.nbytes
+
+    def _grow(self, minimum):
+        capacity = self._capacity
+        while capacity < minimum:
+            capacity *= 2
+        timestamps = np.empty(capacity, dtype=np.int64)
+        timestamps[:self._length] = self._timestamps[:self._length]
+        prices = np.full((len(self.currencies), capacity), np.nan, dtype=np.float64)
+        prices[:, :self._length] = self._prices[:, :self._length]
+        self._timestamps, self._prices, self._capacity = timestamps, prices, capacity
+
+    def add_currency(self, currency):
+        """Add a column for a new currency; earlier ticks read as NaN."""
+        if currency in self._index:
+            return
+        self._index[currency] = len(self.currencies)
+        self.currencies.append(currency)
+        column = np.full((1, self._capacity), np.nan, dtype=np.float64)
+        self._prices = np.vstack([self._prices, column])
+
+    def append(self, timestamp_us, prices):
+        """Append one tick from a {currency: price} dict; missing currencies are stored as NaN."""
+        for currency in prices:
+            if currency not in self._index:
+                self.add_currency(currency)
+        if self._length == self._capacity:
+            self._grow(self._length + 1)
+
+        row = self._length
+        self._timestamps[row] = timestamp_us
+        column = self._prices[:, row]
+        column[:] = np.nan
+        for currency, price in prices.items():
+            column[self._index[currency]] = price
+        self._length += 1
+
+    def extend(self, timestamps_us, matrix):
+        """Append many ticks at once; matrix has shape (ticks, currencies) in self.currencies order."""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        count = len(timestamps_us)
+        if self._length + count > self._capacity:
+            self._grow(self._length + count)
+        end = self._length + count
+        self._timestamps[self._length:end] = timestamps_us
+        self._prices[:, self._length:end] = matrix.T
+        self._length = end
+
+    def _bounds(self, last=None):
+        start = 0 if last is None else max(0, self._length - last)
+        return start, self._length
+
+    def timestamps(self, last=None):
+        """Zero-copy view of the timestamp column (optionally only the last N ticks)."""
+        start, end = self._bounds(last)
+        return self._timestamps[start:end]
+
+    def window(self, currency, last=None):
+        """Zero-copy view of one currency's prices (optionally only the last N ticks)."""
+        start, end = self._bounds(last)
+        return self._prices[self._index[currency], start:end]
+
+    def between(self, currency, start_us, end_us):
+        """Zero-copy view of one currency's prices with start_us <= timestamp < end_us."""
+        timestamps = self._timestamps[:self._length]
+        start = int(np.searchsorted(timestamps, start_us, side='left'))
+        end = int(np.searchsorted(timestamps, end_us, side='left'))
+        return self._prices[self._index[currency], start:end]
+
+    def matrix(self, last=None):
+        """Zero-copy (currencies, ticks) view of every column (optionally only the last N ticks)."""
+        start, end = self._bounds(last)
+        return self._prices[:, start:end]
+
+    def latest(self):
+        """Most recent price per currency as a {currency: price} dict."""
+        if not self._length:
+            return {}
+        column = self._prices[:, self._length - 1]
+        return {currency: float(column[i]) for i, currency in enumerate(self.currencies)
+                if not np.isnan(column[i])}
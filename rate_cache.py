@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Forex Rate Cache
+On-disk, memory-mapped copy of the daily_rates history for backtests and sweeps.
+The cache holds an int64 day index plus one fixed-width float64 column per
+currency, laid out back to back in a single file, so opening it is an mmap with
+no parsing and no copying, and every process that opens it shares the same page
+cache. The cache records which database and daily_rates contents it was built
+from and is rebuilt automatically when the backfill adds dates or another database
+is opened with the same cache directory.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from backfill import day_to_date
+from storage import DB_PATH
+
+DEFAULT_CACHE_DIR = '.rate_cache'
+INDEX_FILE = 'index.json'
+
+
+def _has_daily_rates(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_rates'").fetchone() is not None
+
+
+def source_stamp(db_path):
+    """Fingerprint of the daily_rates table: (rows, first day, last day).
+
+    A database the backfill never wrote to has no table and stamps as empty.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if not _has_daily_rates(conn):
+            return [0, None, None]
+        count, first, last = conn.execute("SELECT COUNT(*), MIN(day), MAX(day) FROM daily_rates").fetchone()
+    finally:
+        conn.close()
+    return [count, first, last]
+
+
+def source_path(db_path):
+    """The database path recorded in the index, so caches of different databases never mix."""
+    return os.path.realpath(db_path)
+
+
+class RateCache:
+    """Memory-mapped rate history built from a database's daily_rates table.
+
+    days is an int64 array of epoch days (see backfill.epoch_day); column(currency) and
+    matrix() are read-only views straight onto the mapped file. Missing rates are NaN.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, db_path=DB_PATH):
+        self.cache_dir = cache_dir
+        self.db_path = db_path
+        self.currencies = []
+        self.days = None
+        self._columns = None
+        self._index = {}
+        self.rebuilt = False
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def open(self, check=True):
+        """Map the cache, rebuilding it first if it is missing, was built from another
+        database or daily_rates has changed.
+
+        Worker processes opened after the parent has checked can pass check=False to skip
+        the database query.
+        """
+        index = self._read_index()
+        if (index is None or index.get('source') != source_path(self.db_path)
+                or (check and index['stamp'] != source_stamp(self.db_path))):
+            index = self.build()
+            self.rebuilt = True
+
+        count = index['count']
+        self.currencies = index['currencies']
+        self._index = {currency: i for i, currency in enumerate(self.currencies)}
+        self.days = np.memmap(os.path.join(self.cache_dir, index['days_file']), dtype=np.int64,
+                              mode='r', shape=(count,)) if count else np.empty(0, dtype=np.int64)
+        self._columns = np.memmap(os.path.join(self.cache_dir, index['rates_file']), dtype=np.float64,
+                                  mode='r', shape=(len(self.currencies), count)) \
+            if count and self.currencies else np.empty((len(self.currencies), count))
+        return self
+
+    def build(self):
+        """Rewrite the cache from daily_rates and return its new index.
+
+        Data files carry the build's stamp in their names and index.json is replaced last,
+        so readers never see a half-written cache; processes still mapping the previous
+        files keep a valid view of them.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        stamp = source_stamp(self.db_path)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute("SELECT currency, day, rate FROM daily_rates").fetchall() \
+                if _has_daily_rates(conn) else []
+        finally:
+            conn.close()
+
+        if rows:
+            currency_codes, days, rates = zip(*rows)
+            currencies, currency_rows = np.unique(np.array(currency_codes), return_inverse=True)
+            unique_days, day_columns = np.unique(np.array(days, dtype=np.int64), return_inverse=True)
+            columns = np.full((len(currencies), len(unique_days)), np.nan)
+            columns[currency_rows, day_columns] = rates
+            currencies = currencies.tolist()
+        else:
+            currencies, unique_days, columns = [], np.empty(0, dtype=np.int64), np.empty((0, 0))
+
+        suffix = f"{stamp[0]}-{stamp[1]}-{stamp[2]}-{os.getpid()}-{time.time_ns()}"
+        index = {
+            'source': source_path(self.db_path),
+            'stamp': stamp,
+            'count': len(unique_days),
+            'currencies': currencies,
+            'days_file': f"days-{suffix}.i8",
+            'rates_file': f"rates-{suffix}.f8",
+        }
+        unique_days.astype(np.int64).tofile(os.path.join(self.cache_dir, index['days_file']))
+        np.ascontiguousarray(columns, dtype=np.float64).tofile(os.path.join(self.cache_dir, index['rates_file']))
+
+        temporary = os.path.join(self.cache_dir, INDEX_FILE + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(index, f)
+        os.replace(temporary, os.path.join(self.cache_dir, INDEX_FILE))
+
+        # Earlier builds are no longer referenced
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(('.i8', '.f8')) and name not in (index['days_file'], index['rates_file']):
+                os.remove(os.path.join(self.cache_dir, name))
+        return index
+
+    def __len__(self):
+        return 0 if self.days is None else len(self.days)
+
+    def column(self, currency):
+        """Zero-copy view of one currency's rates."""
+        return self._columns[self._index[currency]]
+
+    def matrix(self, currencies=None):
+        """(days, currencies) rate matrix: a zero-copy view for all currencies, a copy for a subset."""
+        if currencies is None or list(currencies) == self.currencies:
+            return self._columns.T
+        return self._columns[[self._index[currency] for currency in currencies]].T
+
+    def dates(self):
+        """ISO date strings for the day index."""
+        return [day_to_date(int(day)).isoformat() for day in self.days]
+
+
+def load_cached_rates(db_path=DB_PATH, cache_dir=DEFAULT_CACHE_DIR, currencies=None):
+    """Backtest input from the cache, in load_rates() form: (dates, pairs, rates)."""
+    cache = RateCache(cache_dir, db_path).open()
+    pairs = list(currencies) if currencies else cache.currencies
+    return cache.dates(), pairs, cache.matrix(pairs)
+
+
+def main(argv=None):
+    """Build (or validate) the cache for a database and report its size."""
+    db_path = argv[0] if argv else DB_PATH
+    started = time.perf_counter()
+    cache = RateCache(DEFAULT_CACHE_DIR, db_path).open()
+    elapsed = time.perf_counter() - started
+    print(f"🗂️  Rate cache {'rebuilt' if cache.rebuilt else 'up to date'} in {elapsed * 1000:.1f} ms: "
+          f"{len(cache):,} days x {len(cache.currencies)} currencies in {DEFAULT_CACHE_DIR}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
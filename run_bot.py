@@ -4,19 +4,25 @@ Forex Trading Bot Runner
 Simple script to start the trading bot with proper error handling.
 """
 
+import argparse
 import sys
 from bot import ForexTradingBot
 
 def main():
     """Main function to run the trading bot."""
+    parser = argparse.ArgumentParser(description="Start the Forex trading bot")
+    parser.add_argument('--hedged', action='store_true',
+                        help="Hedge slow Frankfurter responses with a request to exchangerate.host")
+    args = parser.parse_args()
+    
     print("🤖 Starting Forex Trading Bot...")
     print("=" * 50)
     
     try:
         # Create and run the bot
-        bot = ForexTradingBot()
+        bot = ForexTradingBot(hedged=args.hedged)
         print("✅ Bot initialized successfully!")
-        print("📊 Monitoring EUR/USD and GBP/USD via public API")
+        print("📊 Monitoring every published currency against USD via public API")
         print("🔄 Running trading cycles every minute...")
         print("💡 Press Ctrl+C to stop the bot")
         print("=" * 50)
@@ -0,0 +1,895 @@
+#!/usr/bin/env python3
+"""
+Forex Trade Storage
+Long-lived SQLite connection for the trading bots. The database runs in WAL mode
+so the Streamlit and mobile dashboards can keep reading while the bot writes,
+and all writes from one trading cycle are grouped into a single transaction.
+WriteBehindWriter moves those writes onto a background thread. Every trade carries
+an account id, so one database can hold several simulated accounts, and balance
+heartbeats go to an append-only snapshot table rather than into trades. Per-account
+and per-pair totals are kept in summary tables updated in the same transaction as
+the trades themselves, so dashboard statistics cost the same at any history size.
+Balances and prices are also rolled up into 1m/1h/1d OHLC bars as they are written,
+so charts read at most a few points per pixel whatever the time span. Old trades and
+snapshots can be moved out to compressed segment files by archive.py; the segments
+are listed in the archive_segments table.
+
+Timestamps are stored as integer microseconds since 1970-01-01 of the bot's
+(naive) wall clock, and trades are indexed by (pair, ts) and (action, ts), so the
+dashboards' recent-trade and count queries read an index instead of scanning and
+sorting the whole table. The schema is versioned with PRAGMA user_version and
+older databases are migrated in place when they are opened.
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = 'forex_trading.db'
+
+# Account that single-account bots trade under, and whose balances the dashboards show
+DEFAULT_ACCOUNT = 'default'
+
+# Trade actions shown on the dashboards
+TRADE_ACTIONS = ('BUY', 'SELL')
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# WAL lets readers proceed during writes; NORMAL sync is durable across app crashes in WAL mode
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # 16 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+TRADES_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts INTEGER NOT NULL,
+        pair TEXT NOT NULL,
+        action TEXT NOT NULL,
+        price REAL NOT NULL,
+        balance REAL NOT NULL,
+        account_id TEXT NOT NULL DEFAULT 'default'
+    )
+'''
+
+# Append-only and ordered by rowid: snapshots taken in the same microsecond are all kept,
+# and the latest one per account is a single step down the account index
+BALANCE_SNAPSHOTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS balance_snapshots (
+        id INTEGER PRIMARY KEY,
+        ts INTEGER NOT NULL,
+        account_id TEXT NOT NULL DEFAULT 'default',
+        balance REAL NOT NULL
+    )
+'''
+BALANCE_SNAPSHOTS_INDEX = "CREATE INDEX IF NOT EXISTS balance_snapshots_account ON balance_snapshots (account_id)"
+
+# Running totals per account, maintained by TradeStore.write_many() alongside the rows they summarize
+ACCOUNT_SUMMARY_TABLE = '''
+    CREATE TABLE IF NOT EXISTS account_summary (
+        account_id TEXT PRIMARY KEY,
+        trades INTEGER NOT NULL DEFAULT 0,
+        last_trade_id INTEGER,
+        balance REAL,
+        balance_ts INTEGER,
+        realized_pnl REAL NOT NULL DEFAULT 0,
+        unrealized_pnl REAL NOT NULL DEFAULT 0
+    )
+'''
+TRADE_TOTALS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS trade_totals (
+        account_id TEXT NOT NULL,
+        pair TEXT NOT NULL,
+        action TEXT NOT NULL,
+        trades INTEGER NOT NULL,
+        PRIMARY KEY (account_id, pair, action)
+    ) WITHOUT ROWID
+'''
+
+# SET expressions see the stored row, so the balance only moves forward in time
+SUMMARY_UPSERT = '''
+    INSERT INTO account_summary (account_id, trades, last_trade_id, balance_ts, balance)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (account_id) DO UPDATE SET
+        trades = trades + excluded.trades,
+        last_trade_id = COALESCE(excluded.last_trade_id, last_trade_id),
+        balance = CASE WHEN balance_ts IS NULL OR excluded.balance_ts >= balance_ts
+                       THEN excluded.balance ELSE balance END,
+        balance_ts = MAX(COALESCE(balance_ts, excluded.balance_ts), excluded.balance_ts)
+'''
+TOTALS_UPSERT = '''
+    INSERT INTO trade_totals (account_id, pair, action, trades)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (account_id, pair, action) DO UPDATE SET trades = trades + excluded.trades
+'''
+# P&L is re-summed from the account's few positions rows
+PNL_REFRESH = '''
+    INSERT INTO account_summary (account_id, realized_pnl, unrealized_pnl)
+    SELECT account_id, TOTAL(realized_pnl), TOTAL(unrealized_pnl) FROM positions
+    WHERE account_id = ? GROUP BY account_id
+    ON CONFLICT (account_id) DO UPDATE SET
+        realized_pnl = excluded.realized_pnl,
+        unrealized_pnl = excluded.unrealized_pnl
+'''
+
+# OHLC bar sizes in seconds, finest first
+ROLLUP_RESOLUTIONS = (60, 3600, 86400)
+
+# One bar per (series, resolution, bucket start in microseconds); series is
+# balance_series() or price_series()
+ROLLUPS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS rollups (
+        series TEXT NOT NULL,
+        resolution INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        open REAL NOT NULL,
+        high REAL NOT NULL,
+        low REAL NOT NULL,
+        close REAL NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (series, resolution, bucket)
+    ) WITHOUT ROWID
+'''
+# Points arrive in time order, so the stored open stays and the new close wins
+ROLLUP_UPSERT = '''
+    INSERT INTO rollups (series, resolution, bucket, open, high, low, close, count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (series, resolution, bucket) DO UPDATE SET
+        high = MAX(high, excluded.high),
+        low = MIN(low, excluded.low),
+        close = excluded.close,
+        count = count + excluded.count
+'''
+
+# Cold segment files written by archive.py, one per table and id range. A segment is
+# listed here in the same transaction that deletes its rows from the source table
+ARCHIVE_SEGMENTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS archive_segments (
+        name TEXT PRIMARY KEY,
+        source TEXT NOT NULL,
+        first_id INTEGER NOT NULL,
+        last_id INTEGER NOT NULL,
+        first_ts INTEGER NOT NULL,
+        last_ts INTEGER NOT NULL,
+        rows INTEGER NOT NULL,
+        bytes INTEGER NOT NULL
+    )
+'''
+
+# Keyed on (pair, ts) and (action, ts) and carrying the other displayed columns, so
+# per-pair and recent-trade queries are answered from the index alone
+TRADE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS trades_pair_ts ON trades (pair, ts, action, price, balance)",
+    "CREATE INDEX IF NOT EXISTS trades_action_ts ON trades (action, ts, pair, price, balance)",
+)
+
+
+def to_micros(timestamp):
+    """Integer microseconds since 1970-01-01 for a datetime or ISO-8601 string (ints pass through).
+
+    Naive timestamps are taken as written; aware ones are converted to UTC first.
+    """
+    if isinstance(timestamp, int):
+        return timestamp
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def from_micros(ts):
+    """Inverse of to_micros(): a naive datetime."""
+    return EPOCH + timedelta(microseconds=ts)
+
+
+def balance_series(account_id=DEFAULT_ACCOUNT):
+    """Rollup series name for an account's balance."""
+    return f"balance:{account_id}"
+
+
+def price_series(pair):
+    """Rollup series name for a pair's price."""
+    return f"price:{pair}"
+
+
+def fold_rollups(points):
+    """Aggregate time-ordered (series, ts, value) points into rollup rows for every resolution."""
+    bars = {}
+    for series, ts, value in points:
+        for resolution in ROLLUP_RESOLUTIONS:
+            key = (series, resolution, ts - ts % (resolution * 1_000_000))
+            bar = bars.get(key)
+            if bar is None:
+                bars[key] = [value, value, value, value, 1]
+                continue
+            if value > bar[1]:
+                bar[1] = value
+            if value < bar[2]:
+                bar[2] = value
+            bar[3] = value
+            bar[4] += 1
+    return [key + tuple(bar) for key, bar in bars.items()]
+
+
+def pick_resolution(span, width):
+    """Coarsest resolution giving at least `width` bars over `span` microseconds (else the finest)."""
+    for resolution in reversed(ROLLUP_RESOLUTIONS):
+        if span // (resolution * 1_000_000) + 1 >= width:
+            return resolution
+    return ROLLUP_RESOLUTIONS[0]
+
+
+def _add_account_id(conn):
+    """Add trades.account_id; trades written before multi-account support belong to the default account."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(trades)")}
+    if 'account_id' not in columns:
+        conn.execute("ALTER TABLE trades ADD COLUMN account_id TEXT NOT NULL DEFAULT 'default'")
+
+
+def _integer_timestamps(conn):
+    """Rebuild trades and balances with integer microsecond timestamps."""
+    conn.create_function('to_micros', 1, to_micros, deterministic=True)
+
+    conn.execute(TRADES_TABLE.format(name='trades_migrated'))
+    conn.execute('''
+        INSERT INTO trades_migrated (id, ts, pair, action, price, balance, account_id)
+        SELECT id, to_micros(timestamp), pair, action, price, balance, account_id FROM trades ORDER BY id
+    ''')
+    conn.execute("DROP TABLE trades")
+    conn.execute("ALTER TABLE trades_migrated RENAME TO trades")
+
+    conn.execute("CREATE TABLE balances_migrated (ts INTEGER PRIMARY KEY, balance REAL NOT NULL)")
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'balances'").fetchone():
+        conn.execute('''
+            INSERT OR REPLACE INTO balances_migrated (ts, balance)
+            SELECT to_micros(timestamp), balance FROM balances ORDER BY timestamp
+        ''')
+        conn.execute("DROP TABLE balances")
+    conn.execute("ALTER TABLE balances_migrated RENAME TO balances")
+
+
+def _balance_snapshots(conn):
+    """Move balances and the SYSTEM/BALANCE_UPDATE trades into the append-only balance_snapshots table."""
+    conn.execute(BALANCE_SNAPSHOTS_TABLE)
+    # balances already holds every default-account heartbeat; other accounts only had theirs in trades
+    conn.execute('''
+        INSERT INTO balance_snapshots (ts, account_id, balance)
+        SELECT ts, account_id, balance FROM (
+            SELECT ts, 'default' AS account_id, balance FROM balances
+            UNION ALL
+            SELECT ts, account_id, balance FROM trades WHERE pair = 'SYSTEM' AND account_id != 'default'
+        ) ORDER BY ts
+    ''')
+    conn.execute("DELETE FROM trades WHERE pair = 'SYSTEM'")
+    conn.execute("DROP TABLE balances")
+
+
+def _summary_tables(conn):
+    """Build account_summary and trade_totals from the existing history."""
+    conn.execute(ACCOUNT_SUMMARY_TABLE)
+    conn.execute(TRADE_TOTALS_TABLE)
+    conn.execute('''
+        INSERT INTO trade_totals (account_id, pair, action, trades)
+        SELECT account_id, pair, action, COUNT(*) FROM trades GROUP BY account_id, pair, action
+    ''')
+
+    # Latest balance per account: its last trade or its last snapshot, whichever is later
+    rows = conn.execute('''
+        SELECT t.account_id, t.trades, t.last_trade_id, trades.ts, trades.balance
+        FROM (SELECT account_id, COUNT(*) AS trades, MAX(id) AS last_trade_id FROM trades GROUP BY account_id) AS t
+        JOIN trades ON trades.id = t.last_trade_id
+        UNION ALL
+        SELECT account_id, 0, NULL, ts, balance FROM balance_snapshots
+        WHERE id IN (SELECT MAX(id) FROM balance_snapshots GROUP BY account_id)
+    ''').fetchall()
+    conn.executemany(SUMMARY_UPSERT, rows)
+
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'positions'").fetchone():
+        accounts = conn.execute("SELECT DISTINCT account_id FROM positions").fetchall()
+        conn.executemany(PNL_REFRESH, accounts)
+
+
+def _rollup_tables(conn):
+    """Roll the existing balance snapshots up into 1m/1h/1d OHLC bars."""
+    conn.execute(ROLLUPS_TABLE)
+    accounts = [row[0] for row in conn.execute("SELECT DISTINCT account_id FROM balance_snapshots")]
+    for account_id in accounts:
+        # Folded one account at a time, in id order, through the account index
+        cursor = conn.execute(
+            "SELECT ts, balance FROM balance_snapshots WHERE account_id = ? ORDER BY id", (account_id,))
+        series = balance_series(account_id)
+        conn.executemany(ROLLUP_UPSERT, fold_rollups((series, ts, balance) for ts, balance in cursor))
+
+
+def _archive_catalogue(conn):
+    """Create the archive_segments catalogue of cold segment files."""
+    conn.execute(ARCHIVE_SEGMENTS_TABLE)
+
+
+# MIGRATIONS[n] upgrades a database at user_version n to n + 1; append new steps here
+MIGRATIONS = (_add_account_id, _integer_timestamps, _balance_snapshots, _summary_tables, _rollup_tables,
+              _archive_catalogue)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn):
+    """Bring a database up to SCHEMA_VERSION in one transaction. Returns the version it started at.
+
+    A database without a trades table is new: it is stamped with the current version and
+    create_tables() builds the current schema directly.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return version
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated while this one waited for the write lock
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trades'").fetchone():
+            for number, step in enumerate(MIGRATIONS[version:], version + 1):
+                logger.info(f"Applying schema migration {number}: {step.__doc__}")
+                step(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return version
+
+
+def connect(db_path=DB_PATH):
+    """Reader connection (dashboards) on a database migrated to the current schema."""
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    return conn
+
+
+def recent_trades(conn, limit, pair=None, account_id=None):
+    """Latest (ts, pair, action, price, balance) BUY/SELL rows, newest first, optionally for one
+    pair and/or one account.
+
+    Each action is read backwards along its own index and the two short lists are merged,
+    so the cost depends on limit rather than on the size of the table.
+    """
+    params = {'limit': limit, 'pair': pair, 'account_id': account_id}
+    account = " AND account_id = :account_id" if account_id is not None else ""
+    if pair is not None:
+        return conn.execute(f'''
+            SELECT ts, pair, action, price, balance FROM trades
+            WHERE pair = :pair AND action IN ('BUY', 'SELL'){account}
+            ORDER BY ts DESC LIMIT :limit
+        ''', params).fetchall()
+    return conn.execute(f'''
+        SELECT * FROM (SELECT ts, pair, action, price, balance FROM trades
+                       WHERE action = 'BUY'{account} ORDER BY ts DESC LIMIT :limit)
+        UNION ALL
+        SELECT * FROM (SELECT ts, pair, action, price, balance FROM trades
+                       WHERE action = 'SELL'{account} ORDER BY ts DESC LIMIT :limit)
+        ORDER BY ts DESC LIMIT :limit
+    ''', params).fetchall()
+
+
+def trade_counts(conn, account_id=None):
+    """{'BUY': n, 'SELL': n} trade counts for one account or all of them, from trade_totals."""
+    query = "SELECT action, SUM(trades) FROM trade_totals WHERE action IN ('BUY', 'SELL')"
+    params = ()
+    if account_id is not None:
+        query += " AND account_id = ?"
+        params = (account_id,)
+    counts = dict.fromkeys(TRADE_ACTIONS, 0)
+    counts.update(conn.execute(query + " GROUP BY action", params).fetchall())
+    return counts
+
+
+def account_summary(conn, account_id=DEFAULT_ACCOUNT):
+    """An account's account_summary row as a dict, plus its per-pair trade counts, or None."""
+    cursor = conn.execute("SELECT * FROM account_summary WHERE account_id = ?", (account_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    summary = dict(zip((column[0] for column in cursor.description), row))
+    summary['pairs'] = {}
+    for pair, action, trades in conn.execute(
+            "SELECT pair, action, trades FROM trade_totals WHERE account_id = ?", (account_id,)):
+        summary['pairs'].setdefault(pair, dict.fromkeys(TRADE_ACTIONS, 0))[action] = trades
+    return summary
+
+
+def _edge_bucket(conn, series, resolution, last=False):
+    """First (or last) bucket of one resolution of a series, or None: a single index probe."""
+    row = conn.execute(f'''
+        SELECT bucket FROM rollups WHERE series = ? AND resolution = ?
+        ORDER BY bucket {'DESC' if last else 'ASC'} LIMIT 1
+    ''', (series, resolution)).fetchone()
+    return row[0] if row else None
+
+
+def rollup_history(conn, series, width, start=None, end=None):
+    """(resolution, [(bucket, open, high, low, close)]) for a chart `width` pixels wide.
+
+    Uses the coarsest resolution that still has a bar per pixel over [start, end] (the
+    whole series by default), so a chart gets between `width` and a few dozen times
+    `width` points however long the history is. Bucket times are to_micros() integers.
+    Where archive.py has dropped the finer bars before `start`, the next coarser
+    resolution that still covers it is used instead.
+    """
+    # Single-row index probes per resolution; MIN and MAX in one query would scan the range
+    firsts = [_edge_bucket(conn, series, resolution) for resolution in ROLLUP_RESOLUTIONS]
+    if firsts[-1] is None:
+        return ROLLUP_RESOLUTIONS[0], []
+    lasts = [_edge_bucket(conn, series, resolution, last=True) for resolution in ROLLUP_RESOLUTIONS]
+
+    # A resolution is complete from where the next coarser one is, unless its first bar starts
+    # after that one's first bar has ended: then it was pruned up to its first bar
+    kept_from = list(firsts)
+    for i in reversed(range(len(ROLLUP_RESOLUTIONS) - 1)):
+        if firsts[i] is None or firsts[i] >= firsts[i + 1] + ROLLUP_RESOLUTIONS[i + 1] * 1_000_000:
+            continue
+        kept_from[i] = kept_from[i + 1]
+
+    start = firsts[-1] if start is None else to_micros(start)
+    end = max(last for last in lasts if last is not None) if end is None else to_micros(end)
+    index = ROLLUP_RESOLUTIONS.index(pick_resolution(end - start, width))
+    while index < len(ROLLUP_RESOLUTIONS) - 1 and (
+            kept_from[index] is None
+            or kept_from[index] > start - start % (ROLLUP_RESOLUTIONS[index] * 1_000_000)):
+        index += 1
+    resolution = ROLLUP_RESOLUTIONS[index]
+    rows = conn.execute('''
+        SELECT bucket, open, high, low, close FROM rollups
+        WHERE series = ? AND resolution = ? AND bucket BETWEEN ? AND ?
+        ORDER BY bucket
+    ''', (series, resolution, start - start % (resolution * 1_000_000), end)).fetchall()
+    return resolution, rows
+
+
+def account_ids(conn):
+    """Every account with a balance or trades, 'default' first."""
+    ids = [row[0] for row in conn.execute("SELECT account_id FROM account_summary ORDER BY account_id")]
+    return sorted(ids, key=lambda account_id: account_id != DEFAULT_ACCOUNT)
+
+
+def latest_balance(conn, account_id=DEFAULT_ACCOUNT):
+    """An account's most recent balance, or None."""
+    row = conn.execute("SELECT balance FROM account_summary WHERE account_id = ?", (account_id,)).fetchone()
+    return row[0] if row else None
+
+
+class TradeStore:
+    def __init__(self, db_path=DB_PATH):
+        """Open the database once and create the tables if needed."""
+        self.db_path = db_path
+        # The async runtime writes from a worker thread; the lock serializes access
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._pending = None
+
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
+        self.create_tables()
+
+    def create_tables(self):
+        """Migrate an older database, then create the trades, balance snapshot, accounts, positions
+        and daily rate tables."""
+        with self._lock:
+            migrate(self.conn)
+        with self._lock, self.conn:
+            self.conn.execute(TRADES_TABLE.format(name='trades'))
+            self.conn.execute(BALANCE_SNAPSHOTS_TABLE)
+            self.conn.execute(BALANCE_SNAPSHOTS_INDEX)
+            self.conn.execute(ACCOUNT_SUMMARY_TABLE)
+            self.conn.execute(TRADE_TOTALS_TABLE)
+            self.conn.execute(ROLLUPS_TABLE)
+            self.conn.execute(ARCHIVE_SEGMENTS_TABLE)
+            for index in TRADE_INDEXES:
+                self.conn.execute(index)
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS accounts (
+                    account_id TEXT PRIMARY KEY,
+                    strategy TEXT NOT NULL,
+                    config TEXT NOT NULL,
+                    initial_balance REAL NOT NULL
+                )
+            ''')
+
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS positions (
+                    account_id TEXT NOT NULL,
+                    pair TEXT NOT NULL,
+                    quantity REAL NOT NULL,
+                    avg_cost REAL NOT NULL,
+                    realized_pnl REAL NOT NULL,
+                    unrealized_pnl REAL NOT NULL,
+                    last_price REAL NOT NULL,
+                    updated TEXT NOT NULL,
+                    PRIMARY KEY (account_id, pair)
+                )
+            ''')
+
+            # Compact daily rate history (USD-based) filled by backfill.py; day = days since 1970-01-01
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS daily_rates (
+                    currency TEXT NOT NULL,
+                    day INTEGER NOT NULL,
+                    rate REAL NOT NULL,
+                    PRIMARY KEY (currency, day)
+                ) WITHOUT ROWID
+            ''')
+            # Backfill checkpoint: one row per date-range chunk already stored
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS backfill_chunks (
+                    start_date TEXT NOT NULL,
+                    end_date TEXT NOT NULL,
+                    symbols TEXT NOT NULL,
+                    rows INTEGER NOT NULL,
+                    PRIMARY KEY (start_date, end_date, symbols)
+                ) WITHOUT ROWID
+            ''')
+
+    def register_account(self, account_id, strategy, config, initial_balance):
+        """Record (or update) an account's strategy name, JSON-serializable config and starting balance."""
+        with self._lock, self.conn:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO accounts (account_id, strategy, config, initial_balance)
+                VALUES (?, ?, ?, ?)
+            ''', (account_id, strategy, json.dumps(config, sort_keys=True), initial_balance))
+
+    def log_balance(self, timestamp, balance, account_id=DEFAULT_ACCOUNT):
+        """Append a balance snapshot for one account (buffered like log_trades inside batch())."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending[1].append((timestamp, balance, account_id))
+                return
+            self._write([], [(timestamp, balance, account_id)])
+
+    def log_trades(self, records, account_id=DEFAULT_ACCOUNT):
+        """Write (timestamp, pair, action, price, balance) records for one account.
+
+        Inside batch() the records are buffered and committed together when the batch ends.
+        """
+        trades = [record + (account_id,) for record in records]
+        with self._lock:
+            if self._pending is not None:
+                self._pending[0].extend(trades)
+                return
+            self._write(trades, [])
+
+    def _write(self, trades, balances):
+        if trades or balances:
+            self.write_many(trades, balances)
+
+    def write_many(self, trades, balances, positions=(), prices=()):
+        """Insert (timestamp, pair, action, price, balance, account_id) trades,
+        (timestamp, balance, account_id) snapshots and PositionLedger.snapshot() rows in one transaction,
+        and update the summary tables and the balance and (timestamp, pair, price) tick rollups
+        in that same transaction.
+
+        Timestamps may be ISO-8601 strings, datetimes or to_micros() integers.
+        """
+        trades = [(to_micros(trade[0]),) + tuple(trade[1:]) for trade in trades]
+        balances = [(to_micros(timestamp), balance, account_id) for timestamp, balance, account_id in balances]
+        points = [(balance_series(account_id), ts, balance) for ts, balance, account_id in balances]
+        points.extend((price_series(pair), to_micros(timestamp), price) for timestamp, pair, price in prices)
+        with self._lock, self.conn:
+            last_id = None
+            if trades:
+                self.conn.executemany('''
+                    INSERT INTO trades (ts, pair, action, price, balance, account_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', trades)
+                # Cursor.lastrowid is not set by executemany()
+                last_id = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            if balances:
+                self.conn.executemany('''
+                    INSERT INTO balance_snapshots (ts, balance, account_id)
+                    VALUES (?, ?, ?)
+                ''', balances)
+            if positions:
+                # Latest state per (account, pair): later rows replace earlier ones
+                self.conn.executemany('''
+                    INSERT OR REPLACE INTO positions (account_id, pair, quantity, avg_cost,
+                                                      realized_pnl, unrealized_pnl, last_price, updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', positions)
+            self._update_summary(trades, last_id, balances, positions)
+            if points:
+                self.conn.executemany(ROLLUP_UPSERT, fold_rollups(points))
+
+    def _update_summary(self, trades, last_id, balances, positions):
+        """Fold one write into account_summary and trade_totals (called inside its transaction)."""
+        # account_id -> [trades, last trade id, balance ts, balance]
+        accounts = {}
+        totals = Counter()
+        # One writer holds the transaction, so the batch got consecutive ids ending at last_id
+        first_id = last_id - len(trades) + 1 if trades else None
+        for offset, (ts, pair, action, _, balance, account_id) in enumerate(trades):
+            totals[account_id, pair, action] += 1
+            entry = accounts.setdefault(account_id, [0, None, ts, balance])
+            entry[0] += 1
+            entry[1] = first_id + offset
+            if ts >= entry[2]:
+                entry[2], entry[3] = ts, balance
+        for ts, balance, account_id in balances:
+            entry = accounts.setdefault(account_id, [0, None, ts, balance])
+            if ts >= entry[2]:
+                entry[2], entry[3] = ts, balance
+
+        if totals:
+            self.conn.executemany(TOTALS_UPSERT, [key + (count,) for key, count in totals.items()])
+        if accounts:
+            self.conn.executemany(SUMMARY_UPSERT, [(account_id, *entry) for account_id, entry in accounts.items()])
+        if positions:
+            self.conn.executemany(PNL_REFRESH, [(account_id,) for account_id in {row[0] for row in positions}])
+
+    def write_daily_rates(self, rows, chunk=None):
+        """Bulk-insert (currency, day, rate) rows; with chunk=(start, end, symbols), checkpoint it
+        in the same transaction so a resumed backfill never sees half a chunk."""
+        with self._lock, self.conn:
+            self.conn.executemany('''
+                INSERT OR REPLACE INTO daily_rates (currency, day, rate)
+                VALUES (?, ?, ?)
+            ''', rows)
+            if chunk is not None:
+                self.conn.execute('''
+                    INSERT OR REPLACE INTO backfill_chunks (start_date, end_date, symbols, rows)
+                    VALUES (?, ?, ?, ?)
+                ''', (*chunk, len(rows)))
+
+    def completed_chunks(self, symbols):
+        """(start_date, end_date) of every checkpointed backfill chunk for a symbols key."""
+        with self._lock:
+            return {(start, end) for start, end in self.conn.execute(
+                "SELECT start_date, end_date FROM backfill_chunks WHERE symbols = ?", (symbols,))}
+
+    def archive_segment_names(self):
+        """Names of every segment listed in archive_segments."""
+        with self._lock:
+            return {name for name, in self.conn.execute("SELECT name FROM archive_segments")}
+
+    def rows_to_archive(self, source, columns, cutoff, after_id, limit):
+        """Up to `limit` rows of `columns` from trades or balance_snapshots with ts < cutoff and
+        id > after_id, in id order."""
+        query = f"SELECT {', '.join(columns)} FROM {source} WHERE ts < ? AND id > ?"
+        if source == 'balance_snapshots':
+            # Snapshot ids are MAX(id) + 1 rather than AUTOINCREMENT: keeping the newest row
+            # hot means an id is never handed out twice
+            query += " AND id < (SELECT MAX(id) FROM balance_snapshots)"
+        with self._lock:
+            return self.conn.execute(query + " ORDER BY id LIMIT ?", (cutoff, after_id, limit)).fetchall()
+
+    def record_segment(self, name, source, first_id, last_id, first_ts, last_ts, rows, size, cutoff):
+        """List a written segment and delete its rows from the source table in one transaction.
+
+        Rows are never updated and new ids are always higher, so the ts < cutoff rows in
+        [first_id, last_id] are exactly the ones rows_to_archive() returned.
+        """
+        with self._lock, self.conn:
+            self.conn.execute('''
+                INSERT INTO archive_segments (name, source, first_id, last_id, first_ts, last_ts, rows, bytes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (name, source, first_id, last_id, first_ts, last_ts, rows, size))
+            self.conn.execute(f"DELETE FROM {source} WHERE id BETWEEN ? AND ? AND ts < ?",
+                              (first_id, last_id, cutoff))
+
+    def prune_rollups(self, resolution, before):
+        """Delete one resolution's bars that start before `before`. Returns the number deleted."""
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                                     (resolution, before)).rowcount
+
+    def vacuum(self):
+        """Rebuild the database file without its free pages and truncate the WAL."""
+        with self._lock:
+            self.conn.execute("VACUUM")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    @contextmanager
+    def batch(self):
+        """Group every log_trades and log_balance call in the block into one transaction (group commit)."""
+        with self._lock:
+            outer = self._pending is None
+            if outer:
+                self._pending = ([], [])
+        try:
+            yield self
+        finally:
+            if outer:
+                with self._lock:
+                    pending, self._pending = self._pending, None
+                    self._write(*pending)
+
+    def close(self):
+        """Flush any open batch and close the connection."""
+        with self._lock:
+            if self._pending:
+                pending, self._pending = self._pending, None
+                self._write(*pending)
+            self.conn.close()
+
+
+class WriteBehindWriter:
+    """Bounded write-behind queue drained by a background writer thread.
+
+    The trading loop only enqueues records, so its decision latency no longer
+    depends on disk speed or database locks. The writer drains whatever has
+    accumulated in bulk executemany transactions and retries failed batches with
+    backoff. When the queue is full, submitters block (backpressure) instead of
+    growing memory without bound; stats() reports how often that happens.
+    """
+
+    _STOP = object()
+
+    def __init__(self, store, max_queue=10000, batch_size=1000, max_retries=10):
+        self.store = store
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.blocked_puts = 0
+        self.blocked_seconds = 0.0
+        self.max_depth = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='trade-writer', daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        if self._closed:
+            raise RuntimeError("WriteBehindWriter is closed")
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Backpressure: wait for the writer to catch up rather than drop data
+            start = time.perf_counter()
+            self._queue.put(item)
+            with self._stats_lock:
+                self.blocked_puts += 1
+                self.blocked_seconds += time.perf_counter() - start
+        with self._stats_lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def submit_trades(self, records, account_id=DEFAULT_ACCOUNT):
+        """Queue (timestamp, pair, action, price, balance) records for one account."""
+        for record in records:
+            self._put(('trade', record + (account_id,)))
+
+    def submit_batch(self, trades):
+        """Queue (timestamp, pair, action, price, balance, account_id) trades as a single item.
+
+        For callers that produce many records per cycle (one set per account): one queue
+        operation instead of one per record.
+        """
+        if trades:
+            self._put(('batch', list(trades)))
+
+    def submit_positions(self, rows):
+        """Queue PositionLedger.snapshot() rows as a single item."""
+        if rows:
+            self._put(('positions', list(rows)))
+
+    def submit_prices(self, timestamp, pairs, prices):
+        """Queue one tick's prices (parallel pair and price sequences) for the price rollups."""
+        self._put(('prices', [(timestamp, pair, price) for pair, price in zip(pairs, prices)]))
+
+    def submit_balance(self, timestamp, balance, account_id=DEFAULT_ACCOUNT):
+        """Queue a balance snapshot for one account."""
+        self._put(('balance', (timestamp, balance, account_id)))
+
+    def submit_balances(self, rows):
+        """Queue (timestamp, balance, account_id) snapshots as a single item."""
+        if rows:
+            self._put(('balances', list(rows)))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if any(item is self._STOP for item in items):
+                stopping = True
+            records = [item for item in items if item is not self._STOP]
+            if records:
+                self._write_batch(records)
+            for _ in items:
+                self._queue.task_done()
+
+    def _write_batch(self, items):
+        trades = []
+        balances = []
+        positions = []
+        prices = []
+        for kind, record in items:
+            if kind == 'trade':
+                trades.append(record)
+            elif kind == 'batch':
+                trades.extend(record)
+            elif kind == 'balances':
+                balances.extend(record)
+            elif kind == 'positions':
+                positions.extend(record)
+            elif kind == 'prices':
+                prices.extend(record)
+            else:
+                balances.append(record)
+
+        delay = 0.05
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                self.store.write_many(trades, balances, positions, prices)
+                with self._stats_lock:
+                    self.written += len(items)
+                    self.batches += 1
+                    self.last_batch_size = len(items)
+                    self.last_batch_ms = (time.perf_counter() - start) * 1000
+                return
+            except Exception as e:
+                with self._stats_lock:
+                    self.write_errors += 1
+                logger.warning(f"Write-behind batch of {len(items)} failed (attempt {attempt + 1}): {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+
+        with self._stats_lock:
+            self.dropped += len(items)
+        logger.error(f"Dropped {len(items)} records after {self.max_retries + 1} failed writes")
+
+    def flush(self):
+        """Block until everything queued so far has been written (or dropped)."""
+        self._queue.join()
+
+    def close(self):
+        """Flush the queue and stop the writer thread. Safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def stats(self):
+        """Queue depth, throughput and backpressure counters."""
+        with self._stats_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_depth': self.max_depth,
+                'capacity': self._queue.maxsize,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'batches': self.batches,
+                'write_errors': self.write_errors,
+                'blocked_puts': self.blocked_puts,
+                'blocked_ms': round(self.blocked_seconds * 1000, 2),
+                'last_batch_size': self.last_batch_size,
+                'last_batch_ms': round(self.last_batch_ms, 2),
+            }
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Forex Strategy Plugins
+Strategies receive the prices of every pair at once as NumPy vectors (and the full
+price history when they need it) and return one action per pair, so a single
+vectorized pass decides for 30+ pairs. MomentumStrategy is the reference plugin:
+the original ±0.05% percent-change rule. Plugins that set uses_indicators get their
+own streaming indicators per pair (see indicators.py), kept current by the bot.
+"""
+
+import numpy as np
+
+from indicators import IndicatorSet, RollingStats
+
+# Action codes in returned action vectors
+HOLD = 0
+BUY = 1
+SELL = -1
+
+ACTION_NAMES = {HOLD: 'HOLD', BUY: 'BUY', SELL: 'SELL'}
+
+
+class Strategy:
+    """Base class for strategy plugins.
+
+    decide() gets `prices` and `previous` as float64 vectors aligned with `pairs`
+    (previous is NaN for pairs without an earlier price) plus the bot's PriceHistory,
+    and returns an int8 vector of HOLD/BUY/SELL codes of the same length.
+
+    A plugin that sets uses_indicators = True also gets `indicators`: a {pair: IndicatorSet}
+    dict built with new_indicators() and updated by the bot with every tick before
+    decide() runs. Other plugins get None and cost the bot nothing per tick.
+    """
+
+    name = 'strategy'
+    uses_indicators = False
+
+    def new_indicators(self):
+        """A fresh IndicatorSet for one pair (only called when uses_indicators is set)."""
+        return IndicatorSet.default()
+
+    def decide(self, pairs, prices, previous, history=None, indicators=None):
+        raise NotImplementedError
+
+
+class MomentumStrategy(Strategy):
+    """BUY when a pair rose more than buy_threshold percent since the last tick, SELL when
+    it fell more than sell_threshold percent, otherwise HOLD."""
+
+    name = 'momentum'
+
+    def __init__(self, buy_threshold=0.05, sell_threshold=-0.05):
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+
+    def _actions(self, change_pct):
+        # (change > buy) - (change < sell) maps to BUY=1, SELL=-1, HOLD=0 in one pass
+        return (change_pct > self.buy_threshold).view(np.int8) - (change_pct < self.sell_threshold).view(np.int8)
+
+    def decide(self, pairs, prices, previous, history=None, indicators=None):
+        # NaN comparisons are False, so pairs without a previous price HOLD
+        return self._actions(percent_change(prices, previous))
+
+
+class MeanReversionStrategy(Strategy):
+    """SELL when a pair trades more than `entry` standard deviations above its rolling
+    `window`-tick mean, BUY when it trades as far below it, otherwise HOLD (including
+    while the window fills). Reads the z-score from the bot's streaming indicators."""
+
+    name = 'mean_reversion'
+    uses_indicators = True
+
+    def __init__(self, window=20, entry=2.0):
+        self.window = window
+        self.entry = entry
+
+    def new_indicators(self):
+        return IndicatorSet(zscore=RollingStats(self.window))
+
+    def _actions(self, zscores):
+        return (zscores < -self.entry).view(np.int8) - (zscores > self.entry).view(np.int8)
+
+    def decide(self, pairs, prices, previous, history=None, indicators=None):
+        zscores = np.array([indicators[pair]['zscore'].value for pair in pairs], dtype=np.float64)
+        return self._actions(zscores)
+
+
+def percent_change(prices, previous):
+    """Percent change per pair, NaN where there is no previous price (rates are always positive)."""
+    change = np.subtract(prices, previous)
+    np.divide(change, previous, out=change)
+    change *= 100
+    return change
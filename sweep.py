@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Forex Strategy Parameter Sweep
+Runs the backtester over a grid of buy/sell thresholds, trade sizes and pair sets,
+fanning the runs out over every core. The rate history is placed in shared memory
+once (or mapped from the on-disk rate cache), so workers read the same pages
+instead of receiving a copy per task.
+"""
+
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backtest import generate_rates, load_rates, run_backtest
+
+# Per-worker view of the shared rate history, set up by _attach_history
+_history = {}
+
+
+def parse_values(spec):
+    """Parse a grid axis: either a comma list ("0.05,0.1") or a range ("0.01:0.2:0.01")."""
+    if ':' in spec:
+        start, stop, step = (float(part) for part in spec.split(':'))
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    return [float(value) for value in spec.split(',') if value]
+
+
+def build_grid(buy_thresholds, sell_thresholds, trade_amounts, pair_sets):
+    """Cartesian product of all sweep axes as (buy, sell, amount, pairs) tuples."""
+    return list(itertools.product(buy_thresholds, sell_thresholds, trade_amounts,
+                                  [tuple(pairs) for pairs in pair_sets]))
+
+
+def _attach_history(shm_name, shape, pairs, initial_balance):
+    """Pool initializer: map the shared rate array into this worker without copying it."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _history['shm'] = shm  # keep the mapping alive for the worker's lifetime
+    _history['rates'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _history['columns'] = {pair: i for i, pair in enumerate(pairs)}
+    _history['initial_balance'] = initial_balance
+
+
+def _attach_cache(cache_dir, db_path, pairs, initial_balance):
+    """Pool initializer: map the parent's already-validated rate cache into this worker."""
+    from rate_cache import RateCache
+
+    cache = RateCache(cache_dir, db_path).open(check=False)
+    _history['rates'] = cache.matrix()
+    _history['columns'] = {pair: cache.currencies.index(pair) for pair in pairs}
+    _history['initial_balance'] = initial_balance
+
+
+def _pair_rates(pairs):
+    """The shared history restricted to `pairs`.
+
+    Pairs that sit side by side in the shared array (the default all-pairs set among them)
+    get a zero-copy slice of it. Any other set is gathered once per worker and reused, so
+    grid points never copy the history.
+    """
+    views = _history.setdefault('views', {})
+    rates = views.get(pairs)
+    if rates is None:
+        columns = [_history['columns'][pair] for pair in pairs]
+        if columns == list(range(columns[0], columns[0] + len(columns))):
+            rates = _history['rates'][:, columns[0]:columns[0] + len(columns)]
+        else:
+            rates = _history['rates'][:, columns]
+        views[pairs] = rates
+    return rates
+
+
+def _run_point(point):
+    """Backtest a single grid point against the shared history."""
+    buy_threshold, sell_threshold, trade_amount, pairs = point
+    result = run_backtest(
+        _pair_rates(pairs), pairs,
+        buy_threshold=buy_threshold,
+        sell_threshold=sell_threshold,
+        trade_amount=trade_amount,
+        initial_balance=_history['initial_balance'],
+    )
+    stats = result.summary()
+    return {
+        'buy_threshold': buy_threshold,
+        'sell_threshold': sell_threshold,
+        'trade_amount': trade_amount,
+        'pairs': ','.join(pairs),
+        'total_trades': stats['total_trades'],
+        'current_balance': stats['current_balance'],
+        'total_profit_loss': stats['total_profit_loss'],
+        'max_drawdown_pct': stats['max_drawdown_pct'],
+    }
+
+
+def run_sweep(rates, pairs, grid, workers=None, initial_balance=10000.0, cache=None):
+    """Backtest every grid point in a process pool and return results ranked by profit.
+
+    With an opened RateCache, workers map its files directly and `rates` is ignored.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Several points per task keep IPC overhead small next to the backtest itself
+    chunksize = max(1, len(grid) // (workers * 8))
+
+    if cache is not None:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_cache,
+            initargs=(cache.cache_dir, cache.db_path, list(pairs), initial_balance),
+        ) as executor:
+            results = list(executor.map(_run_point, grid, chunksize=chunksize))
+        return _ranked(results)
+
+    rates = np.ascontiguousarray(rates, dtype=np.float64)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(rates.nbytes, 1))
+    try:
+        shared = np.ndarray(rates.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = rates
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_history,
+            initargs=(shm.name, rates.shape, list(pairs), initial_balance),
+        ) as executor:
+            results = list(executor.map(_run_point, grid, chunksize=chunksize))
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return _ranked(results)
+
+
+def _ranked(results):
+    results.sort(key=lambda row: (row['total_profit_loss'], -row['max_drawdown_pct']), reverse=True)
+    return results
+
+
+def print_results(results, top=20):
+    """Print a ranked results table."""
+    print(f"{'Rank':>4}  {'Buy %':>7}  {'Sell %':>7}  {'Size':>8}  {'Pairs':<12}  "
+          f"{'Trades':>7}  {'Balance':>12}  {'P/L':>11}  {'Max DD %':>8}")
+    print("-" * 92)
+    for rank, row in enumerate(results[:top], start=1):
+        print(f"{rank:>4}  {row['buy_threshold']:>7.3f}  {row['sell_threshold']:>7.3f}  "
+              f"{row['trade_amount']:>8.1f}  {row['pairs']:<12}  {row['total_trades']:>7}  "
+              f"{row['current_balance']:>12,.2f}  {row['total_profit_loss']:>11,.2f}  "
+              f"{row['max_drawdown_pct']:>8.2f}")
+
+
+def main(argv=None):
+    """Command-line entry point for running a parameter sweep."""
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over historical rates")
+    parser.add_argument('rates_file', nargs='?', help="CSV rate file or backfilled database (see backtest.py)")
+    parser.add_argument('--generate', type=int, metavar='DAYS',
+                        help="Sweep over generated data with this many days instead of a file")
+    parser.add_argument('--buy', default='0.01:0.2:0.01', help="Buy thresholds in %% (list or start:stop:step)")
+    parser.add_argument('--sell', default='-0.2:-0.01:0.01',
+                        help="Sell thresholds in %% (list or start:stop:step); negative values need the "
+                             "--sell=-0.2:-0.01:0.01 form")
+    parser.add_argument('--sizes', default='100', help="Trade sizes (list or start:stop:step)")
+    parser.add_argument('--pair-sets', default=None,
+                        help="Semicolon-separated pair sets, e.g. 'EUR,GBP;EUR;GBP' (default: all pairs)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--top', type=int, default=20, help="Rows to print (default: 20)")
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.generate:
+        _, pairs, rates = generate_rates(days=args.generate)
+    elif args.rates_file and args.rates_file.endswith('.db'):
+        from rate_cache import RateCache
+        cache = RateCache(db_path=args.rates_file).open()
+        pairs, rates = cache.currencies, cache.matrix()
+    elif args.rates_file:
+        _, pairs, rates = load_rates(args.rates_file)
+    else:
+        parser.error("a rates file or --generate is required")
+
+    if args.pair_sets:
+        pair_sets = [pair_set.split(',') for pair_set in args.pair_sets.split(';')]
+    else:
+        pair_sets = [pairs]
+    for pair_set in pair_sets:
+        unknown = set(pair_set) - set(pairs)
+        if unknown:
+            parser.error(f"pairs not in rate data: {', '.join(sorted(unknown))}")
+
+    grid = build_grid(parse_values(args.buy), parse_values(args.sell), parse_values(args.sizes), pair_sets)
+
+    print(f"🔍 Sweeping {len(grid):,} parameter combinations over {len(rates)} ticks "
+          f"on {args.workers or os.cpu_count()} workers...")
+    start = time.perf_counter()
+    results = run_sweep(rates, pairs, grid, workers=args.workers, cache=cache)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Done in {elapsed:.2f}s ({len(grid) / elapsed:,.0f} backtests/sec)")
+    print()
+    print_results(results, top=args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
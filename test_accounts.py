@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Multi-Account Test
+Checks that a multi-account database holds only the accounts' own balances and that
+the dashboard queries report one account at a time.
+"""
+
+import pytest
+
+from accounts import MultiAccountBot, SimulatedAccount
+from execution import FillModel
+from storage import account_ids, connect, latest_balance, recent_trades, trade_counts
+from strategies import MomentumStrategy
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    accounts = [
+        SimulatedAccount('eager', MomentumStrategy(0.01, -0.01), fill_model=FillModel()),
+        SimulatedAccount('idle', MomentumStrategy(1000.0, -1000.0), initial_balance=500.0, fill_model=FillModel()),
+    ]
+    path = str(tmp_path / 'accounts.db')
+    bot = MultiAccountBot(accounts, db_path=path, feed=object())
+    try:
+        bot.trade_on_prices({'EUR': 0.90, 'GBP': 0.80})
+        bot.trade_on_prices({'EUR': 0.95, 'GBP': 0.75})
+    finally:
+        bot.http_client.close()
+        bot.writer.close()
+        bot.store.close()
+    return path
+
+
+def test_no_phantom_default_account(db_path):
+    conn = connect(db_path)
+    try:
+        assert account_ids(conn) == ['eager', 'idle']
+        assert conn.execute("SELECT COUNT(*) FROM balance_snapshots WHERE account_id = 'default'").fetchone()[0] == 0
+        # Starting balance plus one snapshot per cycle for each account
+        assert conn.execute("SELECT COUNT(*) FROM balance_snapshots WHERE account_id = 'idle'").fetchone()[0] == 3
+    finally:
+        conn.close()
+
+
+def test_dashboard_queries_per_account(db_path):
+    conn = connect(db_path)
+    try:
+        assert trade_counts(conn, 'eager') == {'BUY': 1, 'SELL': 1}
+        assert trade_counts(conn, 'idle') == {'BUY': 0, 'SELL': 0}
+        assert [row[1:3] for row in recent_trades(conn, 10, account_id='eager')] in (
+            [('EUR', 'BUY'), ('GBP', 'SELL')], [('GBP', 'SELL'), ('EUR', 'BUY')])
+        assert recent_trades(conn, 10, account_id='idle') == []
+        assert recent_trades(conn, 10, pair='EUR', account_id='idle') == []
+        assert len(recent_trades(conn, 10, pair='EUR', account_id='eager')) == 1
+        assert latest_balance(conn, 'idle') == pytest.approx(500.0)
+        assert latest_balance(conn, 'default') is None
+    finally:
+        conn.close()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Position Ledger Test
+Checks that the bots' position P&L is in USD, against hand-computed cases.
+Rates are USD→currency quotes (currency per USD); both the cash and the ledger
+price a unit of EUR quoted at 0.90 at 1 / 0.90 USD, before fill costs.
+"""
+
+import pytest
+
+from accounts import SimulatedAccount
+from bot import ForexTradingBot
+from execution import FillModel, SpreadSlippageModel
+from ledger import PositionLedger
+from strategies import MomentumStrategy
+
+
+def test_ledger_long_pnl():
+    """Long 100 at $1.25 marked at $1.50 is +$25; selling half at $1.00 books -$12.50."""
+    ledger = PositionLedger()
+    ledger.fill('EUR', 100, 1.25)
+    ledger.mark('EUR', 1.50)
+    assert ledger.total_unrealized == pytest.approx(25.0)
+    assert ledger.fill('EUR', -50, 1.00) == pytest.approx(-12.5)
+    assert ledger.position('EUR')['unrealized_pnl'] == pytest.approx(-12.5)
+
+
+def test_account_pnl_in_usd():
+    """100 EUR bought at 0.90 EUR/USD and marked at 0.80 EUR/USD is worth $13.89 more."""
+    account = SimulatedAccount('test', MomentumStrategy(0.05, -0.05), fill_model=FillModel())
+    account.execute('EUR', 'BUY', 0.90)
+    assert account.balance == pytest.approx(10000 - 100 / 0.90)
+    account.ledger.mark('EUR', 1 / 0.80)
+    assert account.ledger.total_unrealized == pytest.approx(100 * (1 / 0.80 - 1 / 0.90))
+    assert account.ledger.total_unrealized == pytest.approx(13.89, abs=0.005)
+
+    # Selling the position at 0.80 realizes the same gain
+    account.execute('EUR', 'SELL', 0.80)
+    assert account.ledger.total_realized == pytest.approx(13.89, abs=0.005)
+    assert account.ledger.total_unrealized == pytest.approx(0.0)
+
+
+def test_bot_pnl_in_usd(tmp_path):
+    """The bot's own fills and marks give the same USD P&L as an account's."""
+    bot = ForexTradingBot(db_path=str(tmp_path / 'ledger.db'), feed=object())
+    try:
+        bot.fill_model = FillModel()
+        # Thresholds no move reaches, so only the explicit BUY trades
+        bot.strategy = MomentumStrategy(1000.0, -1000.0)
+        bot.trade_on_prices({'EUR': 0.90})
+        bot.simulate_trade_execution('EUR', 'BUY', 0.90)
+        bot.trade_on_prices({'EUR': 0.80})
+        assert bot.ledger.total_unrealized == pytest.approx(13.89, abs=0.005)
+        assert bot.ledger.position('EUR')['last_price'] == pytest.approx(1.25)
+    finally:
+        bot.http_client.close()
+        bot.writer.close()
+        bot.store.close()
+
+
+def test_buy_costs_match_cost_basis():
+    """A BUY filled at the ask pays what the ledger records, and is under water at mid."""
+    account = SimulatedAccount('test', MomentumStrategy(0.05, -0.05), seed=3,
+                               fill_model=SpreadSlippageModel(noise_bps=0.0))
+    account.execute('EUR', 'BUY', 0.90)
+    position = account.ledger.position('EUR')
+    assert position['avg_cost'] > 1 / 0.90
+    assert 10000 - account.balance == pytest.approx(100 * position['avg_cost'])
+
+    account.ledger.mark('EUR', 1 / 0.90)
+    assert account.ledger.total_unrealized < 0
+
+
+def test_bot_buy_costs_match_cost_basis(tmp_path):
+    """The bot's BUY debits the same USD-per-unit fill its ledger records."""
+    bot = ForexTradingBot(db_path=str(tmp_path / 'ledger.db'), feed=object())
+    try:
+        bot.fill_model = SpreadSlippageModel(noise_bps=0.0)
+        balance = bot.simulate_trade_execution('EUR', 'BUY', 0.90)
+        position = bot.ledger.position('EUR')
+        assert 10000 - balance == pytest.approx(100 * position['avg_cost'])
+
+        bot.ledger.mark('EUR', 1 / 0.90)
+        assert bot.ledger.total_unrealized < 0
+    finally:
+        bot.http_client.close()
+        bot.writer.close()
+        bot.store.close()
+
+
+def test_high_quote_currencies_cost_usd_per_unit(tmp_path):
+    """Across the full universe a 100-unit BUY costs 100 / rate USD, however large the quote."""
+    bot = ForexTradingBot(db_path=str(tmp_path / 'ledger.db'), feed=object())
+    try:
+        bot.fill_model = FillModel()
+        rates = {'EUR': 0.92, 'JPY': 151.2, 'HUF': 361.0, 'KRW': 1370.0, 'IDR': 15900.0}
+        for pair, rate in rates.items():
+            bot.simulate_trade_execution(pair, 'BUY', rate)
+        assert 10000 - bot.simulated_balance == pytest.approx(sum(100 / rate for rate in rates.values()))
+        assert bot.simulated_balance > 9800
+    finally:
+        bot.http_client.close()
+        bot.writer.close()
+        bot.store.close()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Resting Order Test
+Checks that the bot matches resting orders in USD per unit, the ledger's unit, so
+a long's stop-loss fires when the currency falls against the dollar (its
+USD→currency rate rises).
+"""
+
+import pytest
+
+from bot import ForexTradingBot
+from execution import FillModel
+from strategies import MomentumStrategy
+
+
+@pytest.fixture
+def bot(tmp_path):
+    bot = ForexTradingBot(db_path=str(tmp_path / 'orders.db'), feed=object())
+    bot.fill_model = FillModel()
+    # Thresholds no move reaches, so only resting orders trade
+    bot.strategy = MomentumStrategy(1000.0, -1000.0)
+    yield bot
+    bot.http_client.close()
+    bot.writer.close()
+    bot.store.close()
+
+
+def test_long_stop_loss_triggers_on_falling_eur(bot):
+    bot.trade_on_prices({'EUR': 0.90})
+    bot.simulate_trade_execution('EUR', 'BUY', 0.90)
+    order = bot.order_book.place('EUR', 'SELL', 'STOP', 1.05)
+
+    # EUR appreciates to $1.176: the stop stays put
+    bot.trade_on_prices({'EUR': 0.85})
+    assert order.order_id in bot.order_book
+    assert bot.ledger.position('EUR')['quantity'] == pytest.approx(100)
+
+    # EUR falls to $1.026, through the $1.05 stop: the long is sold at that price
+    bot.trade_on_prices({'EUR': 0.975})
+    assert order.order_id not in bot.order_book
+    assert order.trigger_price == pytest.approx(1 / 0.975)
+    assert bot.ledger.position('EUR')['quantity'] == pytest.approx(0)
+    assert bot.ledger.total_realized == pytest.approx(100 * (1 / 0.975 - 1 / 0.90))
+
+
+def test_long_take_profit_triggers_on_rising_eur(bot):
+    bot.trade_on_prices({'EUR': 0.90})
+    order = bot.order_book.place('EUR', 'SELL', 'TAKE_PROFIT', 1.15)
+
+    bot.trade_on_prices({'EUR': 0.95})
+    assert order.order_id in bot.order_book
+    bot.trade_on_prices({'EUR': 0.85})
+    assert order.trigger_price == pytest.approx(1 / 0.85)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Price Feed Test
+Runs the HTTP client, the conditional-request feed, the hedged fetcher and the bots
+against local stand-in rate servers: keep-alive connection reuse, the 304 Not
+Modified path, hedging to the secondary when the primary is slow, and the bots'
+unchanged-rate skip.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bot import ForexTradingBot
+from bot_async import AsyncForexTradingBot
+from clock import SimulatedClock
+from price_feed import (ExchangeRateHostProvider, FrankfurterProvider, HedgedFetcher, HTTPClient,
+                        RateFeed)
+
+RATES = {'EUR': 0.92, 'GBP': 0.79, 'JPY': 151.2}
+
+
+class StandInServer:
+    """Frankfurter-style /latest server with an ETag, a fixed latency and a request log.
+
+    With a `sequence` of rate dicts, each request publishes the next one (the last repeats).
+    """
+
+    def __init__(self, rates=RATES, latency=0.0, etag='"rates-1"', sequence=()):
+        self.rates = dict(rates)
+        self.sequence = [dict(rates) for rates in sequence]
+        self.latency = latency
+        self.etag = etag
+        self.requests = []  # (path, If-None-Match)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append((self.path, self.headers.get('If-None-Match')))
+                time.sleep(server.latency)
+                if server.sequence:
+                    server.rates = server.sequence.pop(0)
+                if server.etag and self.headers.get('If-None-Match') == server.etag:
+                    self.send_response(304)
+                    self.send_header('ETag', server.etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = json.dumps({'amount': 1.0, 'base': 'USD', 'date': '2024-01-02',
+                                   'rates': server.rates}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if server.etag:
+                    self.send_header('ETag', server.etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/latest"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**kwargs):
+        server = StandInServer(**kwargs)
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.close()
+
+
+@pytest.fixture
+def client():
+    client = HTTPClient(connect_timeout=2.0, read_timeout=2.0)
+    yield client
+    client.close()
+
+
+def test_keep_alive_reuses_one_connection(servers, client):
+    server = servers()
+    for _ in range(5):
+        assert client.get_json(server.url)['rates'] == RATES
+
+    stats = client.stats()
+    assert stats['requests'] == 5
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 4
+
+
+def test_rate_feed_not_modified(servers, client):
+    server = servers()
+    feed = RateFeed(api_url=server.url, symbols=['EUR', 'GBP'], client=client)
+
+    assert feed.poll()['rates'] == RATES
+    # The second poll revalidates with the ETag and the server answers 304
+    assert feed.poll() is None
+    assert server.requests[0] == ('/latest?from=USD&to=EUR,GBP', None)
+    assert server.requests[1][1] == '"rates-1"'
+    assert (feed.changed_count, feed.unchanged_count) == (1, 1)
+
+
+def test_hedged_fetcher_uses_secondary_when_primary_is_slow(servers, client):
+    primary = servers(latency=0.5, etag=None)
+    secondary = servers(rates={'EUR': 0.93}, etag=None)
+    fetcher = HedgedFetcher(FrankfurterProvider(primary.url), ExchangeRateHostProvider(secondary.url),
+                            client=client, initial_deadline=0.05)
+    try:
+        source, rates = fetcher.fetch(['EUR'])
+        assert (source, rates) == ('exchangerate.host', {'EUR': 0.93})
+        assert secondary.requests == [('/latest?base=USD&symbols=EUR', None)]
+
+        stats = fetcher.stats()
+        assert stats['hedges_fired'] == 1
+        assert stats['secondary_wins'] == 1
+    finally:
+        fetcher.close()
+
+
+def test_hedged_fetcher_prefers_fast_primary(servers, client):
+    primary = servers(etag=None)
+    secondary = servers(etag=None)
+    fetcher = HedgedFetcher(FrankfurterProvider(primary.url), ExchangeRateHostProvider(secondary.url),
+                            client=client, initial_deadline=1.0)
+    try:
+        assert fetcher.fetch(['EUR'])[0] == 'frankfurter'
+        assert fetcher.stats()['hedges_fired'] == 0
+        assert secondary.requests == []
+    finally:
+        fetcher.close()
+
+
+def test_hedged_bot_skips_unchanged_rates(servers, tmp_path):
+    primary = servers(etag=None)
+    secondary = servers(etag=None)
+    db_path = str(tmp_path / 'hedged.db')
+    bot = ForexTradingBot(db_path=db_path, clock=SimulatedClock())
+    bot.hedged_fetcher = HedgedFetcher(FrankfurterProvider(primary.url), ExchangeRateHostProvider(secondary.url),
+                                       client=bot.http_client)
+    try:
+        bot.analyze_and_trade()
+        assert bot.previous_prices == RATES
+        # The same rates again: no strategy run, no balance snapshot, no rollups
+        assert bot.get_current_prices() is None
+        bot.analyze_and_trade()
+
+        primary.rates['EUR'] = 0.95
+        bot.analyze_and_trade()
+        assert bot.previous_prices['EUR'] == 0.95
+    finally:
+        bot.hedged_fetcher.close()
+        bot.http_client.close()
+        bot.writer.close()
+        bot.store.close()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        # One snapshot at startup and one per changed cycle
+        assert conn.execute("SELECT COUNT(*) FROM balance_snapshots").fetchone()[0] == 3
+    finally:
+        conn.close()
+    assert len(primary.requests) == 4
+
+
+def test_async_bot_merges_providers_by_priority(servers, tmp_path):
+    primary = servers(rates={'EUR': 0.92}, etag=None)
+    fallback = servers(rates={'EUR': 0.99, 'GBP': 0.79}, etag=None)
+    providers = [FrankfurterProvider(primary.url, timeout=2.0), ExchangeRateHostProvider(fallback.url, timeout=2.0)]
+    bot = AsyncForexTradingBot(providers=providers, db_path=str(tmp_path / 'async.db'), feed=object())
+    try:
+        assert asyncio.run(bot.fetch_prices()) == {'EUR': 0.92, 'GBP': 0.79}
+    finally:
+        bot.http_client.close()
+        bot.writer.close()
+        bot.store.close()
+
+
+def test_async_bot_run_writes_and_drains(servers, tmp_path):
+    server = servers(etag=None, sequence=[
+        {'EUR': 0.90, 'GBP': 0.80},
+        {'EUR': 0.95, 'GBP': 0.80},   # EUR up: BUY
+        {'EUR': 0.95, 'GBP': 0.80},   # unchanged: cycle skipped
+        {'EUR': 0.90, 'GBP': 0.75},   # both down: SELL, SELL
+    ])
+    db_path = str(tmp_path / 'async.db')
+    bot = AsyncForexTradingBot(providers=[FrankfurterProvider(server.url, timeout=2.0)], interval=0.05,
+                               db_path=db_path, clock=SimulatedClock(), feed=object())
+    try:
+        asyncio.run(bot.run_async(cycles=4))
+    finally:
+        bot.http_client.close()
+        bot.writer.close()
+        bot.store.close()
+
+    assert len(server.requests) == 4
+    assert bot.trade_count == 3
+    # Closing the writer drained everything the persistence task handed over
+    stats = bot.writer.stats()
+    assert stats['queue_depth'] == 0
+    assert stats['written'] == stats['enqueued']
+
+    conn = sqlite3.connect(db_path)
+    try:
+        trades = conn.execute("SELECT pair, action FROM trades ORDER BY id").fetchall()
+        snapshots = conn.execute("SELECT COUNT(*) FROM balance_snapshots").fetchone()[0]
+    finally:
+        conn.close()
+    assert trades == [('EUR', 'BUY'), ('EUR', 'SELL'), ('GBP', 'SELL')]
+    # One at startup and one per cycle with new rates
+    assert snapshots == 4
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Rate Cache Test
+Checks that a cache directory shared by two databases never serves one database's
+rates for the other, and that a database without daily_rates opens as empty.
+"""
+
+import sqlite3
+
+import numpy as np
+
+from rate_cache import RateCache
+
+
+def make_db(path, rates):
+    """A database whose daily_rates holds {(currency, day): rate}."""
+    conn = sqlite3.connect(str(path))
+    with conn:
+        conn.execute("CREATE TABLE daily_rates (currency TEXT, day INTEGER, rate REAL, PRIMARY KEY (currency, day))")
+        conn.executemany("INSERT INTO daily_rates VALUES (?, ?, ?)",
+                         [(currency, day, rate) for (currency, day), rate in rates.items()])
+    conn.close()
+    return str(path)
+
+
+def test_databases_with_equal_stamps_do_not_share_a_cache(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    # Same row count and day range, so the same daily_rates stamp
+    first = make_db(tmp_path / 'first.db', {('EUR', 19000): 0.90, ('EUR', 19001): 0.91})
+    second = make_db(tmp_path / 'second.db', {('EUR', 19000): 0.80, ('EUR', 19001): 0.81})
+
+    assert np.allclose(RateCache(cache_dir, first).open().column('EUR'), [0.90, 0.91])
+    cache = RateCache(cache_dir, second).open()
+    assert cache.rebuilt
+    assert np.allclose(cache.column('EUR'), [0.80, 0.81])
+    # Workers that skip the stamp query still see a cache of another database as stale
+    assert RateCache(cache_dir, first).open(check=False).rebuilt
+
+
+def test_database_without_daily_rates_is_empty(tmp_path):
+    db_path = str(tmp_path / 'bot.db')
+    sqlite3.connect(db_path).close()
+
+    cache = RateCache(str(tmp_path / 'cache'), db_path).open()
+    assert cache.rebuilt
+    assert len(cache) == 0
+    assert cache.currencies == []